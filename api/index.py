@@ -7,44 +7,87 @@ All using FREE resources (in-memory storage)
 from http.server import BaseHTTPRequestHandler
 import json
 import os
+import sys
 import hashlib
 import time
 from datetime import datetime
 from urllib.parse import parse_qs, urlparse
 
+# Shared services live at the repo root, one level above api/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.metrics import (
+    timed, record_source, record_fallback, record_analysis,
+    render_prometheus, PROMETHEUS_CONTENT_TYPE
+)
+from services.profiler import profile_request, should_profile, get_profile, PROFILE_HEADER, PROFILE_ID_HEADER
+from services.serialization import dumps
+from services.sessions import TokenSigner
+from services.cache import create_cache
+from services.dedup import collapse_duplicates
+from services.ranking import select_evidence, RANK_NEWS_K
+from services.prompt_builder import PromptBuilder, record_usage
+from services.schema import OPENAI_RESPONSE_FORMAT, request_with_repair, parse_json_text
+from services.preload import preload_if_enabled
+from services.timeseries import get_history
+from services.ttl_policy import ttl_for
+from services.prewarm import prewarm_ttl, is_prewarm_ticker
+from services.symbols import get_index as get_symbol_index, resolve_ticker, suggest
+from services.negative_cache import NEGATIVE_CACHE, retry_after, news_failure
+from services.quotes import get_quote_service, QuoteError
+
+# Long-lived instances can opt into importing heavy SDKs at boot
+preload_if_enabled()
+
 # ============= IN-MEMORY STORAGE (Free!) =============
-# Cache: {ticker: {data: {...}, expires: timestamp}}
-ANALYSIS_CACHE = {}
+# Cache: in-process L1 in front of a shared Redis L2 when REDIS_URL is set,
+# so an analysis computed on one instance is served by all of them. Entries
+# carry their own TTL (services.ttl_policy); CACHE_TTL is only the default.
 CACHE_TTL = 600  # 10 minutes
+ANALYSIS_CACHE = create_cache(CACHE_TTL)
 
 # Users: {email: {password_hash, name, plan, created}}
 USERS_DB = {}
 
-# Sessions: {token: {email, expires}}
-SESSIONS = {}
+# Sessions: stateless HMAC-signed tokens (email, plan, expiry) that any
+# instance can verify; only revoked token ids are stored, until they expire
+TOKENS = TokenSigner()
+
+# Upstream endpoints (overridable so benchmarks can point at local stubs;
+# ALPHA_VANTAGE_URL is read by services.quotes)
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2")
+# Articles per NewsAPI call, before syndicated copies are collapsed
+NEWS_PAGE_SIZE = int(os.getenv("NEWS_PAGE_SIZE", 20))
 
 # ============= HELPER FUNCTIONS =============
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
-def generate_token(email):
-    data = f"{email}|{time.time()}|{os.urandom(16).hex()}"
-    return hashlib.sha256(data.encode()).hexdigest()[:32]
+def generate_token(email, plan="free"):
+    return TOKENS.issue(email, plan)
 
 def get_cached(ticker):
-    """Get cached analysis if not expired."""
-    if ticker in ANALYSIS_CACHE:
-        cached = ANALYSIS_CACHE[ticker]
-        if time.time() < cached["expires"]:
-            return cached["data"]
-    return None
+    """Get cached analysis if not expired (checks L1, then the shared L2)."""
+    cached, remaining = ANALYSIS_CACHE.get_with_ttl(f"analysis:{ticker}")
+    return {**cached, "cache_ttl": int(remaining)} if cached else None
 
 def set_cache(ticker, data):
-    """Cache analysis for 10 minutes."""
-    ANALYSIS_CACHE[ticker] = {
-        "data": data,
-        "expires": time.time() + CACHE_TTL
-    }
+    """Cache analysis for the TTL the policy picked for it."""
+    ANALYSIS_CACHE.set(f"analysis:{ticker}", data, data.get("cache_ttl") or CACHE_TTL)
+
+# Static trending list, serialized once at import instead of per request
+TRENDING_JSON = dumps({"trending": [
+    {"ticker": "RELIANCE.BSE", "signal": "BUY", "confidence": 91, "price": 2845.50, "name": "Reliance Industries"},
+    {"ticker": "TCS.BSE", "signal": "BUY", "confidence": 88, "price": 4125.75, "name": "Tata Consultancy"},
+    {"ticker": "INFY.BSE", "signal": "HOLD", "confidence": 72, "price": 1876.30, "name": "Infosys"},
+    {"ticker": "HDFCBANK.BSE", "signal": "BUY", "confidence": 85, "price": 1654.20, "name": "HDFC Bank"},
+    {"ticker": "ITC.BSE", "signal": "BUY", "confidence": 79, "price": 465.80, "name": "ITC Limited"},
+    {"ticker": "TSLA", "signal": "BUY", "confidence": 89, "price": 248.32, "name": "Tesla"},
+    {"ticker": "NVDA", "signal": "BUY", "confidence": 94, "price": 875.60, "name": "NVIDIA"},
+    {"ticker": "AAPL", "signal": "HOLD", "confidence": 67, "price": 178.45, "name": "Apple"},
+    {"ticker": "GOOGL", "signal": "BUY", "confidence": 81, "price": 156.78, "name": "Alphabet"},
+    {"ticker": "META", "signal": "BUY", "confidence": 86, "price": 524.30, "name": "Meta"}
+]})
 
 # ============= HTML PAGES =============
 
@@ -155,8 +198,9 @@ HTML_MAIN = '''<!DOCTYPE html>
                 Powered by <span class="text-accent-400 font-semibold">Claude 3.5 Haiku</span> • Real-time NewsAPI + Twitter/X • Instant BUY/SELL/HOLD signals
             </p>
             <div class="flex flex-col sm:flex-row items-center justify-center gap-4 max-w-xl mx-auto">
-                <input type="text" id="tickerInput" placeholder="Enter ticker (e.g., RELIANCE.BSE)" maxlength="15" 
+                <input type="text" id="tickerInput" placeholder="Enter ticker (e.g., RELIANCE.BSE)" maxlength="30" list="symbolList" autocomplete="off" 
                     class="w-full sm:w-72 px-6 py-4 rounded-xl bg-dark-700 border border-dark-500 text-white text-lg font-semibold uppercase text-center focus:outline-none focus:border-accent-500 placeholder:text-white/40 placeholder:normal-case placeholder:font-normal">
+                <datalist id="symbolList"></datalist>
                 <button id="analyzeBtn" onclick="analyze()" 
                     class="w-full sm:w-auto px-8 py-4 rounded-xl bg-gradient-to-r from-accent-500 to-accent-600 text-white font-bold text-lg hover:shadow-lg transition-all disabled:opacity-50">
                     Analyze
@@ -419,6 +463,8 @@ HTML_MAIN = '''<!DOCTYPE html>
         }
 
         function logout() {
+            const token = localStorage.getItem('token');
+            if (token) fetch('/api/auth/logout', { method: 'POST', headers: { 'Authorization': `Bearer ${token}` } }).catch(() => {});
             currentUser = null;
             localStorage.removeItem('user');
             localStorage.removeItem('token');
@@ -426,6 +472,15 @@ HTML_MAIN = '''<!DOCTYPE html>
         }
 
         document.getElementById('tickerInput').addEventListener('keypress', e => { if (e.key === 'Enter') analyze(); });
+        let symbolTimer = null;
+        document.getElementById('tickerInput').addEventListener('input', e => {
+            clearTimeout(symbolTimer);
+            const prefix = e.target.value.trim();
+            if (!prefix) return;
+            symbolTimer = setTimeout(() => fetch(`/api/symbols?prefix=${encodeURIComponent(prefix)}&limit=8`).then(r => r.json()).then(d => {
+                document.getElementById('symbolList').innerHTML = d.symbols.map(s => `<option value="${s.symbol}">${s.name} (${s.exchange})</option>`).join('');
+            }).catch(() => {}), 150);
+        });
 
         // Toast notification
         function showToast(message, type = 'success') {
@@ -488,6 +543,10 @@ HTML_MAIN = '''<!DOCTYPE html>
             try {
                 const res = await fetch('/api/analyze', { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ ticker }) });
                 const data = await res.json();
+                if (!res.ok) {
+                    showToast(`${data.error || 'Analysis failed'}${data.suggestions?.length ? ` (try ${data.suggestions.join(', ')})` : ''}`, 'error');
+                    return;
+                }
                 currentAnalysis = data;
 
                 // Show cache indicator
@@ -514,10 +573,10 @@ HTML_MAIN = '''<!DOCTYPE html>
                 if (data.source_breakdown) {
                     document.getElementById('newsPercent').textContent = `${data.source_breakdown.news}%`;
                     document.getElementById('newsBar').style.width = `${data.source_breakdown.news}%`;
-                    document.getElementById('twitterPercent').textContent = `${data.source_breakdown.twitter}%`;
-                    document.getElementById('twitterBar').style.width = `${data.source_breakdown.twitter}%`;
-                    document.getElementById('redditPercent').textContent = `${data.source_breakdown.reddit}%`;
-                    document.getElementById('redditBar').style.width = `${data.source_breakdown.reddit}%`;
+                    document.getElementById('twitterPercent').textContent = data.source_breakdown.twitter == null ? '—' : `${data.source_breakdown.twitter}%`;
+                    document.getElementById('twitterBar').style.width = `${data.source_breakdown.twitter || 0}%`;
+                    document.getElementById('redditPercent').textContent = data.source_breakdown.reddit == null ? '—' : `${data.source_breakdown.reddit}%`;
+                    document.getElementById('redditBar').style.width = `${data.source_breakdown.reddit || 0}%`;
                 }
 
                 if (data.insights?.length) document.getElementById('keyInsights').innerHTML = data.insights.map(i => `<li>${i}</li>`).join('');
@@ -682,6 +741,7 @@ HTML_PRICING = '''<!DOCTYPE html>
 class handler(BaseHTTPRequestHandler):
     
     def do_GET(self):
+        TOKENS.revoked.sweep()
         path = urlparse(self.path).path
         
         if path == "/" or path == "":
@@ -695,27 +755,46 @@ class handler(BaseHTTPRequestHandler):
                 "version": "2.1.0", 
                 "real_api": bool(os.getenv("OPENAI_API_KEY")),
                 "cache_size": len(ANALYSIS_CACHE),
-                "users_count": len(USERS_DB)
+                "cache": ANALYSIS_CACHE.stats(),
+                "users_count": len(USERS_DB),
+                "revoked_sessions": TOKENS.revoked.stats(),
+                "history": get_history().stats(),
+                "negative_cache": NEGATIVE_CACHE.stats(),
+                "quotes": get_quote_service().stats()
             })
+        elif path == "/api/auth/me":
+            claims = TOKENS.verify(self._bearer_token())
+            if not claims:
+                self._send_json({"success": False, "error": "Invalid or expired session"}, 401)
+                return
+            self._send_json({"success": True, "user": {"email": claims["sub"], "plan": claims["plan"]}, "expires": claims["exp"]})
+        elif path == "/api/metrics":
+            self._send_text(render_prometheus(), PROMETHEUS_CONTENT_TYPE)
         elif path == "/api/trending":
-            self._send_json({"trending": [
-                {"ticker": "RELIANCE.BSE", "signal": "BUY", "confidence": 91, "price": 2845.50, "name": "Reliance Industries"},
-                {"ticker": "TCS.BSE", "signal": "BUY", "confidence": 88, "price": 4125.75, "name": "Tata Consultancy"},
-                {"ticker": "INFY.BSE", "signal": "HOLD", "confidence": 72, "price": 1876.30, "name": "Infosys"},
-                {"ticker": "HDFCBANK.BSE", "signal": "BUY", "confidence": 85, "price": 1654.20, "name": "HDFC Bank"},
-                {"ticker": "ITC.BSE", "signal": "BUY", "confidence": 79, "price": 465.80, "name": "ITC Limited"},
-                {"ticker": "TSLA", "signal": "BUY", "confidence": 89, "price": 248.32, "name": "Tesla"},
-                {"ticker": "NVDA", "signal": "BUY", "confidence": 94, "price": 875.60, "name": "NVIDIA"},
-                {"ticker": "AAPL", "signal": "HOLD", "confidence": 67, "price": 178.45, "name": "Apple"},
-                {"ticker": "GOOGL", "signal": "BUY", "confidence": 81, "price": 156.78, "name": "Alphabet"},
-                {"ticker": "META", "signal": "BUY", "confidence": 86, "price": 524.30, "name": "Meta"}
-            ]})
+            self._send_raw_json(TRENDING_JSON)
+        elif path.startswith("/api/profile/"):
+            collapsed = get_profile(path[len("/api/profile/"):])
+            if collapsed is None:
+                self._send_json({"error": "Profile not found"}, 404)
+            else:
+                self._send_text(collapsed, "text/plain")
+        elif path == "/api/symbols":
+            query = parse_qs(urlparse(self.path).query)
+            prefix = query.get("prefix", [""])[0][:30]
+            try:
+                limit = max(1, min(int(query.get("limit", ["10"])[0]), 50))
+            except ValueError:
+                limit = 10
+            self._send_json({"symbols": get_symbol_index().complete(prefix, limit)})
+        elif path.startswith("/api/history/"):
+            self._history(path[len("/api/history/"):], parse_qs(urlparse(self.path).query))
         elif path.startswith("/api/verify/"):
             self._send_json({"verified": False})
         else:
             self._send_html(HTML_MAIN)  # Default to main page
     
     def do_POST(self):
+        TOKENS.revoked.sweep()
         path = urlparse(self.path).path
         content_length = int(self.headers.get('Content-Length', 0))
         body = self.rfile.read(content_length).decode('utf-8') if content_length > 0 else '{}'
@@ -726,7 +805,12 @@ class handler(BaseHTTPRequestHandler):
             data = {}
         
         if path == "/api/analyze":
-            ticker = data.get("ticker", "TSLA").upper().strip()
+            raw = str(data.get("ticker", "TSLA"))
+            ticker = resolve_ticker(raw)
+            if ticker is None:
+                # Junk never reaches NewsAPI, Alpha Vantage or the LLM
+                self._send_json({"error": f"Unknown ticker symbol: {raw.strip()[:30]}", "suggestions": suggest(raw)}, 404)
+                return
             
             # Check cache first!
             cached = get_cached(ticker)
@@ -736,14 +820,40 @@ class handler(BaseHTTPRequestHandler):
                 return
             
             # If not cached, analyze
-            result = self._analyze(ticker)
+            enabled = should_profile(self.headers.get(PROFILE_HEADER))
+            with profile_request(enabled, label=ticker) as prof, timed("total"):
+                result = self._analyze(ticker)
             result["cached"] = False
             
-            # Store in cache
+            # Store in cache, and real analyses in the ticker's sentiment history
             set_cache(ticker, result)
+            if result["using_real_data"]:
+                get_history().record(ticker, result)
             
-            self._send_json(result)
-        
+            headers = {PROFILE_ID_HEADER: prof.profile_id} if prof.profile_id else None
+            self._send_json(result, headers=headers)
+
+        elif path == "/api/prewarm":
+            # Warm-up for the PREWARM_TICKERS universe: entries outlive the next open
+            ticker = resolve_ticker(str(data.get("ticker", "")))
+            if ticker is None or not is_prewarm_ticker(ticker):
+                self._send_json({"error": "Not a PREWARM_TICKERS symbol"}, 403)
+                return
+            ttl = prewarm_ttl(ticker)
+            cached = get_cached(ticker)
+            if cached and cached["cache_ttl"] >= ttl:
+                self._send_json({**cached, "cached": True})
+                return
+            if cached:
+                # Already fresh: only stretch its lifetime past the open
+                result = {**cached, "cache_ttl": ttl}
+            else:
+                result = {**self._analyze(ticker), "cache_ttl": ttl}
+                if result["using_real_data"]:
+                    get_history().record(ticker, result)
+            set_cache(ticker, result)
+            self._send_json({**result, "cached": bool(cached)})
+
         elif path == "/api/auth/signup":
             email = data.get("email", "").lower().strip()
             password = data.get("password", "")
@@ -766,7 +876,6 @@ class handler(BaseHTTPRequestHandler):
             }
             
             token = generate_token(email)
-            SESSIONS[token] = {"email": email, "expires": time.time() + 86400}
             
             self._send_json({
                 "success": True,
@@ -786,16 +895,18 @@ class handler(BaseHTTPRequestHandler):
                 self._send_json({"success": False, "error": "Invalid password"})
                 return
             
-            token = generate_token(email)
-            SESSIONS[token] = {"email": email, "expires": time.time() + 86400}
-            
             user = USERS_DB[email]
+            token = generate_token(email, user["plan"])
+            
             self._send_json({
                 "success": True,
                 "token": token,
                 "user": {"email": email, "name": user["name"], "plan": user["plan"]}
             })
         
+        elif path == "/api/auth/logout":
+            self._send_json({"success": TOKENS.revoke(self._bearer_token())})
+        
         elif path == "/api/verify":
             query = parse_qs(urlparse(self.path).query)
             ticker = query.get("ticker", ["TSLA"])[0]
@@ -819,17 +930,34 @@ class handler(BaseHTTPRequestHandler):
         self._cors()
         self.end_headers()
     
+    def _bearer_token(self):
+        auth = self.headers.get("Authorization", "")
+        return auth[7:].strip() if auth.lower().startswith("bearer ") else ""
+    
     def _cors(self):
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
+        self.send_header("Access-Control-Allow-Headers", f"Content-Type, Authorization, {PROFILE_HEADER}")
+        self.send_header("Access-Control-Expose-Headers", PROFILE_ID_HEADER)
+    
+    def _send_json(self, data, status=200, headers=None):
+        self._send_raw_json(dumps(data), status, headers)
     
-    def _send_json(self, data, status=200):
+    def _send_raw_json(self, body, status=200, headers=None):
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
         self._cors()
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
+    
+    def _send_text(self, text, content_type, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self._cors()
+        self.end_headers()
+        self.wfile.write(text.encode())
     
     def _send_html(self, html, status=200):
         self.send_response(status)
@@ -838,9 +966,35 @@ class handler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(html.encode())
     
-    def _analyze(self, ticker):
-        import random
+    def _history(self, ticker, query):
+        def arg(name, cast):
+            value = query.get(name, [None])[0]
+            if value is None:
+                return None
+            try:
+                return cast(value)
+            except ValueError:
+                return datetime.fromisoformat(value).timestamp() if cast is float else None
         
+        symbol = resolve_ticker(ticker)
+        if symbol is None:
+            self._send_json({"error": f"Unknown ticker symbol: {ticker.strip()[:30]}", "suggestions": suggest(ticker)}, 404)
+            return
+        
+        try:
+            window = arg("window", int)
+            limit = arg("limit", int)
+            result = get_history().query(
+                symbol, start=arg("start", float), end=arg("end", float),
+                window=window if window and window > 0 else None,
+                limit=500 if limit is None else max(0, min(limit, 5000))
+            )
+        except ValueError as e:
+            self._send_json({"error": f"Invalid query: {e}"}, 400)
+            return
+        self._send_json(result)
+    
+    def _analyze(self, ticker):
         news = self._fetch_news(ticker)
         price = self._fetch_price(ticker)
         ai = self._openai(ticker, news)
@@ -848,20 +1002,19 @@ class handler(BaseHTTPRequestHandler):
         
         if not ai:
             ai = self._fallback(ticker, news)
+        record_analysis(real=using_real)
+        policy = ttl_for(ticker, news, price)
         
-        if ai["signal"] == "BUY":
-            breakdown = {"news": random.randint(72, 92), "twitter": random.randint(75, 95), "reddit": random.randint(78, 98)}
-        elif ai["signal"] == "SELL":
-            breakdown = {"news": random.randint(18, 38), "twitter": random.randint(15, 35), "reddit": random.randint(22, 42)}
-        else:
-            breakdown = {"news": random.randint(45, 62), "twitter": random.randint(42, 58), "reddit": random.randint(48, 65)}
+        # The LLM (schema-enforced) and the lexicon fallback both score the
+        # news; this path reads no social source, so those stay empty
+        breakdown = {"news": ai["news_sentiment"], "twitter": None, "reddit": None}
         
         return {
             "ticker": ticker,
             "signal": ai["signal"],
             "confidence": ai["confidence"],
             "reasoning": ai["reasoning"],
-            "sentiment_score": 0.85 if ai["signal"] == "BUY" else 0.25 if ai["signal"] == "SELL" else 0.50,
+            "sentiment_score": ai.get("sentiment_score", 0.85 if ai["signal"] == "BUY" else 0.25 if ai["signal"] == "SELL" else 0.50),
             "sources_analyzed": len(news) + 3,
             "timestamp": datetime.now().isoformat(),
             "price": price.get("price"),
@@ -869,66 +1022,97 @@ class handler(BaseHTTPRequestHandler):
             "source_breakdown": breakdown,
             "insights": ai.get("insights", ["Analysis complete"]),
             "news_headlines": [n.get("title", "")[:80] for n in news[:5]],
-            "using_real_data": using_real
+            "using_real_data": using_real,
+            "cache_ttl": policy["ttl"],
+            "market_status": policy["market"]
         }
     
+    @timed("fetch_news")
     def _fetch_news(self, ticker):
         import requests
         api_key = os.getenv("NEWS_API_KEY")
         if not api_key:
+            record_fallback("news", "no_key")
             return [{"title": f"{ticker} shows strong momentum", "source": "Reuters"}, {"title": f"Analysts upgrade {ticker}", "source": "Bloomberg"}]
+        failure = NEGATIVE_CACHE.check("news", ticker)
+        if failure is not None:
+            record_fallback("news", "negative_cache")
+            return [] if failure == "empty" else [{"title": f"{ticker} shows momentum", "source": "Reuters"}]
+        reason = "upstream_error"
         try:
-            resp = requests.get("https://newsapi.org/v2/everything", params={"q": f"{ticker} stock", "pageSize": 5, "language": "en", "apiKey": api_key}, timeout=8)
+            resp = requests.get(f"{NEWS_API_URL}/everything", params={"q": f"{ticker} stock", "sortBy": "publishedAt", "pageSize": min(NEWS_PAGE_SIZE, 100), "language": "en", "apiKey": api_key}, timeout=8)
             data = resp.json()
             if data.get("status") == "ok":
-                return [{"title": a.get("title", ""), "source": a.get("source", {}).get("name", "")} for a in data.get("articles", [])[:5]]
+                record_source("news", real=True)
+                articles = [{"title": a.get("title", ""), "source": a.get("source", {}).get("name", ""), "published": a.get("publishedAt", "")} for a in data.get("articles", [])]
+                if not articles:
+                    NEGATIVE_CACHE.record("news", ticker, "empty")
+                return collapse_duplicates(articles)
+            NEGATIVE_CACHE.record("news", ticker, news_failure(resp, data), retry_after(resp))
         except:
-            pass
+            reason = "exception"
+            NEGATIVE_CACHE.record("news", ticker, "upstream_error")
+        record_fallback("news", reason)
         return [{"title": f"{ticker} shows momentum", "source": "Reuters"}]
     
+    @timed("fetch_stock_price")
     def _fetch_price(self, ticker):
-        import requests
         import random
         prices = {"TSLA": 248.32, "AAPL": 178.45, "NVDA": 875.60, "GOOGL": 156.78, "GME": 12.34}
         api_key = os.getenv("ALPHA_VANTAGE_KEY")
         if not api_key:
+            record_fallback("alpha_vantage", "no_key")
+            return {"price": prices.get(ticker, round(random.uniform(50, 500), 2)), "change_percent": f"{random.uniform(-3, 3):+.2f}%"}
+        if NEGATIVE_CACHE.check("alpha_vantage", ticker) is not None:
+            record_fallback("alpha_vantage", "negative_cache")
             return {"price": prices.get(ticker, round(random.uniform(50, 500), 2)), "change_percent": f"{random.uniform(-3, 3):+.2f}%"}
         try:
-            resp = requests.get("https://www.alphavantage.co/query", params={"function": "GLOBAL_QUOTE", "symbol": ticker, "apikey": api_key}, timeout=8)
-            quote = resp.json().get("Global Quote", {})
-            if quote:
-                return {"price": float(quote.get("05. price", 0)), "change_percent": quote.get("10. change percent", "0%")}
+            quote = get_quote_service().get(ticker)
+            record_source("alpha_vantage", real=True)
+            return {"price": quote["price"], "change_percent": quote["change_percent"]}
+        except QuoteError as e:
+            reason = "empty" if e.failure == "unknown_symbol" else e.failure
         except:
-            pass
+            reason = "exception"
+        record_fallback("alpha_vantage", reason)
         return {"price": prices.get(ticker, round(random.uniform(50, 500), 2)), "change_percent": f"{random.uniform(-3, 3):+.2f}%"}
     
     def _openai(self, ticker, news):
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
+            record_fallback("openai", "no_key")
             return None
         try:
             from openai import OpenAI
             client = OpenAI(api_key=api_key)
-            news_text = "\n".join([f"- {n.get('title', '')}" for n in news[:5]])
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "system", "content": "Financial analyst. JSON only."}, {"role": "user", "content": f"Analyze {ticker}:\n{news_text}\n\nJSON: {{\"signal\": \"BUY/SELL/HOLD\", \"confidence\": 60-95, \"reasoning\": \"2-3 sentences\", \"insights\": [\"i1\", \"i2\", \"i3\"]}}"}],
-                max_tokens=200, temperature=0.3
-            )
-            content = response.choices[0].message.content.strip()
-            if "{" in content:
-                return json.loads(content[content.index("{"):content.rindex("}")+1])
+            builder = PromptBuilder("gpt-4o-mini", max_tokens=400, system="Financial analyst. JSON only.")
+            top_news = select_evidence(news, ticker, k=RANK_NEWS_K, count_tokens=builder.count)
+            builder.add_text(f"Analyze {ticker}:")
+            builder.add_list("news", "NEWS:", [n.get("title", "") + (f" (reported by {n['cluster_size']} outlets)" if n.get("cluster_size", 1) > 1 else "") for n in top_news], max_item_tokens=60)
+            builder.add_text("Signal, confidence 60-95, 2-3 sentence reasoning, 3 short insights.")
+            prompt, usage = builder.build()
+
+            def call(repairs, _on_field):
+                messages = [{"role": "system", "content": builder.system}, {"role": "user", "content": prompt}]
+                with timed("llm"):
+                    response = client.chat.completions.create(
+                        model="gpt-4o-mini",
+                        messages=messages + [{"role": "user", "content": r} for r in repairs],
+                        max_tokens=250, temperature=0.3, response_format=OPENAI_RESPONSE_FORMAT
+                    )
+                record_usage("openai", usage, response)
+                content = response.choices[0].message.content or ""
+                with timed("parse_json"):
+                    return parse_json_text(content), content
+
+            result = request_with_repair("openai", call)
+            record_source("openai", real=True)
+            return {**result, "insights": result["key_insights"] or ["Analysis complete"], "usage": usage}
         except Exception as e:
             print(f"OpenAI error: {e}")
+        record_fallback("openai", "error")
         return None
     
     def _fallback(self, ticker, news):
-        import random
-        text = " ".join([n.get("title", "") for n in news]).lower()
-        pos = sum(1 for w in ["bullish", "up", "growth", "beat", "strong"] if w in text)
-        neg = sum(1 for w in ["bearish", "down", "decline", "miss", "weak"] if w in text)
-        if pos > neg:
-            return {"signal": "BUY", "confidence": random.randint(72, 92), "reasoning": f"Bullish sentiment for {ticker}.", "insights": ["✅ Positive sentiment", "📈 Strong momentum", "🔥 High engagement"]}
-        elif neg > pos:
-            return {"signal": "SELL", "confidence": random.randint(65, 85), "reasoning": f"Bearish signals for {ticker}.", "insights": ["⚠️ Negative trend", "📉 Declining momentum", "❌ Weak fundamentals"]}
-        return {"signal": "HOLD", "confidence": random.randint(55, 70), "reasoning": f"Mixed signals for {ticker}.", "insights": ["⏸️ Mixed sentiment", "📊 Consolidation", "🔄 Wait for breakout"]}
+        from services.lexicon import lexicon_analysis
+        return lexicon_analysis(ticker, news, [])
@@ -0,0 +1,79 @@
+"""
+Sentient110 - Serialization Micro-Benchmark
+Compares the old response path (pydantic validation + stdlib json) with the fast path
+
+Usage:
+    python -m benchmarks.bench_serialization [--iterations 20000]
+"""
+
+import os
+import sys
+import json
+import timeit
+import argparse
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.serialization import dumps, JSON_BACKEND  # noqa: E402
+
+ANALYSIS = {
+    "ticker": "TSLA",
+    "signal": "BUY",
+    "confidence": 89,
+    "reasoning": "Strong bullish momentum driven by Cybertruck delivery announcements and multiple analyst upgrades.",
+    "sentiment_score": 0.85,
+    "sources_analyzed": 156,
+    "timestamp": datetime.now().isoformat(),
+    "price": 248.32,
+    "price_change": "+2.31%",
+    "source_breakdown": {"news": 82, "twitter": 88, "reddit": 91},
+    "insights": ["✅ Strong bullish momentum", "✅ Positive analyst coverage", "📈 Volume surge detected"],
+    "news_headlines": [f"Tesla headline number {i} about deliveries and upgrades" for i in range(5)],
+    "using_real_data": True,
+}
+
+TRENDING = {"trending": [
+    {"ticker": f"T{i}", "signal": "BUY", "confidence": 80 + i % 15, "price": 100.0 + i, "name": f"Company {i}"}
+    for i in range(50)
+]}
+
+
+def _bench(label: str, fn, iterations: int) -> float:
+    per_call = min(timeit.repeat(fn, number=iterations, repeat=5)) / iterations * 1e6
+    print(f"  {label:42s} {per_call:8.2f} µs")
+    return per_call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args(argv)
+    n = args.iterations
+
+    print(f"Fast backend: {JSON_BACKEND}\n")
+
+    print("Analysis response:")
+    try:
+        from main import AnalysisResponse, _trusted_response
+
+        base = _bench("pydantic validate + model_dump + json", lambda: json.dumps(
+            AnalysisResponse(**ANALYSIS).model_dump()).encode(), n)
+        fast = _bench("trusted dict + fast dumps", lambda: dumps(_trusted_response(**ANALYSIS)), n)
+    except ImportError as e:
+        print(f"  (main.py not importable: {e}; comparing serializers only)")
+        base = _bench("json.dumps().encode()", lambda: json.dumps(ANALYSIS).encode(), n)
+        fast = _bench("fast dumps", lambda: dumps(ANALYSIS), n)
+    print(f"  speedup: {base / fast:.1f}x\n")
+
+    print("Trending (50 tickers):")
+    base = _bench("json.dumps().encode()", lambda: json.dumps(TRENDING).encode(), n)
+    fast = _bench("fast dumps", lambda: dumps(TRENDING), n)
+    pre = dumps(TRENDING)
+    cached = _bench("pre-serialized bytes", lambda: pre, n)
+    print(f"  speedup: {base / fast:.1f}x (per request), {base / cached:.0f}x (pre-serialized)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Sentient110 - Cold-Start Benchmark
+Measures per-module import time (`python -X importtime`) for each entry point
+and fails when a cold start exceeds its budget or pulls in a heavy SDK eagerly
+
+Usage:
+    python -m benchmarks.bench_startup                # check against startup_budget.json
+    python -m benchmarks.bench_startup --top 15       # show the 15 slowest modules
+    python -m benchmarks.bench_startup --json out.json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(ROOT, "benchmarks", "startup_budget.json")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(entry: str, runs: int = 3) -> Dict:
+    """
+    Import `entry` in a fresh interpreter `runs` times and keep the fastest
+    run (least disturbed by the machine). Times are in milliseconds.
+    """
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {entry}"],
+            cwd=ROOT, capture_output=True, text=True,
+            env={**os.environ, "SENTIENT_PRELOAD": ""},
+        )
+        if proc.returncode != 0:
+            error = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))
+            raise RuntimeError(f"import {entry} failed:\n{error}")
+
+        modules = {}
+        for line in proc.stderr.splitlines():
+            match = _LINE.match(line)
+            if match:
+                self_us, cumulative_us, _, name = match.groups()
+                modules[name] = {"self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000}
+        # The entry's cumulative time covers everything it pulls in; sibling
+        # top-level entries (site, encodings) are interpreter boot, not ours.
+        total = modules[entry]["cumulative_ms"]
+        if best is None or total < best["total_ms"]:
+            best = {"entry": entry, "total_ms": round(total, 2), "modules": modules}
+    return best
+
+
+def slowest(result: Dict, top: int) -> List:
+    ranked = sorted(result["modules"].items(), key=lambda kv: kv[1]["self_ms"], reverse=True)
+    return ranked[:top]
+
+
+def check(result: Dict, budget: Dict) -> List[str]:
+    """Budget violations for one entry point."""
+    failures = []
+    limit = budget.get("max_ms")
+    if limit is not None and result["total_ms"] > limit:
+        failures.append(f"{result['entry']}: cold import {result['total_ms']:.0f}ms exceeds budget {limit}ms")
+    for name in budget.get("forbidden", []):
+        if name in result["modules"]:
+            failures.append(f"{result['entry']}: imports heavy module '{name}' at startup (should be lazy)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentient110 cold-start benchmark")
+    parser.add_argument("--budget", default=BUDGET_FILE)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", dest="json_out", default=None, help="write full per-module timings here")
+    args = parser.parse_args(argv)
+
+    with open(args.budget) as f:
+        budgets = json.load(f)
+
+    failures, report = [], {}
+    for entry, budget in budgets.items():
+        try:
+            result = measure(entry, args.runs)
+        except RuntimeError as e:
+            print(f"⚠️ {e}")
+            failures.append(f"{entry}: import failed")
+            continue
+        report[entry] = result
+        print(f"\n{entry}: {result['total_ms']:.1f}ms cold import (budget {budget.get('max_ms')}ms)")
+        for name, timing in slowest(result, args.top):
+            print(f"  {timing['self_ms']:8.2f}ms self  {timing['cumulative_ms']:8.2f}ms cum  {name}")
+        failures.extend(check(result, budget))
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if failures:
+        print("\n❌ Cold-start regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\n✅ All entry points within cold-start budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
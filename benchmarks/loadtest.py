@@ -0,0 +1,261 @@
+"""
+Sentient110 - End-to-End Load Test
+Drives main.py and api/index.py at a target RPS against local upstream stubs
+
+Usage:
+    python -m benchmarks.loadtest --target both --rps 20 --duration 30
+    python -m benchmarks.loadtest --target api --config benchmarks/profiles/slow_upstreams.json
+    python -m benchmarks.loadtest --target api --instances 3 --shared-cache
+
+Each run writes a JSON report (latency percentiles, throughput, cache hit
+rate, upstream call counts) to benchmarks/results/ so runs can be diffed
+across commits.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import random
+import argparse
+import logging
+import subprocess
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stubs import start_stubs, stub_env, RespStubServer  # noqa: E402
+
+logger = logging.getLogger("sentient110.bench.loadtest")
+
+DEFAULT_TICKERS = ["TSLA", "AAPL", "NVDA", "GOOGL", "GME", "META", "AMZN", "MSFT", "RELIANCE.BSE", "TCS.BSE"]
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+# ============= TARGET PROCESSES =============
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(base_url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/health", timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.2)
+    raise RuntimeError(f"Target at {base_url} did not become healthy within {timeout}s")
+
+
+def start_target(target: str, env: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    """Launch main.py (uvicorn) or api/index.py (stdlib server) as a subprocess."""
+    port = _free_port()
+    full_env = {**os.environ, **env}
+    if target == "main":
+        cmd = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+               "--port", str(port), "--log-level", "warning"]
+    elif target == "api":
+        cmd = [sys.executable, os.path.join(ROOT, "benchmarks", "serve_api.py"), str(port)]
+    else:
+        raise ValueError(f"Unknown target: {target}")
+
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=full_env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_healthy(base_url)
+    except Exception:
+        proc.terminate()
+        raise
+    return proc, base_url
+
+
+# ============= LOAD GENERATION =============
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def _one_request(base_url: str, ticker: str, scheduled: float, timeout: float) -> Dict:
+    body = json.dumps({"ticker": ticker}).encode()
+    req = urllib.request.Request(f"{base_url}/api/analyze", data=body,
+                                 headers={"Content-Type": "application/json"}, method="POST")
+    status, cached = 0, None
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            status = resp.status
+            payload = json.loads(resp.read() or b"{}")
+            cached = payload.get("cached")
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = -1
+    # Latency is measured from the *scheduled* send time so a backed-up
+    # client does not hide server slowness (coordinated omission).
+    return {"latency": time.perf_counter() - scheduled, "status": status, "cached": cached}
+
+
+def run_load(base_urls: List[str], rps: float, duration: float, tickers: List[str],
+             concurrency: int = 64, timeout: float = 30.0, seed: int = 0) -> Dict:
+    """
+    Open-loop load: requests are issued on a fixed schedule regardless of
+    completions, round-robin across `base_urls` (one per instance).
+    """
+    rng = random.Random(seed)
+    results = []
+    lock = threading.Lock()
+    total = int(rps * duration)
+    interval = 1.0 / rps
+
+    def record(future):
+        with lock:
+            results.append(future.result())
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            base_url = base_urls[i % len(base_urls)]
+            pool.submit(_one_request, base_url, rng.choice(tickers), scheduled, timeout).add_done_callback(record)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(r["latency"] * 1000 for r in results)
+    ok = [r for r in results if 200 <= r["status"] < 300]
+    cache_known = [r for r in ok if r["cached"] is not None]
+    cache_hits = sum(1 for r in cache_known if r["cached"])
+
+    return {
+        "requests": len(results),
+        "ok": len(ok),
+        "errors": len(results) - len(ok),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "p99": _percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+            "mean": sum(latencies) / len(latencies) if latencies else None,
+        },
+        "cache_hit_rate": round(cache_hits / len(cache_known), 4) if cache_known else None,
+    }
+
+
+# ============= REPORTING =============
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+
+def _fetch_json(url: str) -> Dict:
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def benchmark(target: str, args, profiles: Dict) -> Dict:
+    servers = start_stubs(profiles, seed=args.seed)
+    env = stub_env(servers)
+    redis = None
+    if args.shared_cache:
+        redis = RespStubServer().start()
+        env["REDIS_URL"] = redis.url
+    procs, base_urls = [], []
+    try:
+        for _ in range(args.instances):
+            proc, base_url = start_target(target, env)
+            procs.append(proc)
+            base_urls.append(base_url)
+        if args.warmup:
+            run_load(base_urls, args.rps, args.warmup, args.tickers, args.concurrency, args.timeout, args.seed + 1)
+            for server in servers.values():
+                server.stats.reset()
+
+        logger.info(f"🚀 {target} x{args.instances}: {args.rps} rps for {args.duration}s")
+        load = run_load(base_urls, args.rps, args.duration, args.tickers, args.concurrency, args.timeout, args.seed)
+        load["upstream_calls"] = {name: _fetch_json(f"{s.url}/__stats") for name, s in servers.items()}
+        load["upstream_calls_per_request"] = round(
+            sum(s["calls"] for s in load["upstream_calls"].values()) / load["requests"], 3
+        ) if load["requests"] else None
+        return load
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait(timeout=10)
+        for server in servers.values():
+            server.stop()
+        if redis:
+            redis.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentient110 end-to-end load test")
+    parser.add_argument("--target", choices=["main", "api", "both"], default="both")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=0.0, help="seconds of unmeasured load first")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--tickers", type=lambda s: s.split(","), default=DEFAULT_TICKERS)
+    parser.add_argument("--config", help="JSON file with per-upstream stub profiles")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--instances", type=int, default=1, help="target processes, requests round-robin across them")
+    parser.add_argument("--shared-cache", action="store_true", help="run a local Redis stand-in and share it via REDIS_URL")
+    parser.add_argument("--out", default=None, help="report path (default: benchmarks/results/<commit>-<ts>.json)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    config = json.load(open(args.config)) if args.config else {}
+    profiles = config.get("upstreams", config)
+
+    targets = ["main", "api"] if args.target == "both" else [args.target]
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "params": {
+            "rps": args.rps, "duration": args.duration, "warmup": args.warmup,
+            "concurrency": args.concurrency, "tickers": args.tickers, "seed": args.seed,
+            "instances": args.instances, "shared_cache": args.shared_cache,
+            "upstreams": profiles,
+        },
+        "targets": {target: benchmark(target, args, profiles) for target in targets},
+    }
+
+    out = args.out
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{report['commit'] or 'nogit'}-{int(time.time())}.json")
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for target, result in report["targets"].items():
+        lat = result["latency_ms"]
+        print(f"{target:5s} ok={result['ok']}/{result['requests']} thr={result['throughput_rps']} rps "
+              f"p50={lat['p50']:.1f}ms p95={lat['p95']:.1f}ms p99={lat['p99']:.1f}ms "
+              f"cache_hit={result['cache_hit_rate']} upstream/req={result['upstream_calls_per_request']}"
+              if lat["p50"] is not None else f"{target}: no successful requests")
+    print(f"📄 Report written to {out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
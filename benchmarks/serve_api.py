@@ -0,0 +1,28 @@
+"""
+Sentient110 - Local runner for the Vercel handler
+Serves api/index.py's `handler` on a threaded stdlib server, the way a warm instance would
+"""
+
+import os
+import sys
+from http.server import ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api.index import handler  # noqa: E402
+
+
+class QuietHandler(handler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int):
+    httpd = ThreadingHTTPServer(("127.0.0.1", port), QuietHandler)
+    httpd.daemon_threads = True
+    httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8001)
@@ -0,0 +1,446 @@
+"""
+Sentient110 - Upstream Stub Servers
+Local stand-ins for NewsAPI, Twitter, Alpha Vantage and OpenAI so load tests burn no quota,
+plus a tiny Redis-protocol server for exercising the shared analysis cache
+"""
+
+import json
+import random
+import threading
+import time
+import logging
+import socketserver
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger("sentient110.bench.stubs")
+
+
+@dataclass
+class StubProfile:
+    """
+    Behaviour of one stub upstream.
+
+    latency: "fixed", "uniform" or "lognormal"
+    latency_ms: fixed value / uniform low bound / lognormal median
+    latency_ms_high: uniform high bound (ignored otherwise)
+    latency_sigma: lognormal shape (0.5 gives a realistic long tail)
+    error_rate: share of requests answered with HTTP 500
+    rate_limit_rate: share of requests answered with HTTP 429
+    """
+    latency: str = "lognormal"
+    latency_ms: float = 80.0
+    latency_ms_high: float = 200.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+    def sample_delay(self, rng: random.Random) -> float:
+        """Draw one response delay in seconds."""
+        if self.latency == "fixed":
+            ms = self.latency_ms
+        elif self.latency == "uniform":
+            ms = rng.uniform(self.latency_ms, self.latency_ms_high)
+        else:
+            ms = rng.lognormvariate(0, self.latency_sigma) * self.latency_ms
+        return max(0.0, ms) / 1000
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "StubProfile":
+        known = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        return cls(**known)
+
+
+@dataclass
+class StubStats:
+    """Per-upstream call counters, read by the harness after a run."""
+    calls: int = 0
+    ok: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, outcome: str):
+        with self.lock:
+            self.calls += 1
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {"calls": self.calls, "ok": self.ok, "errors": self.errors, "rate_limited": self.rate_limited}
+
+    def reset(self):
+        with self.lock:
+            self.calls = self.ok = self.errors = self.rate_limited = 0
+
+
+# ============= CANNED PAYLOADS =============
+
+_HEADLINES = [
+    "{t} shows strong momentum as analysts upgrade outlook",
+    "{t} earnings beat expectations, revenue up 12%",
+    "{t} shares slip after guidance miss",
+    "Why {t} is trending on Wall Street today",
+    "{t} faces regulatory probe, stock declines",
+    "Institutional buying lifts {t} to weekly high",
+]
+
+_TWEETS = [
+    "${t} looking bullish, loading up 🚀",
+    "${t} breaking out, volume surge",
+    "Not touching ${t} until earnings, too weak",
+    "${t} dump incoming, bearish divergence",
+    "Holding ${t} long term, solid growth story",
+]
+
+
+def _news_payload(query: Dict, rng: random.Random) -> Dict:
+    ticker = query.get("q", ["STUB"])[0].split()[0]
+    size = int(query.get("pageSize", ["5"])[0])
+    articles = [
+        {
+            "title": rng.choice(_HEADLINES).format(t=ticker),
+            "description": "Stub article",
+            "source": {"name": rng.choice(["Reuters", "Bloomberg", "CNBC", "WSJ"])},
+            "url": f"https://stub.local/{ticker}/{i}",
+            "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - i * 600)),
+        }
+        for i in range(size)
+    ]
+    return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+
+TWEET_PAGES = 5
+
+
+def _tweets_payload(query: Dict, rng: random.Random) -> Dict:
+    ticker = query.get("query", ["$STUB"])[0].split()[0].lstrip("$")
+    size = int(query.get("max_results", ["5"])[0])
+    tweets = [
+        {
+            "id": str(rng.getrandbits(48)),
+            "text": rng.choice(_TWEETS).format(t=ticker),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - i * 60)),
+            "public_metrics": {"like_count": rng.randint(0, 500)},
+        }
+        for i in range(size)
+    ]
+    meta = {"result_count": len(tweets)}
+    # Paginate like search/recent: a few pages, then no next_token
+    page = int(query.get("next_token", ["0"])[0])
+    if page + 1 < TWEET_PAGES:
+        meta["next_token"] = str(page + 1)
+    return {"data": tweets, "meta": meta}
+
+
+def _quote_payload(query: Dict, rng: random.Random) -> Dict:
+    symbol = query.get("symbol", ["STUB"])[0]
+    if query.get("function", [""])[0] == "REALTIME_BULK_QUOTES":
+        return {"endpoint": "Realtime Bulk Quotes", "data": [
+            _bulk_row(s, rng) for s in symbol.split(",")
+        ]}
+    price = round(rng.uniform(10, 900), 2)
+    change = round(rng.uniform(-5, 5), 2)
+    return {"Global Quote": {
+        "01. symbol": symbol,
+        "05. price": f"{price:.4f}",
+        "06. volume": str(rng.randint(100000, 50000000)),
+        "09. change": f"{change:.4f}",
+        "10. change percent": f"{change / price * 100:.4f}%",
+    }}
+
+
+def _bulk_row(symbol: str, rng: random.Random) -> Dict:
+    price = round(rng.uniform(10, 900), 2)
+    change = round(rng.uniform(-5, 5), 2)
+    return {"symbol": symbol, "close": f"{price:.4f}", "change": f"{change:.4f}",
+            "change_percent": f"{change / price * 100:.4f}", "volume": str(rng.randint(100000, 50000000))}
+
+
+def _openai_payload(body: Dict, rng: random.Random) -> Dict:
+    signal = rng.choice(["BUY", "SELL", "HOLD"])
+    content = json.dumps({
+        "signal": signal,
+        "confidence": rng.randint(55, 95),
+        "reasoning": f"Stub analysis: sentiment is {signal.lower()}-leaning across sources.",
+        "sentiment_score": round(rng.random(), 2),
+        "news_sentiment": rng.randint(30, 90),
+        "social_sentiment": rng.randint(30, 90),
+        "key_insights": ["Stub insight 1", "Stub insight 2", "Stub insight 3"],
+    })
+    return {
+        "id": f"chatcmpl-stub-{rng.getrandbits(32):x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 250, "completion_tokens": 90, "total_tokens": 340},
+    }
+
+
+def _openai_stream_events(payload: Dict, chunk_chars: int = 12):
+    """A completion re-cut into chat.completion.chunk SSE events, as with stream=True."""
+    content = payload["choices"][0]["message"]["content"]
+    base = {"id": payload["id"], "object": "chat.completion.chunk", "created": payload["created"], "model": payload["model"]}
+    for i in range(0, len(content), chunk_chars):
+        delta = {"content": content[i:i + chunk_chars]}
+        yield {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+    yield {**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+
+
+# ============= SERVER =============
+
+class StubServer:
+    """One upstream stub on its own port, running in a daemon thread."""
+
+    def __init__(self, name: str, profile: StubProfile, port: int = 0, seed: Optional[int] = None):
+        self.name = name
+        self.profile = profile
+        self.stats = StubStats()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name=f"stub-{self.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"🧪 {self.name} stub listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self._dispatch(None)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) if length else b"{}"
+                try:
+                    body = json.loads(raw)
+                except ValueError:
+                    body = {}
+                self._dispatch(body)
+
+            def _dispatch(self, body):
+                parsed = urlparse(self.path)
+                if parsed.path == "/__stats":
+                    return self._reply(200, stub.stats.snapshot())
+                if parsed.path == "/__reset":
+                    stub.stats.reset()
+                    return self._reply(200, {"reset": True})
+
+                with stub._rng_lock:
+                    delay = stub.profile.sample_delay(stub._rng)
+                    roll = stub._rng.random()
+                    rng = random.Random(stub._rng.getrandbits(64))
+                time.sleep(delay)
+
+                if roll < stub.profile.rate_limit_rate:
+                    stub.stats.record("rate_limited")
+                    return self._reply(429, {"status": "error", "message": "rate limited"}, {"Retry-After": "1"})
+                if roll < stub.profile.rate_limit_rate + stub.profile.error_rate:
+                    stub.stats.record("errors")
+                    return self._reply(500, {"status": "error", "message": "stub failure"})
+
+                query = parse_qs(parsed.query)
+                if stub.name == "news":
+                    payload = _news_payload(query, rng)
+                elif stub.name == "twitter":
+                    payload = _tweets_payload(query, rng)
+                elif stub.name == "alpha_vantage":
+                    payload = _quote_payload(query, rng)
+                else:
+                    payload = _openai_payload(body or {}, rng)
+                    if (body or {}).get("stream"):
+                        stub.stats.record("ok")
+                        return self._reply_stream(_openai_stream_events(payload))
+                stub.stats.record("ok")
+                self._reply(200, payload)
+
+            def _reply_stream(self, events):
+                # Server-Sent Events without Content-Length; close ends the stream
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for event in events:
+                    self.wfile.write(b"data: " + json.dumps(event).encode() + b"\n\n")
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _reply(self, status, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+class RespStubServer:
+    """
+    In-memory Redis stand-in speaking RESP2: PING, AUTH, SELECT, GET,
+    SET [EX|PX], PTTL, DEL, DBSIZE, FLUSHDB. Enough for services.cache.
+    """
+
+    def __init__(self, port: int = 0):
+        self.data = {}  # key -> (value, expires_at or None)
+        self.lock = threading.Lock()
+        self.stats = {"commands": 0}
+        store = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        args = self._read_command()
+                    except (ConnectionError, ValueError):
+                        return
+                    if args is None:
+                        return
+                    self.wfile.write(store.execute(args))
+
+            def _read_command(self):
+                line = self.rfile.readline()
+                if not line:
+                    return None
+                if not line.startswith(b"*"):
+                    raise ValueError("inline commands unsupported")
+                args = []
+                for _ in range(int(line[1:-2])):
+                    length = int(self.rfile.readline()[1:-2])
+                    args.append(self.rfile.read(length + 2)[:-2])
+                return args
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self._server.server_address[1]}/0"
+
+    def start(self) -> "RespStubServer":
+        threading.Thread(target=self._server.serve_forever, name="stub-redis", daemon=True).start()
+        logger.info(f"🧪 redis stub listening on {self.url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            return None
+        return entry
+
+    def execute(self, args) -> bytes:
+        command = args[0].upper()
+        with self.lock:
+            self.stats["commands"] += 1
+            if command == b"PING":
+                return b"+PONG\r\n"
+            if command in (b"AUTH", b"SELECT", b"FLUSHDB"):
+                if command == b"FLUSHDB":
+                    self.data.clear()
+                return b"+OK\r\n"
+            if command == b"GET":
+                entry = self._live(args[1])
+                if entry is None:
+                    return b"$-1\r\n"
+                return b"$%d\r\n%s\r\n" % (len(entry[0]), entry[0])
+            if command == b"SET":
+                expires = None
+                if len(args) >= 5 and args[3].upper() in (b"PX", b"EX"):
+                    scale = 1000 if args[3].upper() == b"PX" else 1
+                    expires = time.time() + int(args[4]) / scale
+                self.data[args[1]] = (args[2], expires)
+                return b"+OK\r\n"
+            if command == b"PTTL":
+                entry = self._live(args[1])
+                if entry is None:
+                    return b":-2\r\n"
+                if entry[1] is None:
+                    return b":-1\r\n"
+                return b":%d\r\n" % int((entry[1] - time.time()) * 1000)
+            if command == b"DEL":
+                removed = sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+                return b":%d\r\n" % removed
+            if command == b"DBSIZE":
+                return b":%d\r\n" % len(self.data)
+        return b"-ERR unknown command\r\n"
+
+
+UPSTREAMS = ("news", "twitter", "alpha_vantage", "openai")
+
+
+def start_stubs(profiles: Dict[str, Dict] = None, seed: Optional[int] = None) -> Dict[str, StubServer]:
+    """Start all four upstream stubs. `profiles` maps upstream name -> StubProfile fields."""
+    profiles = profiles or {}
+    servers = {}
+    for i, name in enumerate(UPSTREAMS):
+        profile = StubProfile.from_dict(profiles.get(name, {}))
+        servers[name] = StubServer(name, profile, seed=None if seed is None else seed + i).start()
+    return servers
+
+
+def stub_env(servers: Dict[str, StubServer]) -> Dict[str, str]:
+    """Environment that points main.py / api/index.py at the stubs."""
+    return {
+        "NEWS_API_URL": f"{servers['news'].url}/v2",
+        "TWITTER_API_URL": f"{servers['twitter'].url}/2",
+        "ALPHA_VANTAGE_URL": f"{servers['alpha_vantage'].url}/query",
+        "OPENAI_BASE_URL": f"{servers['openai'].url}/v1",
+        "NEWS_API_KEY": "stub",
+        "TWITTER_BEARER_TOKEN": "stub",
+        "ALPHA_VANTAGE_KEY": "stub",
+        "OPENAI_API_KEY": "stub",
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Run the upstream stubs standalone")
+    parser.add_argument("--config", help="JSON file mapping upstream name -> profile")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = json.load(open(args.config)) if args.config else {}
+    running = start_stubs(config.get("upstreams", config), seed=args.seed)
+    for key, value in stub_env(running).items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in running.values():
+            server.stop()
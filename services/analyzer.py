@@ -4,34 +4,71 @@ Fast local sentiment analysis using HuggingFace transformers
 """
 
 import logging
-from typing import List, Dict, Optional
-from transformers import pipeline
+import threading
+from itertools import islice
+from typing import List, Dict, Iterable, Optional
 
 logger = logging.getLogger("sentient110.analyzer")
 
+# Map model labels
+LABEL_MAP = {
+    "LABEL_0": "negative",
+    "LABEL_1": "neutral",
+    "LABEL_2": "positive"
+}
+
 
 class SentimentAnalyzer:
     """
     RoBERTa-based sentiment analyzer for financial text.
     Uses cardiffnlp/twitter-roberta-base-sentiment model.
+    
+    `transformers` and the model weights are loaded on first use, not at
+    construction, so importing or instantiating this is cheap. Call
+    `preload()` in long-running workers to pay that cost up front.
     """
     
-    def __init__(self):
-        self.model = None
+    def __init__(self, preload: bool = False):
+        self._model = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        if preload:
+            self.preload()
+    
+    @property
+    def model(self):
+        if not self._loaded:
+            self._load_model()
+        return self._model
+    
+    def preload(self) -> "SentimentAnalyzer":
+        """Load the model now instead of on the first analysis."""
         self._load_model()
+        return self
     
     def _load_model(self):
-        """Load the RoBERTa sentiment model."""
-        try:
-            logger.info("🧠 Loading RoBERTa sentiment model...")
-            self.model = pipeline(
-                "sentiment-analysis",
-                model="cardiffnlp/twitter-roberta-base-sentiment"
-            )
-            logger.info("✅ Model loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load model: {e}")
-            self.model = None
+        """
+        Load the RoBERTa sentiment model, once. Concurrent first callers
+        wait for the load instead of seeing `_loaded` with no model yet.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                from transformers import pipeline
+                
+                logger.info("🧠 Loading RoBERTa sentiment model...")
+                self._model = pipeline(
+                    "sentiment-analysis",
+                    model="cardiffnlp/twitter-roberta-base-sentiment"
+                )
+                logger.info("✅ Model loaded successfully")
+            except Exception as e:
+                logger.error(f"❌ Failed to load model: {e}")
+                self._model = None
+            self._loaded = True
     
     def analyze_text(self, text: str) -> Dict:
         """
@@ -46,25 +83,28 @@ class SentimentAnalyzer:
         if not self.model:
             return {"label": "neutral", "score": 0.5}
         
+        return self.analyze_texts([text])[0]
+    
+    def analyze_texts(self, texts: List[str]) -> List[Dict]:
+        """
+        Analyze several texts in one model call.
+        
+        Returns:
+            [{"label": ..., "score": ...}, ...] in input order
+        """
+        if not self.model:
+            return [{"label": "neutral", "score": 0.5} for _ in texts]
+        
         try:
             # Truncate long text
-            text = text[:512]
-            result = self.model(text)[0]
-            
-            # Map labels
-            label_map = {
-                "LABEL_0": "negative",
-                "LABEL_1": "neutral", 
-                "LABEL_2": "positive"
-            }
-            
-            return {
-                "label": label_map.get(result["label"], result["label"]),
-                "score": result["score"]
-            }
+            results = self.model([text[:512] for text in texts])
+            return [
+                {"label": LABEL_MAP.get(r["label"], r["label"]), "score": r["score"]}
+                for r in results
+            ]
         except Exception as e:
             logger.error(f"Analysis error: {e}")
-            return {"label": "neutral", "score": 0.5}
+            return [{"label": "neutral", "score": 0.5} for _ in texts]
     
     def analyze_batch(self, texts: List[str]) -> Dict:
         """
@@ -81,31 +121,44 @@ class SentimentAnalyzer:
                 "score": 0-1 (overall bullishness)
             }
         """
-        if not texts:
-            return {"positive": 0.33, "negative": 0.33, "neutral": 0.34, "score": 0.5}
+        return self.analyze_stream(texts, limit=50)  # Limit for performance
+    
+    def analyze_stream(self, texts: Iterable[str], limit: Optional[int] = None, chunk_size: int = 16) -> Dict:
+        """
+        Aggregate sentiment over any iterable of texts (e.g. a paginated
+        tweet stream) without materializing it: texts are scored in model
+        batches of `chunk_size` and only running totals are kept.
         
+        Returns:
+            Same shape as analyze_batch, plus "count" (texts scored)
+        """
         counts = {"positive": 0, "negative": 0, "neutral": 0}
-        weighted_score = 0
+        weighted_score = 0.0
+        total = 0
         
-        for text in texts[:50]:  # Limit for performance
-            result = self.analyze_text(text)
-            label = result["label"]
-            score = result["score"]
-            
-            counts[label] = counts.get(label, 0) + 1
-            
-            if label == "positive":
-                weighted_score += score
-            elif label == "negative":
-                weighted_score -= score
+        stream = iter(texts if limit is None else islice(texts, limit))
+        while True:
+            chunk = list(islice(stream, chunk_size))
+            if not chunk:
+                break
+            for result in self.analyze_texts(chunk):
+                label = result["label"]
+                counts[label] = counts.get(label, 0) + 1
+                if label == "positive":
+                    weighted_score += result["score"]
+                elif label == "negative":
+                    weighted_score -= result["score"]
+            total += len(chunk)
         
-        total = len(texts[:50])
+        if not total:
+            return {"positive": 0.33, "negative": 0.33, "neutral": 0.34, "score": 0.5, "count": 0}
         
         return {
             "positive": counts["positive"] / total,
             "negative": counts["negative"] / total,
             "neutral": counts["neutral"] / total,
-            "score": (weighted_score / total + 1) / 2  # Normalize to 0-1
+            "score": (weighted_score / total + 1) / 2,  # Normalize to 0-1
+            "count": total
         }
     
     def get_signal(self, texts: List[str]) -> str:
@@ -128,10 +181,20 @@ class SentimentAnalyzer:
             return "HOLD"
 
 
+_shared_analyzer = None
+
+
+def get_analyzer() -> SentimentAnalyzer:
+    """Process-wide analyzer, so the model is loaded at most once."""
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        _shared_analyzer = SentimentAnalyzer()
+    return _shared_analyzer
+
+
 def analyze_sentiment(texts: List[str]) -> Dict:
     """Convenience function."""
-    analyzer = SentimentAnalyzer()
-    return analyzer.analyze_batch(texts)
+    return get_analyzer().analyze_batch(texts)
 
 
 if __name__ == "__main__":
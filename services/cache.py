@@ -0,0 +1,393 @@
+"""
+Sentient110 - Analysis Cache
+Pluggable cache backends with a two-tier design: a small in-process L1 in
+front of a shared L2 (Redis protocol), so serverless instances share results
+"""
+
+import os
+import time
+import heapq
+import socket
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from services.serialization import dumps, loads
+
+logger = logging.getLogger("sentient110.cache")
+
+CACHE_TTL = int(os.getenv("CACHE_TTL", 600))  # 10 minutes
+CACHE_L1_SIZE = int(os.getenv("CACHE_L1_SIZE", 256))
+# L1 copies are re-read from L2 at least this often, so deletes/overwrites
+# on another instance propagate within this bound
+CACHE_L1_MAX_TTL = float(os.getenv("CACHE_L1_MAX_TTL", 30))
+REDIS_URL = os.getenv("REDIS_URL", "")
+REDIS_TIMEOUT = float(os.getenv("REDIS_TIMEOUT", 0.25))
+
+
+class CacheBackend:
+    """Interface for shared (L2) cache backends. Values are JSON-serializable."""
+
+    name = "base"
+
+    def get_with_ttl(self, key: str) -> Tuple[Optional[Any], float]:
+        """(value, remaining seconds), or (None, 0) on a miss."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_with_ttl(key)[0]
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local backend; the default when no shared store is configured."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def get_with_ttl(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None, 0.0
+        remaining = entry[1] - time.time()
+        if remaining <= 0:
+            with self._lock:
+                self._data.pop(key, None)
+            return None, 0.0
+        return entry[0], remaining
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class BoundedMemoryBackend(MemoryBackend):
+    """
+    MemoryBackend for keys that may never be read again (one-off failures),
+    where expiry on read alone would keep them forever. Expiry is indexed
+    in a min-heap of (expires, key) as in sessions.SessionStore: every write
+    purges the expired heads, and beyond `max_entries` the entries closest
+    to expiry are dropped first. `len()` counts live entries only.
+    """
+
+    name = "bounded_memory"
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self._expiry_heap = []
+        self.evicted = 0
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._data[key] = (value, now + ttl)
+            heapq.heappush(self._expiry_heap, (now + ttl, key))
+            self._purge(now)
+            while len(self._data) > self.max_entries:
+                if self._pop_head():
+                    self.evicted += 1
+            # Overwritten keys leave stale heap entries behind; rebuild
+            # the index before they outnumber the live ones
+            if len(self._expiry_heap) > 2 * self.max_entries:
+                self._expiry_heap = [(expires, k) for k, (_, expires) in self._data.items()]
+                heapq.heapify(self._expiry_heap)
+
+    def _pop_head(self) -> bool:
+        """Drop the heap's first entry; False if it was stale (key deleted or rewritten)."""
+        expires, key = heapq.heappop(self._expiry_heap)
+        entry = self._data.get(key)
+        if entry is not None and entry[1] == expires:
+            del self._data[key]
+            return True
+        return False
+
+    def _purge(self, now: float):
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            self._pop_head()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._expiry_heap.clear()
+
+    def __len__(self):
+        with self._lock:
+            self._purge(time.time())
+            return len(self._data)
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend(CacheBackend):
+    """
+    Minimal Redis-protocol (RESP2) client over a socket (TLS for rediss://),
+    so it needs no extra dependency on Vercel and works against Redis,
+    Valkey, KeyDB, Upstash or a local stand-in. One connection per thread.
+    Errors are logged and treated as misses: the L1 keeps serving.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, timeout: float = REDIS_TIMEOUT, prefix: str = "sentient110:"):
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "rediss"):
+            raise ValueError(f"REDIS_URL must be redis:// or rediss://, not {parsed.scheme or 'no scheme'}")
+        self.tls = parsed.scheme == "rediss"
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.prefix = prefix
+        self._local = threading.local()
+        self.errors = 0
+
+    # ----- connection / protocol -----
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.tls:
+            import ssl
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        try:
+            if self.password:
+                self._execute(("AUTH", self.password))
+            if self.db:
+                self._execute(("SELECT", str(self.db)))
+        except RedisError:
+            self._close()  # don't reuse an unauthenticated connection
+            raise
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        out = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            out.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        return b"".join(out)
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise RedisError(f"unexpected reply: {line!r}")
+
+    def _execute(self, *commands):
+        """
+        Send commands as one pipeline and return their replies. Every reply
+        is read before an error reply is raised, so none is left behind to
+        be taken as the answer to the next command.
+        """
+        self._local.sock.sendall(b"".join(self._encode(*cmd) for cmd in commands))
+        replies, error = [], None
+        for _ in commands:
+            try:
+                replies.append(self._read_reply())
+            except RedisError as e:
+                replies.append(None)
+                error = error or e
+        if error is not None:
+            raise error
+        return replies
+
+    def _pipeline(self, *commands):
+        for attempt in (0, 1):
+            try:
+                if getattr(self._local, "sock", None) is None:
+                    self._connect()
+                return self._execute(*commands)
+            except RedisError:
+                raise
+            except (OSError, ConnectionError, ValueError) as e:
+                # Timeouts and garbled replies leave the stream mid-reply: reconnect
+                self._close()
+                if attempt:
+                    raise RedisError(str(e))
+
+    # ----- CacheBackend -----
+
+    def get_with_ttl(self, key):
+        try:
+            raw, pttl = self._pipeline(("GET", self.prefix + key), ("PTTL", self.prefix + key))
+        except RedisError as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Redis GET failed: {e}")
+            return None, 0.0
+        # PTTL is -2 if the key expired since the GET, -1 for keys without
+        # expiry (not written by this client), which get the default TTL
+        if raw is None or pttl == -2 or pttl == 0:
+            return None, 0.0
+        try:
+            value = loads(raw)
+        except Exception as e:  # whichever decoder serialization picked
+            self.errors += 1
+            logger.warning(f"⚠️ Redis value for {key} isn't JSON: {e}")
+            return None, 0.0
+        return value, (pttl / 1000 if pttl > 0 else float(CACHE_TTL))
+
+    def set(self, key, value, ttl):
+        try:
+            self._pipeline(("SET", self.prefix + key, dumps(value), "PX", int(ttl * 1000)))
+        except RedisError as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Redis SET failed: {e}")
+
+    def delete(self, key):
+        try:
+            self._pipeline(("DEL", self.prefix + key))
+        except RedisError as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Redis DEL failed: {e}")
+
+
+class TwoTierCache:
+    """
+    Bounded LRU L1 in front of an optional shared L2.
+
+    TTLs stay consistent: an L1 copy never outlives the L2 entry it came
+    from (its expiry is the L2's remaining TTL, capped at CACHE_L1_MAX_TTL),
+    so every instance sees the same freshness and a write on one instance
+    reaches the others' L1 within the cap.
+    """
+
+    def __init__(self, l2: CacheBackend = None, ttl: float = CACHE_TTL,
+                 l1_size: int = CACHE_L1_SIZE, l1_max_ttl: float = CACHE_L1_MAX_TTL):
+        self.l2 = l2
+        self.ttl = ttl
+        self.l1_size = l1_size
+        # Without a shared tier, L1 is the only copy and keeps the full TTL
+        self.l1_max_ttl = l1_max_ttl if l2 is not None else float("inf")
+        self._l1: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.l1_hits = self.l2_hits = self.misses = 0
+
+    def _l1_put(self, key: str, value: Any, expires: float, l1_expires: float):
+        with self._lock:
+            self._l1[key] = (value, expires, l1_expires)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_with_ttl(key)[0]
+
+    def get_with_ttl(self, key: str) -> Tuple[Optional[Any], float]:
+        """(value, remaining seconds) or (None, 0)."""
+        now = time.time()
+        entry = self._l1.get(key)
+        if entry is not None:
+            value, expires, l1_expires = entry
+            if now < l1_expires:
+                with self._lock:
+                    if key in self._l1:
+                        self._l1.move_to_end(key)
+                    self.l1_hits += 1
+                return value, expires - now
+            with self._lock:
+                self._l1.pop(key, None)
+
+        if self.l2 is not None:
+            value, remaining = self.l2.get_with_ttl(key)
+            if value is not None:
+                expires = now + remaining
+                self._l1_put(key, value, expires, now + min(remaining, self.l1_max_ttl))
+                self.l2_hits += 1
+                return value, remaining
+
+        self.misses += 1
+        return None, 0.0
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        now = time.time()
+        if self.l2 is not None:
+            self.l2.set(key, value, ttl)
+        self._l1_put(key, value, now + ttl, now + min(ttl, self.l1_max_ttl))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._l1.pop(key, None)
+        if self.l2 is not None:
+            self.l2.delete(key)
+
+    def __len__(self) -> int:
+        return len(self._l1)
+
+    def stats(self) -> Dict:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "backend": self.l2.name if self.l2 is not None else "memory",
+            "l1_size": len(self._l1),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.l1_hits + self.l2_hits) / lookups, 4) if lookups else None,
+            "l2_errors": getattr(self.l2, "errors", 0),
+        }
+
+
+def shared_backend() -> Optional[CacheBackend]:
+    """The REDIS_URL store shared by all instances, or None when there is none."""
+    if not REDIS_URL:
+        return None
+    try:
+        return RedisBackend(REDIS_URL)
+    except ValueError as e:
+        logger.error(f"❌ {e}; shared cache disabled")
+        return None
+
+
+def create_cache(ttl: float = CACHE_TTL) -> TwoTierCache:
+    """Two-tier cache backed by REDIS_URL when set, L1-only otherwise."""
+    backend = shared_backend()
+    if backend is not None:
+        logger.info(f"✅ Shared analysis cache: Redis{' (TLS)' if backend.tls else ''}")
+    return TwoTierCache(backend, ttl=ttl)
@@ -5,20 +5,41 @@ Deep analysis using Anthropic's Claude 3.5 Haiku
 
 import os
 import json
+import random
 import logging
-from typing import Optional
-from anthropic import Anthropic
+from typing import Dict, List, Optional
+
+from services.ranking import select_evidence, RANK_NEWS_K, RANK_SOCIAL_K
+from services.prompt_builder import PromptBuilder, record_usage
+from services.llm_router import ProviderUnavailable, stream_fields
+from services.schema import ANTHROPIC_TOOL, ANTHROPIC_TOOL_CHOICE, request_with_repair, arequest_with_repair
 
 logger = logging.getLogger("sentient110.claude")
 
+MODEL = "claude-3-haiku-20240307"
+MAX_COMPLETION_TOKENS = 500
+
+# Async path: in-flight requests per event loop, sized to the account's
+# rate tier, and how often a 429/529 is retried before giving up
+ANTHROPIC_MAX_CONCURRENCY = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", 4))
+ANTHROPIC_RATE_LIMIT_RETRIES = int(os.getenv("ANTHROPIC_RATE_LIMIT_RETRIES", 3))
+# Longest retry-after we are willing to sleep; beyond it the call fails
+ANTHROPIC_MAX_RETRY_WAIT = float(os.getenv("ANTHROPIC_MAX_RETRY_WAIT", 30))
+_RETRY_STATUSES = (429, 529)  # rate limited, overloaded
+
 # Initialize client
 client = None
+async_client = None
+# event loop -> asyncio.Semaphore; asyncio and weakref are imported on first
+# async use, outside the module's cold-start budget
+_semaphores = None
 
 def init_claude():
-    """Initialize the Claude client."""
+    """Initialize the Claude client (imports the anthropic SDK on first use)."""
     global client
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if api_key:
+        from anthropic import Anthropic
         client = Anthropic(api_key=api_key)
         logger.info("✅ Claude AI initialized")
         return True
@@ -45,76 +66,202 @@ def analyze_with_claude(ticker: str, news_texts: list, social_texts: list, price
             "sentiment_score": 0-1
         }
     """
-    global client
+    try:
+        return request_analysis(ticker, news_texts, social_texts, price)
+    except ProviderUnavailable:
+        return _demo_result(ticker)
+    except Exception as e:
+        logger.error(f"Claude analysis failed: {e}")
+        return _error_result()
+
+
+def _demo_result(ticker: str) -> dict:
+    return {
+        "signal": "HOLD",
+        "confidence": 65,
+        "reasoning": f"Demo mode: Unable to connect to Claude AI. Based on simulated analysis of {ticker}.",
+        "sentiment_score": 0.5
+    }
+
+
+def _error_result() -> dict:
+    return {
+        "signal": "HOLD",
+        "confidence": 50,
+        "reasoning": f"Analysis temporarily unavailable. Please try again.",
+        "sentiment_score": 0.5
+    }
+
+
+def is_available() -> bool:
+    return client is not None or bool(os.getenv("ANTHROPIC_API_KEY"))
+
+
+def request_analysis(ticker: str, news_texts: list, social_texts: list, price: float = None,
+                     cancel=None, on_field=None) -> dict:
+    """
+    One Claude analysis with no fallback: raises ProviderUnavailable without
+    a key and propagates API or parse errors to the caller. Streams the
+    completion; `on_field(key, value)` gets each field as it completes.
+    """
+    if not client and not init_claude():
+        raise ProviderUnavailable("anthropic")
     
-    if not client:
-        init_claude()
+    prompt, usage = _build_prompt(ticker, news_texts, social_texts, price)
     
-    if not client:
-        # Demo mode fallback
-        return {
-            "signal": "HOLD",
-            "confidence": 65,
-            "reasoning": f"Demo mode: Unable to connect to Claude AI. Based on simulated analysis of {ticker}.",
-            "sentiment_score": 0.5
-        }
+    def call(repairs, on_field):
+        # Forced tool use: the reply is the tool input, streamed as JSON deltas
+        with client.messages.stream(**_request_params(prompt, repairs)) as stream:
+            deltas = (event.delta.partial_json for event in stream
+                      if event.type == "content_block_delta" and event.delta.type == "input_json_delta")
+            fields, content = stream_fields(deltas, on_field=on_field, cancel=cancel)
+            response = stream.get_final_message()
+        record_usage("anthropic", usage, response)
+        return fields, content
     
-    # Prepare the prompt
-    prompt = f"""You are a financial sentiment analyst. Analyze the following data for {ticker} and provide a trading recommendation.
+    return _result(request_with_repair("anthropic", call, on_field=on_field), usage)
 
-CURRENT PRICE: ${price if price else 'Unknown'}
 
-NEWS HEADLINES ({len(news_texts)} sources):
-{chr(10).join([f"- {text[:200]}" for text in news_texts[:10]])}
+def _build_prompt(ticker: str, news_texts: list, social_texts: list, price: float = None):
+    """(prompt, usage) for one ticker: most informative items first, token-bounded."""
+    builder = PromptBuilder(MODEL)
+    top_news = select_evidence(news_texts, ticker, k=RANK_NEWS_K * 2, max_item_tokens=50, count_tokens=builder.count)
+    top_social = select_evidence(social_texts, ticker, k=RANK_SOCIAL_K * 2, max_item_tokens=40, count_tokens=builder.count)
+    
+    builder.add_text(f"""You are a financial sentiment analyst. Analyze the following data for {ticker} and provide a trading recommendation.
 
-SOCIAL MEDIA SENTIMENT ({len(social_texts)} posts):
-{chr(10).join([f"- {text[:150]}" for text in social_texts[:10]])}
+CURRENT PRICE: ${price if price else 'Unknown'}""")
+    builder.add_list("news", f"NEWS HEADLINES ({len(news_texts)} sources):", top_news, share=0.6, max_item_tokens=50)
+    builder.add_list("social", f"SOCIAL MEDIA SENTIMENT ({len(social_texts)} posts):", top_social, share=0.4, max_item_tokens=40)
+    builder.add_text(f"Based on this data, record your analysis with the {ANTHROPIC_TOOL['name']} tool.")
+    return builder.build()
 
-Based on this data, provide your analysis in the following JSON format ONLY (no other text):
-{{
-    "signal": "BUY" or "SELL" or "HOLD",
-    "confidence": 0-100,
-    "reasoning": "2-3 sentence explanation in plain English",
-    "sentiment_score": 0.0-1.0 (0=very bearish, 1=very bullish)
-}}
-"""
+
+def _request_params(prompt: str, repairs: List[str]) -> dict:
+    # Repair notes ride along in the same user turn
+    return {
+        "model": MODEL,
+        "max_tokens": MAX_COMPLETION_TOKENS,
+        "messages": [{"role": "user", "content": "\n\n".join([prompt] + repairs)}],
+        "tools": [ANTHROPIC_TOOL],
+        "tool_choice": ANTHROPIC_TOOL_CHOICE,
+    }
+
+
+def _result(result: dict, usage: dict) -> dict:
+    return {
+        "signal": result["signal"],
+        "confidence": result["confidence"],
+        "reasoning": result["reasoning"],
+        "sentiment_score": result["sentiment_score"],
+        "news_sentiment": result["news_sentiment"],
+        "social_sentiment": result["social_sentiment"],
+        "insights": result["key_insights"],
+        "usage": usage
+    }
+
+
+# ============= ASYNC =============
+
+def get_async_client():
+    """Shared AsyncAnthropic client, or None without a key. SDK retries are off: 429s are handled below."""
+    global async_client
+    if async_client is None:
+        api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            return None
+        from anthropic import AsyncAnthropic
+        async_client = AsyncAnthropic(api_key=api_key, max_retries=0)
+    return async_client
+
+
+def _semaphore() -> "asyncio.Semaphore":
+    # Semaphores bind to the loop they are first used on; keep one per loop
+    global _semaphores
+    import asyncio
+    if _semaphores is None:
+        import weakref
+        _semaphores = weakref.WeakKeyDictionary()
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(ANTHROPIC_MAX_CONCURRENCY)
+    return semaphore
+
+
+def _retry_after(error, attempt: int) -> float:
+    """Seconds to wait before retrying: the server's retry-after, else jittered backoff."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return min(ANTHROPIC_MAX_RETRY_WAIT, 2 ** attempt) * (0.5 + random.random() / 2)
+
+
+async def _create(client, params: dict):
+    """messages.create under the concurrency limit, retrying 429/529 after retry-after."""
+    from anthropic import APIStatusError
+    for attempt in range(ANTHROPIC_RATE_LIMIT_RETRIES + 1):
+        async with _semaphore():
+            try:
+                return await client.messages.create(**params)
+            except APIStatusError as e:
+                if e.status_code not in _RETRY_STATUSES or attempt == ANTHROPIC_RATE_LIMIT_RETRIES:
+                    raise
+                status, wait = e.status_code, _retry_after(e, attempt)
+                if wait > ANTHROPIC_MAX_RETRY_WAIT:
+                    raise
+        # Sleep outside the semaphore so queued calls for other tickers aren't held up
+        logger.warning(f"⏳ Claude returned {status}, retrying in {wait:.1f}s")
+        import asyncio
+        await asyncio.sleep(wait)
+
+
+async def request_analysis_async(ticker: str, news_texts: list, social_texts: list, price: float = None) -> dict:
+    """Async `request_analysis`: no fallback, raises ProviderUnavailable or the API/parse error."""
+    client = get_async_client()
+    if client is None:
+        raise ProviderUnavailable("anthropic")
+    
+    prompt, usage = _build_prompt(ticker, news_texts, social_texts, price)
     
+    async def call(repairs):
+        response = await _create(client, _request_params(prompt, repairs))
+        record_usage("anthropic", usage, response)
+        tool_input = next((block.input for block in response.content if block.type == "tool_use"), None)
+        return tool_input, json.dumps(tool_input) if tool_input is not None else ""
+    
+    return _result(await arequest_with_repair("anthropic", call), usage)
+
+
+async def analyze_with_claude_async(ticker: str, news_texts: list, social_texts: list, price: float = None) -> dict:
+    """
+    `analyze_with_claude` for async callers (FastAPI handlers): the HTTP call
+    is awaited, never run on the event loop's thread, and at most
+    ANTHROPIC_MAX_CONCURRENCY requests are in flight at once.
+    """
     try:
-        response = client.messages.create(
-            model="claude-3-haiku-20240307",
-            max_tokens=500,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        # Parse response
-        content = response.content[0].text.strip()
-        
-        # Try to extract JSON
-        if "{" in content:
-            json_start = content.index("{")
-            json_end = content.rindex("}") + 1
-            json_str = content[json_start:json_end]
-            result = json.loads(json_str)
-            
-            return {
-                "signal": result.get("signal", "HOLD"),
-                "confidence": min(100, max(0, result.get("confidence", 50))),
-                "reasoning": result.get("reasoning", "Analysis complete."),
-                "sentiment_score": min(1.0, max(0.0, result.get("sentiment_score", 0.5)))
-            }
-        else:
-            raise ValueError("No JSON in response")
-            
+        return await request_analysis_async(ticker, news_texts, social_texts, price)
+    except ProviderUnavailable:
+        return _demo_result(ticker)
     except Exception as e:
-        logger.error(f"Claude analysis failed: {e}")
-        return {
-            "signal": "HOLD",
-            "confidence": 50,
-            "reasoning": f"Analysis temporarily unavailable. Please try again.",
-            "sentiment_score": 0.5
-        }
+        logger.error(f"Claude analysis failed for {ticker}: {e}")
+        return _error_result()
+
+
+async def analyze_many_with_claude(requests: List[Dict]) -> List[Dict]:
+    """
+    Analyze many tickers concurrently. Each request is a dict with `ticker`
+    and optional `news_texts`, `social_texts` and `price`; results come back
+    in the same order, with per-ticker fallbacks instead of exceptions.
+    """
+    import asyncio
+    return await asyncio.gather(*(
+        analyze_with_claude_async(
+            r["ticker"], r.get("news_texts", []), r.get("social_texts", []), r.get("price")
+        )
+        for r in requests
+    ))
 
 
 if __name__ == "__main__":
@@ -5,34 +5,66 @@ Fetches real data from NewsAPI, Twitter, Alpha Vantage with rate limiting and fa
 
 import os
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import requests
 
+from services.metrics import timed, record_source, record_fallback
+from services.dedup import collapse_duplicates
+from services.hybrid import score_stream
+from services.negative_cache import NEGATIVE_CACHE, retry_after, news_failure
+from services.quotes import get_quote_service, QuoteError
+
 load_dotenv()
 logger = logging.getLogger("sentient110.data")
 
 # Rate limits
 MAX_NEWS = int(os.getenv("MAX_NEWS_PER_REQUEST", 5))
 MAX_TWEETS = int(os.getenv("MAX_TWEETS_PER_REQUEST", 5))
+# Articles requested per NewsAPI call: syndicated copies are collapsed
+# before the first MAX_NEWS stories are kept, so fetch more than that
+NEWS_PAGE_SIZE = int(os.getenv("NEWS_PAGE_SIZE", 20))
+# Tweets pulled by the streaming ingestion path (iter_tweets)
+TWEET_SAMPLE_SIZE = int(os.getenv("TWEET_SAMPLE_SIZE", 100))
+
+# Upstream endpoints (overridable so benchmarks can point at local stubs;
+# ALPHA_VANTAGE_URL is read by services.quotes)
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2")
+TWITTER_API_URL = os.getenv("TWITTER_API_URL", "https://api.twitter.com/2")
+
+
+def _suppressed(source: str, ticker: str) -> Optional[str]:
+    """Failure class if `source` recently failed for `ticker`; the caller falls back without calling it."""
+    failure = NEGATIVE_CACHE.check(source, ticker)
+    if failure is not None:
+        logger.info(f"🚫 Skipping {source} for {ticker} ({failure}, negative cache)")
+        record_fallback(source, "negative_cache")
+    return failure
+
 
 # ============= NEWS API =============
 
+@timed("fetch_news")
 def fetch_news(ticker: str, limit: int = 5) -> List[Dict]:
     """Fetch news from NewsAPI with fallback."""
     api_key = os.getenv("NEWS_API_KEY")
     
     if not api_key:
         logger.warning("No NEWS_API_KEY, using fallback")
+        record_fallback("news", "no_key")
         return _mock_news(ticker)
     
+    failure = _suppressed("news", ticker)
+    if failure is not None:
+        return [] if failure == "empty" else _mock_news(ticker)
+    
     try:
-        url = "https://newsapi.org/v2/everything"
+        url = f"{NEWS_API_URL}/everything"
         params = {
             "q": f"{ticker} stock",
             "sortBy": "publishedAt",
-            "pageSize": min(limit, MAX_NEWS),
+            "pageSize": min(max(limit, NEWS_PAGE_SIZE), 100),
             "language": "en",
             "apiKey": api_key
         }
@@ -42,11 +74,16 @@ def fetch_news(ticker: str, limit: int = 5) -> List[Dict]:
         
         if data.get("status") != "ok":
             logger.error(f"NewsAPI error: {data.get('message')}")
+            record_fallback("news", "upstream_error")
+            NEGATIVE_CACHE.record("news", ticker, news_failure(response, data), retry_after(response))
             return _mock_news(ticker)
         
-        articles = data.get("articles", [])[:limit]
+        articles = data.get("articles", [])
+        record_source("news", real=True)
+        if not articles:
+            NEGATIVE_CACHE.record("news", ticker, "empty")
         
-        return [
+        return collapse_duplicates([
             {
                 "title": a.get("title", ""),
                 "description": a.get("description", ""),
@@ -55,10 +92,12 @@ def fetch_news(ticker: str, limit: int = 5) -> List[Dict]:
                 "published": a.get("publishedAt", "")
             }
             for a in articles
-        ]
+        ])[:min(limit, MAX_NEWS)]
         
     except Exception as e:
         logger.error(f"NewsAPI failed: {e}")
+        record_fallback("news", "exception")
+        NEGATIVE_CACHE.record("news", ticker, "upstream_error")
         return _mock_news(ticker)
 
 
@@ -73,12 +112,17 @@ def _mock_news(ticker: str) -> List[Dict]:
 
 # ============= TWITTER/X API =============
 
+@timed("fetch_tweets")
 def fetch_tweets(ticker: str, limit: int = 5) -> List[Dict]:
     """Fetch tweets about a stock with fallback."""
     bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
     
     if not bearer_token:
         logger.warning("No TWITTER_BEARER_TOKEN, using fallback")
+        record_fallback("twitter", "no_key")
+        return _mock_tweets(ticker)
+    
+    if _suppressed("twitter", ticker) is not None:
         return _mock_tweets(ticker)
     
     try:
@@ -86,7 +130,7 @@ def fetch_tweets(ticker: str, limit: int = 5) -> List[Dict]:
         import urllib.parse
         bearer_token = urllib.parse.unquote(bearer_token)
         
-        url = "https://api.twitter.com/2/tweets/search/recent"
+        url = f"{TWITTER_API_URL}/tweets/search/recent"
         headers = {"Authorization": f"Bearer {bearer_token}"}
         params = {
             "query": f"${ticker} stock -is:retweet lang:en",
@@ -99,24 +143,108 @@ def fetch_tweets(ticker: str, limit: int = 5) -> List[Dict]:
         
         if "data" not in data:
             logger.warning(f"Twitter returned no data: {data}")
+            record_fallback("twitter", "empty")
+            _record_twitter_failure(ticker, response, data)
             return _mock_tweets(ticker)
         
         tweets = data.get("data", [])[:limit]
+        record_source("twitter", real=True)
         
-        return [
-            {
-                "text": t.get("text", ""),
-                "created_at": t.get("created_at", ""),
-                "likes": t.get("public_metrics", {}).get("like_count", 0)
-            }
-            for t in tweets
-        ]
+        return [_tweet_dict(t) for t in tweets]
         
     except Exception as e:
         logger.error(f"Twitter API failed: {e}")
+        record_fallback("twitter", "exception")
+        NEGATIVE_CACHE.record("twitter", ticker, "upstream_error")
         return _mock_tweets(ticker)
 
 
+def _record_twitter_failure(ticker: str, response, data: Dict):
+    if response.status_code == 429:
+        NEGATIVE_CACHE.record("twitter", ticker, "rate_limited", retry_after(response))
+    elif response.ok and "errors" not in data:
+        NEGATIVE_CACHE.record("twitter", ticker, "empty")  # result_count 0
+    else:
+        NEGATIVE_CACHE.record("twitter", ticker, "upstream_error")
+
+
+def iter_tweets(ticker: str, sample_size: int = TWEET_SAMPLE_SIZE, page_size: int = 100) -> Iterator[Dict]:
+    """
+    Stream tweets about a stock, following `next_token` through
+    search/recent until `sample_size` tweets have been yielded.
+    
+    Tweets are yielded as each page arrives, so a consumer such as
+    hybrid.score_stream only ever holds one page. Falls back
+    to mock tweets without a token; an error mid-stream ends the stream
+    with whatever was already yielded.
+    """
+    bearer_token = os.getenv("TWITTER_BEARER_TOKEN")
+    
+    if not bearer_token:
+        logger.warning("No TWITTER_BEARER_TOKEN, using fallback")
+        record_fallback("twitter", "no_key")
+        yield from _mock_tweets(ticker)[:sample_size]
+        return
+    
+    if _suppressed("twitter", ticker) is not None:
+        yield from _mock_tweets(ticker)[:sample_size]
+        return
+    
+    import urllib.parse
+    headers = {"Authorization": f"Bearer {urllib.parse.unquote(bearer_token)}"}
+    url = f"{TWITTER_API_URL}/tweets/search/recent"
+    params = {
+        "query": f"${ticker} stock -is:retweet lang:en",
+        "tweet.fields": "created_at,public_metrics"
+    }
+    
+    yielded = 0
+    pages = 0
+    with requests.Session() as session:
+        while yielded < sample_size:
+            # search/recent accepts 10-100 results per page
+            params["max_results"] = max(10, min(page_size, 100, sample_size - yielded))
+            try:
+                with timed("fetch_tweets_page"):
+                    response = session.get(url, headers=headers, params=params, timeout=10)
+                    data = response.json()
+            except Exception as e:
+                logger.error(f"Twitter API failed on page {pages + 1}: {e}")
+                record_fallback("twitter", "exception")
+                if not pages:
+                    NEGATIVE_CACHE.record("twitter", ticker, "upstream_error")
+                break
+            
+            page = data.get("data", [])
+            if not page:
+                if not pages:
+                    logger.warning(f"Twitter returned no data: {data}")
+                    record_fallback("twitter", "empty")
+                    _record_twitter_failure(ticker, response, data)
+                break
+            pages += 1
+            record_source("twitter", real=True)
+            
+            for t in page[:sample_size - yielded]:
+                yield _tweet_dict(t)
+                yielded += 1
+            
+            next_token = data.get("meta", {}).get("next_token")
+            if not next_token:
+                break
+            params["next_token"] = next_token
+    
+    logger.info(f"🐦 Streamed {yielded} tweets for {ticker} over {pages} pages")
+
+
+def _tweet_dict(t: Dict) -> Dict:
+    return {
+        "text": t.get("text", ""),
+        "created_at": t.get("created_at", ""),
+        "likes": t.get("public_metrics", {}).get("like_count", 0)
+    }
+
+
 def _mock_tweets(ticker: str) -> List[Dict]:
     """Fallback mock tweets."""
     return [
@@ -128,41 +256,36 @@ def _mock_tweets(ticker: str) -> List[Dict]:
 
 # ============= ALPHA VANTAGE (Stock Prices) =============
 
+@timed("fetch_stock_price")
 def fetch_stock_price(ticker: str) -> Optional[Dict]:
     """Fetch real-time stock price from Alpha Vantage."""
     api_key = os.getenv("ALPHA_VANTAGE_KEY")
     
     if not api_key:
         logger.warning("No ALPHA_VANTAGE_KEY, using fallback")
+        record_fallback("alpha_vantage", "no_key")
+        return _mock_price(ticker)
+    
+    if _suppressed("alpha_vantage", ticker) is not None:
         return _mock_price(ticker)
     
     try:
-        url = "https://www.alphavantage.co/query"
-        params = {
-            "function": "GLOBAL_QUOTE",
-            "symbol": ticker,
-            "apikey": api_key
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        quote = data.get("Global Quote", {})
-        
-        if not quote:
-            return _mock_price(ticker)
-        
-        return {
-            "symbol": quote.get("01. symbol", ticker),
-            "price": float(quote.get("05. price", 0)),
-            "change": float(quote.get("09. change", 0)),
-            "change_percent": quote.get("10. change percent", "0%"),
-            "volume": int(quote.get("06. volume", 0))
-        }
-        
+        # Batched with concurrent lookups and shared briefly between analyses
+        quote = get_quote_service().get(ticker)
+    except QuoteError as e:
+        record_fallback("alpha_vantage", _QUOTE_FALLBACK_REASONS.get(e.failure, e.failure))
+        return _mock_price(ticker)
     except Exception as e:
         logger.error(f"Alpha Vantage failed: {e}")
+        record_fallback("alpha_vantage", "exception")
         return _mock_price(ticker)
+    
+    record_source("alpha_vantage", real=True)
+    return dict(quote)
+
+
+# Fallback reasons as recorded before quotes went through the quote service
+_QUOTE_FALLBACK_REASONS = {"unknown_symbol": "empty", "upstream_error": "exception"}
 
 
 def _mock_price(ticker: str) -> Dict:
@@ -186,15 +309,19 @@ def fetch_all_data(ticker: str) -> Dict:
     logger.info(f"📡 Fetching data for {ticker}...")
     
     news = fetch_news(ticker, limit=5)
-    tweets = fetch_tweets(ticker, limit=5)
+    # Each page of the sample is scored as it arrives; only a small pool of
+    # tweets is kept for the LLM prompt to rank down to its top few
+    with timed("fetch_tweets"):
+        social, tweets, tweet_count = score_stream(iter_tweets(ticker, TWEET_SAMPLE_SIZE))
     price_data = fetch_stock_price(ticker)
     
     return {
         "ticker": ticker,
         "news": news,
         "tweets": tweets,
+        "social_scores": social,
         "price": price_data,
-        "sources_count": len(news) + len(tweets),
+        "sources_count": len(news) + tweet_count,
         "fetched_at": datetime.now().isoformat()
     }
 
@@ -0,0 +1,127 @@
+"""
+Sentient110 - Near-Duplicate Detection
+Collapse syndicated headlines into clusters (MinHash + LSH banding) so each
+story is scored and prompted once, with its cluster size kept for weighting
+"""
+
+import os
+import re
+import random
+import hashlib
+import logging
+from typing import Dict, List, Set
+
+logger = logging.getLogger("sentient110.dedup")
+
+# Word-set Jaccard at or above this makes two headlines the same story
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.6))
+# 8 bands x 4 rows: pairs at Jaccard 0.6 share a band ~65% of the time,
+# pairs at 0.3 only ~6% - candidates are then confirmed exactly
+DEDUP_BANDS = 8
+DEDUP_ROWS = 4
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(110)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE))
+    for _ in range(DEDUP_BANDS * DEDUP_ROWS)
+]
+
+_WORD = re.compile(r"[a-z0-9$%.]+")
+# "Tesla beats estimates - Reuters" / "... | CNBC": syndication suffixes
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")
+_STOPWORDS = frozenset("a an the of to in on for and or as at by with is are its it s".split())
+
+
+def shingles(text: str) -> Set[str]:
+    """Normalized word unigrams + bigrams of a headline."""
+    text = _SOURCE_SUFFIX.sub("", text or "").lower()
+    words = [w.strip(".") for w in _WORD.findall(text)]
+    words = [w for w in words if w and w not in _STOPWORDS]
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def _hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+
+
+def minhash(features: Set[str]) -> List[int]:
+    """MinHash signature: one minimum per (a*x + b) mod p permutation."""
+    hashes = [_hash(f) for f in features]
+    if not hashes:
+        return []
+    return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def cluster(texts: List[str], threshold: float = DEDUP_THRESHOLD) -> List[List[int]]:
+    """
+    Group indices of near-duplicate texts. Each text is hashed once and
+    bucketed per LSH band. A bucket keeps one representative per cluster
+    that reached it, and a text is only checked against those, so even a
+    story syndicated a hundred times costs O(n) hashing plus a handful of
+    exact checks per text. Clusters are ordered by first member, members
+    in input order.
+    """
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    features = [shingles(t) for t in texts]
+    buckets: Dict[tuple, List[int]] = {}
+    for i, feats in enumerate(features):
+        signature = minhash(feats)
+        if not signature:
+            continue
+        for band in range(DEDUP_BANDS):
+            key = (band, tuple(signature[band * DEDUP_ROWS:(band + 1) * DEDUP_ROWS]))
+            representatives = buckets.setdefault(key, [])
+            joined = False
+            for j in representatives:
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    joined = True
+                elif jaccard(feats, features[j]) >= threshold:
+                    # Keep the earliest index as root so it stays the representative
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+                    joined = True
+            if not joined:
+                representatives.append(i)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(find(i), []).append(i)
+    return sorted(groups.values(), key=lambda members: members[0])
+
+
+def collapse_duplicates(articles: List[Dict], key: str = "title", threshold: float = DEDUP_THRESHOLD) -> List[Dict]:
+    """
+    One article per story: the first of each cluster (feeds arrive newest
+    first), annotated with `cluster_size` and the other outlets in
+    `duplicate_sources`.
+    """
+    if len(articles) < 2:
+        return [{**a, "cluster_size": 1} for a in articles]
+
+    groups = cluster([a.get(key) or "" for a in articles], threshold)
+    collapsed = []
+    for members in groups:
+        head = articles[members[0]]
+        collapsed.append({
+            **head,
+            "cluster_size": len(members),
+            "duplicate_sources": [articles[i].get("source", "Unknown") for i in members[1:]],
+        })
+
+    if len(collapsed) < len(articles):
+        logger.info(f"🧹 Collapsed {len(articles)} articles into {len(collapsed)} stories")
+    return collapsed
@@ -0,0 +1,195 @@
+"""
+Sentient110 - Hybrid Analysis
+Score texts with the local RoBERTa model first and only escalate to the LLM
+when the local verdict is ambiguous (mixed, low margin, few sources)
+"""
+
+import os
+import heapq
+import asyncio
+import logging
+from itertools import islice
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.metrics import timed, ANALYSIS_ROUTES
+
+logger = logging.getLogger("sentient110.hybrid")
+
+HYBRID_ENABLED = os.getenv("HYBRID_ENABLED", "true").lower() in ("1", "true", "yes")
+# Fewer scored texts than this -> too small a sample to trust locally
+HYBRID_MIN_SOURCES = int(os.getenv("HYBRID_MIN_SOURCES", 6))
+# |positive share - negative share| below this -> no clear direction
+HYBRID_MIN_MARGIN = float(os.getenv("HYBRID_MIN_MARGIN", 0.35))
+# Both sides at or above this share -> genuinely mixed
+HYBRID_MIXED_SHARE = float(os.getenv("HYBRID_MIXED_SHARE", 0.3))
+# Neutral share above this -> nothing decisive to say locally
+HYBRID_MAX_NEUTRAL = float(os.getenv("HYBRID_MAX_NEUTRAL", 0.6))
+# Tweets of a streamed sample kept in memory (most liked) for the LLM
+# prompt and the lexicon fallback; the rest are only scored
+TWEET_EVIDENCE_POOL = int(os.getenv("TWEET_EVIDENCE_POOL", 20))
+
+
+def score_stream(tweets: Iterable[Dict], keep: int = TWEET_EVIDENCE_POOL) -> Tuple[Optional[Dict], List[Dict], int]:
+    """
+    Score a tweet stream (e.g. iter_tweets) with the local model while it
+    is consumed, holding only the `keep` most-liked tweets. Returns (social
+    scores, or None without a local model; kept tweets in stream order;
+    tweets consumed). Without a local model the stream is cut at `keep`,
+    so no further pages are fetched.
+    """
+    pool = []  # min-heap of (likes, -position, tweet): evicts the least liked, then the latest
+    consumed = 0
+
+    def texts(stream):
+        nonlocal consumed
+        for tweet in stream:
+            entry = (tweet.get("likes") or 0, -consumed, tweet)
+            consumed += 1
+            if len(pool) < keep:
+                heapq.heappush(pool, entry)
+            elif keep and entry[:2] > pool[0][:2]:
+                heapq.heapreplace(pool, entry)
+            if tweet.get("text"):
+                yield tweet["text"]
+
+    analyzer = None
+    if HYBRID_ENABLED:
+        from services.analyzer import get_analyzer
+        analyzer = get_analyzer()
+    if analyzer is None or analyzer.model is None:
+        social = None
+        for _ in texts(islice(tweets, keep)):
+            pass
+    else:
+        social = analyzer.analyze_stream(texts(tweets))
+    kept = [tweet for _, _, tweet in sorted(pool, key=lambda entry: -entry[1])]
+    return social, kept, consumed
+
+
+def local_scores(news: List[Dict], tweets: List[Dict], social: Dict = None) -> Optional[Dict]:
+    """
+    RoBERTa distributions for news, social and both combined, or None when
+    the local model isn't available. `social` is the score_stream result
+    for the whole sample when `tweets` is only its evidence pool.
+    """
+    from services.analyzer import get_analyzer
+    analyzer = get_analyzer()
+    if analyzer.model is None:
+        return None
+
+    news_texts = [n.get("title", "") for n in news if n.get("title")]
+    with timed("local_sentiment"):
+        news_result = analyzer.analyze_batch(news_texts)
+        if social is not None:
+            social_result = social
+        else:
+            social_result = analyzer.analyze_stream(t["text"] for t in tweets if t.get("text"))
+
+    total = news_result["count"] + social_result["count"]
+    combined = {"count": total}
+    for key in ("positive", "negative", "neutral", "score"):
+        if total:
+            combined[key] = (news_result[key] * news_result["count"]
+                             + social_result[key] * social_result["count"]) / total
+        else:
+            combined[key] = news_result[key]
+    return {"news": news_result, "social": social_result, "combined": combined}
+
+
+def escalation_reason(scores: Optional[Dict]) -> Optional[str]:
+    """Why the local verdict isn't good enough, or None to answer locally."""
+    if scores is None:
+        return "no_local_model"
+    combined = scores["combined"]
+    if combined["count"] < HYBRID_MIN_SOURCES:
+        return "few_sources"
+    if combined["neutral"] > HYBRID_MAX_NEUTRAL:
+        return "mostly_neutral"
+    if min(combined["positive"], combined["negative"]) >= HYBRID_MIXED_SHARE:
+        return "mixed"
+    if abs(combined["positive"] - combined["negative"]) < HYBRID_MIN_MARGIN:
+        return "low_margin"
+    return None
+
+
+def local_analysis(ticker: str, scores: Dict) -> Dict:
+    """An analyze_sentiment-shaped result built from the local scores alone."""
+    combined = scores["combined"]
+    margin = combined["positive"] - combined["negative"]
+    signal = "BUY" if margin > 0 else "SELL"
+    side = "positive" if margin > 0 else "negative"
+
+    def pct(result):
+        return round(result["score"] * 100)
+
+    return {
+        "signal": signal,
+        "confidence": min(95, round(50 + abs(margin) * 50)),
+        "reasoning": (f"{combined[side]:.0%} of {combined['count']} news and social items on {ticker} "
+                      f"read {side} with a {abs(margin):.0%} margin, a clear one-sided consensus."),
+        "sentiment_score": round(combined["score"], 4),
+        "news_sentiment": pct(scores["news"]),
+        "social_sentiment": pct(scores["social"]),
+        "insights": [
+            f"{'📈' if signal == 'BUY' else '📉'} {combined[side]:.0%} {side} across {combined['count']} sources",
+            f"📰 News sentiment {pct(scores['news'])}/100",
+            f"💬 Social sentiment {pct(scores['social'])}/100",
+        ],
+        "route": "local",
+    }
+
+
+def analyze_hybrid(ticker: str, news: List[Dict], tweets: List[Dict], price: Dict = None,
+                   llm: Callable = None, on_field: Callable = None, social: Dict = None) -> Dict:
+    """
+    Local model first; `llm(ticker, news, tweets, price)` only when the local
+    verdict is ambiguous. The result carries `route` ("local" or "llm") and,
+    when escalated, `escalation_reason`. `on_field` is handed to the LLM for
+    streamed fields; `social` is the sample's score_stream result.
+    """
+    scores = local_scores(news, tweets, social) if HYBRID_ENABLED else None
+    local, reason = _route(ticker, scores)
+    if local is not None:
+        return local
+    result = llm(ticker, news, tweets, price, on_field=on_field) if on_field else llm(ticker, news, tweets, price)
+    return {**result, "route": "llm", "escalation_reason": reason}
+
+
+async def analyze_hybrid_async(ticker: str, news: List[Dict], tweets: List[Dict], price: Dict = None,
+                               llm: Callable = None, social: Dict = None) -> Dict:
+    """
+    `analyze_hybrid` for async callers: local scoring runs in a worker
+    thread and `llm` is awaited, so the event loop is never blocked.
+    """
+    scores = await asyncio.to_thread(local_scores, news, tweets, social) if HYBRID_ENABLED else None
+    local, reason = _route(ticker, scores)
+    if local is not None:
+        return local
+    result = await llm(ticker, news, tweets, price)
+    return {**result, "route": "llm", "escalation_reason": reason}
+
+
+def _route(ticker: str, scores: Optional[Dict]):
+    """(local result, None) when confident, else (None, escalation reason); counts the route."""
+    reason = escalation_reason(scores) if HYBRID_ENABLED else "disabled"
+    if reason is None:
+        ANALYSIS_ROUTES.inc(route="local", reason="confident")
+        logger.info(f"⚡ {ticker} answered locally")
+        return local_analysis(ticker, scores), None
+
+    ANALYSIS_ROUTES.inc(route="llm", reason=reason)
+    logger.info(f"🧠 {ticker} escalated to LLM ({reason})")
+    return None, reason
+
+
+def route_stats() -> Dict:
+    """Share of analyses answered locally, for health/metrics views."""
+    local = ANALYSIS_ROUTES.total(route="local")
+    escalated = ANALYSIS_ROUTES.total(route="llm")
+    total = local + escalated
+    return {
+        "enabled": HYBRID_ENABLED,
+        "local": int(local),
+        "escalated": int(escalated),
+        "local_share": round(local / total, 4) if total else None,
+    }
@@ -0,0 +1,266 @@
+"""
+Sentient110 - Lexicon Scorer
+Deterministic finance-sentiment fallback: a weighted lexicon compiled into
+one regex automaton (word boundaries, multi-word phrases, emoji), with
+negation, scoring a whole batch of texts in a single scan
+"""
+
+import re
+import logging
+from bisect import bisect_right
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger("sentient110.lexicon")
+
+# Term -> weight; positive is bullish. Phrases match across any whitespace.
+LEXICON: Dict[str, float] = {
+    # Bullish
+    "bullish": 1.0, "bull run": 1.0, "buy": 0.6, "buy rating": 1.0, "strong buy": 1.2,
+    "outperform": 0.9, "overweight": 0.7, "upgrade": 1.0, "upgraded": 1.0, "upgrades": 1.0,
+    "price target raised": 1.1, "raises price target": 1.1, "raised guidance": 1.2,
+    "raises guidance": 1.2, "beat": 0.9, "beats": 0.9, "beat expectations": 1.2,
+    "beats expectations": 1.2, "exceed expectations": 1.1, "exceeds expectations": 1.1,
+    "exceeded expectations": 1.1, "record high": 1.0, "all-time high": 1.0, "record revenue": 1.0,
+    "record profit": 1.0, "growth": 0.6, "grows": 0.5, "grew": 0.5, "growing": 0.5,
+    "surge": 0.9, "surges": 0.9, "surged": 0.9, "surging": 0.9,
+    "soar": 1.0, "soars": 1.0, "soared": 1.0, "soaring": 1.0,
+    "rally": 0.8, "rallies": 0.8, "rallied": 0.8, "rallying": 0.8,
+    "jump": 0.6, "jumps": 0.6, "jumped": 0.6, "jumping": 0.6, "spike": 0.5, "spikes": 0.5,
+    "spiked": 0.5, "spiking": 0.5, "gain": 0.5, "gains": 0.5, "gained": 0.5, "gaining": 0.5, "up": 0.4,
+    "rise": 0.5, "rises": 0.5, "rising": 0.5, "rose": 0.5, "risen": 0.5,
+    "climb": 0.5, "climbs": 0.5, "climbed": 0.5, "climbing": 0.5, "strong": 0.6, "stronger": 0.6,
+    "beating": 0.9, "outperforms": 0.9, "outperformed": 0.9, "outperforming": 0.9,
+    "upgrading": 1.0, "exceeding expectations": 1.1, "breaking out": 0.7,
+    "momentum": 0.4, "profit": 0.4, "profitable": 0.6, "dividend hike": 0.9, "buyback": 0.6,
+    "breakout": 0.7, "partnership": 0.4, "approval": 0.6, "approved": 0.6, "expansion": 0.4,
+    "optimistic": 0.7, "upside": 0.6, "accumulate": 0.5, "long": 0.3, "moon": 0.8,
+    "to the moon": 1.0, "rocket": 0.7, "short squeeze": 0.6, "undervalued": 0.6,
+    "🚀": 0.8, "📈": 0.7, "💎": 0.4, "🔥": 0.4,
+    # Bearish
+    "bearish": -1.0, "bear market": -0.9, "sell": -0.6, "sell rating": -1.0, "strong sell": -1.2,
+    "sell-off": -1.0, "selloff": -1.0, "underperform": -0.9, "underweight": -0.7,
+    "downgrade": -1.0, "downgraded": -1.0, "downgrades": -1.0, "price target cut": -1.1,
+    "cuts price target": -1.1, "cut guidance": -1.2, "cuts guidance": -1.2, "lowered guidance": -1.2,
+    "miss": -0.9, "misses": -0.9, "missed": -0.9, "miss expectations": -1.2,
+    "misses expectations": -1.2, "missed expectations": -1.2, "below expectations": -1.1,
+    "decline": -0.7, "declines": -0.7, "declined": -0.7, "declining": -0.7, "down": -0.4,
+    "fall": -0.5, "falls": -0.5, "fell": -0.5, "drop": -0.6, "drops": -0.6, "dropped": -0.6,
+    "falling": -0.5, "fallen": -0.5, "dropping": -0.6, "sink": -0.6, "sinks": -0.6, "sank": -0.6,
+    "sinking": -0.6, "slide": -0.6, "slides": -0.6, "slid": -0.6, "sliding": -0.6,
+    "plunge": -1.0, "plunges": -1.0, "plunged": -1.0, "plunging": -1.0,
+    "tumble": -0.9, "tumbles": -0.9, "tumbled": -0.9, "tumbling": -0.9,
+    "slump": -0.8, "slumps": -0.8, "slumped": -0.8, "slumping": -0.8,
+    "crash": -1.1, "crashes": -1.1, "crashed": -1.1, "crashing": -1.1,
+    "weak": -0.6, "weaker": -0.6, "weakness": -0.6, "downgrading": -1.0, "missing": -0.7,
+    "underperforms": -0.9, "underperformed": -0.9, "underperforming": -0.9, "dumped": -0.8,
+    "loss": -0.6, "losses": -0.6, "layoffs": -0.7, "lawsuit": -0.6, "probe": -0.5,
+    "investigation": -0.6, "recall": -0.6, "bankruptcy": -1.3, "default": -0.9, "fraud": -1.2,
+    "overvalued": -0.6, "downside": -0.6, "short": -0.3, "dump": -0.8, "dumping": -0.8,
+    "pessimistic": -0.7, "warning": -0.5, "profit warning": -1.1, "headwinds": -0.5,
+    "fatigue": -0.4, "concern": -0.4, "concerns": -0.4, "disappoint": -0.8, "disappoints": -0.8,
+    "disappointing": -0.8, "disappointed": -0.7, "📉": -0.7, "🔻": -0.6,
+}
+# Words that flip the next sentiment term within NEGATION_SCOPE words
+NEGATORS = ("not", "no", "never", "without", "hardly", "barely", "neither", "nor",
+            "isn't", "aren't", "wasn't", "weren't", "don't", "doesn't", "didn't",
+            "won't", "can't", "cannot", "fails to", "failed to", "fail to")
+# "not only up but surging": intensifiers that merely start with a negator
+NOT_NEGATIONS = ("not only", "not just", "no doubt", "not merely")
+NEGATION_SCOPE = 3
+# A negated term counts this much, in the opposite direction
+NEGATION_WEIGHT = -0.75
+# Net per-text score (-1..1) beyond which a text reads positive / negative
+TEXT_THRESHOLD = 0.1
+# Mean score beyond which the overall signal is BUY / SELL
+SIGNAL_THRESHOLD = 0.15
+
+# A clause break ends a negation's scope
+_CLAUSE_BREAK = re.compile(r"[.;:!?,\n]")
+_WORD = re.compile(r"[\w'$-]+")
+_FOLD = re.compile(r"\s+")
+# Characters in terms that match more loosely than themselves
+_ATOMS = {" ": r"\s+", "-": r"[-\s]?", "'": "['’]"}
+
+
+class TextScore(NamedTuple):
+    score: float          # -1 (bearish) .. 1 (bullish)
+    positive: float       # summed bullish weight
+    negative: float       # summed bearish weight (positive number)
+    terms: List[str]      # matched terms, negated ones prefixed "not "
+
+    @property
+    def label(self) -> str:
+        if self.score > TEXT_THRESHOLD:
+            return "positive"
+        if self.score < -TEXT_THRESHOLD:
+            return "negative"
+        return "neutral"
+
+
+def _fold(text: str) -> str:
+    """Lookup key for a term or match: lower case, single spaces, straight quotes, no hyphens."""
+    return _FOLD.sub(" ", text.lower().replace("’", "'").replace("-", " ")).replace(" ", "")
+
+
+def _trie_pattern(terms: List[str]) -> str:
+    """
+    Regex for a set of terms shaped as a character trie, so the engine
+    follows one path per input position instead of trying every term in
+    turn (a regex-compiled Aho-Corasick); greedy optional tails make the
+    longest term win.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for ch in term.lower():
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict) -> str:
+        branches = [(_ATOMS.get(ch) or re.escape(ch)) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = "(?:" + "|".join(branches) + ")" if len(branches) > 1 or "" in node else branches[0]
+        return body + "?" if "" in node else body
+
+    return emit(trie)
+
+
+class LexiconScorer:
+    """
+    All terms and negators compiled into one trie-shaped regex. `score_texts`
+    joins the batch with newlines and scans it once; matches are mapped back
+    to their text by offset, looked up by folded key and flipped when a
+    negator precedes them within NEGATION_SCOPE words of the same clause.
+    """
+
+    def __init__(self, lexicon: Dict[str, float] = None, negators=NEGATORS, not_negations=NOT_NEGATIONS):
+        self.lexicon = {term.lower(): weight for term, weight in (lexicon or LEXICON).items()}
+        self._weights = {_fold(term): weight for term, weight in self.lexicon.items()}
+        self._negators = {_fold(n) for n in negators}
+        # Matched as longer terms than their negator, so they shadow it
+        self._not_negations = {_fold(n) for n in not_negations}
+        words = [t for t in list(self.lexicon) + list(negators) + list(not_negations) if t[0].isalnum()]
+        symbols = [t for t in self.lexicon if not t[0].isalnum()]
+        # Word boundaries around words (so no "up" inside "upgrade" or
+        # "supply", no "short" in "short-term"); emoji match anywhere
+        pattern = rf"(?<![\w$'-])(?:{_trie_pattern(words)})(?![\w'-])"
+        if symbols:
+            pattern += "|" + "|".join(re.escape(symbol) for symbol in symbols)
+        self._regex = re.compile(pattern, re.IGNORECASE)
+
+    def score_texts(self, texts: List[str]) -> List[TextScore]:
+        """One TextScore per text, in input order."""
+        texts = [t or "" for t in texts]
+        joined = "\n".join(texts)
+        starts, offset = [], 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+
+        pos = [0.0] * len(texts)
+        neg = [0.0] * len(texts)
+        terms: List[List[str]] = [[] for _ in texts]
+        negation_end = -1  # end offset of the pending negator, if any
+
+        for match in self._regex.finditer(joined):
+            key = _fold(match.group())
+            if key in self._negators:
+                negation_end = match.end()
+                continue
+            if key in self._not_negations:
+                negation_end = -1
+                continue
+            weight = self._weights.get(key, 0.0)
+            negated = False
+            if negation_end >= 0:
+                gap = joined[negation_end:match.start()]
+                negated = not _CLAUSE_BREAK.search(gap) and len(_WORD.findall(gap)) < NEGATION_SCOPE
+                negation_end = -1
+            if negated:
+                weight *= NEGATION_WEIGHT
+            i = bisect_right(starts, match.start()) - 1
+            if weight > 0:
+                pos[i] += weight
+            elif weight < 0:
+                neg[i] -= weight
+            terms[i].append(("not " if negated else "") + match.group().lower())
+
+        return [
+            TextScore((p - n) / (p + n) if p + n else 0.0, round(p, 4), round(n, 4), t)
+            for p, n, t in zip(pos, neg, terms)
+        ]
+
+    def summarize(self, texts: List[str]) -> Dict:
+        """
+        Aggregate in SentimentAnalyzer.analyze_batch's shape: label shares,
+        `score` (0-1 bullishness), `count`, plus the most frequent terms.
+        """
+        scores = self.score_texts(texts)
+        count = len(scores)
+        labels = Counter(s.label for s in scores)
+        mean = sum(s.score for s in scores) / count if count else 0.0
+        return {
+            "positive": labels["positive"] / count if count else 0.0,
+            "negative": labels["negative"] / count if count else 0.0,
+            "neutral": labels["neutral"] / count if count else 1.0,
+            "score": 0.5 + mean / 2,
+            "count": count,
+            "terms": [term for term, _ in Counter(t for s in scores for t in s.terms).most_common(5)],
+        }
+
+
+_scorer: Optional[LexiconScorer] = None
+
+
+def get_scorer() -> LexiconScorer:
+    global _scorer
+    if _scorer is None:
+        _scorer = LexiconScorer()
+    return _scorer
+
+
+def score_texts(texts: List[str]) -> List[TextScore]:
+    return get_scorer().score_texts(texts)
+
+
+def lexicon_analysis(ticker: str, news: List[Dict], tweets: List[Dict]) -> Dict:
+    """
+    analyze_sentiment-shaped result from the lexicon alone; the same inputs
+    always give the same answer.
+    """
+    scorer = get_scorer()
+    news_texts = [" ".join(filter(None, (n.get("title"), n.get("description")))) for n in news]
+    social_texts = [t.get("text", "") for t in tweets]
+    news_result = scorer.summarize(news_texts)
+    social_result = scorer.summarize(social_texts)
+
+    count = news_result["count"] + social_result["count"]
+    score = ((news_result["score"] * news_result["count"] + social_result["score"] * social_result["count"]) / count
+             if count else 0.5)
+    mean = score * 2 - 1
+    if mean > SIGNAL_THRESHOLD:
+        signal, mood = "BUY", "bullish"
+    elif mean < -SIGNAL_THRESHOLD:
+        signal, mood = "SELL", "bearish"
+    else:
+        signal, mood = "HOLD", "neutral"
+    terms = [term for term, _ in Counter(news_result["terms"] + social_result["terms"]).most_common(4)]
+
+    def pct(result):
+        return round(result["score"] * 100)
+
+    return {
+        "signal": signal,
+        "confidence": min(90, round(55 + abs(mean) * 40 + min(count, 10))) if signal != "HOLD" else 55,
+        "reasoning": (f"Based on {len(news)} news articles and {len(tweets)} social posts, sentiment on "
+                      f"{ticker} is {mood}" + (f" ({', '.join(terms)})." if terms else ".")),
+        "sentiment_score": round(score, 4),
+        "news_sentiment": pct(news_result),
+        "social_sentiment": pct(social_result),
+        "insights": [
+            f"{'📈' if signal == 'BUY' else '📉' if signal == 'SELL' else '⏸️'} {mood.capitalize()} keyword sentiment",
+        ] + ([f"📰 News sentiment {pct(news_result)}/100 across {len(news)} articles"] if news else [])
+          + ([f"💬 Social sentiment {pct(social_result)}/100 across {len(tweets)} posts"] if tweets else []),
+    }
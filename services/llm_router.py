@@ -0,0 +1,323 @@
+"""
+Sentient110 - LLM Router
+Hedged requests across OpenAI and Anthropic: send to the primary, and if it
+hasn't answered by its own p95 latency, race the secondary against it
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from services.metrics import REGISTRY, STAGE_LATENCY
+from services.stream_json import IncrementalJSONParser, StreamJSONError
+
+logger = logging.getLogger("sentient110.router")
+
+LLM_PRIMARY = os.getenv("LLM_PRIMARY", "openai")
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE", "true").lower() in ("1", "true", "yes")
+# Hedge after the primary's observed p95, clamped to [min, max] seconds;
+# the default applies until HEDGE_MIN_SAMPLES calls have been measured
+HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", 0.95))
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", 0.5))
+HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", 6.0))
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", 2.0))
+HEDGE_MIN_SAMPLES = 20
+# Overall cap on one routed call
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 20))
+
+# Finer than the stage buckets in the 0.25-10s range where LLM calls live,
+# so the p95 used as hedge delay isn't rounded up to the next 2.5s step
+PROVIDER_LATENCY = REGISTRY.histogram(
+    "sentient110_llm_provider_duration_seconds",
+    "LLM call latency per provider, cancelled losers as lower bounds (drives the hedge delay)",
+    buckets=(0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 15.0, 30.0),
+)
+PROVIDER_ERRORS = REGISTRY.counter(
+    "sentient110_llm_provider_errors_total",
+    "LLM provider call failures by provider"
+)
+HEDGES = REGISTRY.counter(
+    "sentient110_llm_hedges_total",
+    "Routed LLM calls by outcome (primary, hedged_primary, hedged_secondary, failover, failed)"
+)
+
+# Shared by all routed calls; two in flight per request at most
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_ROUTER_THREADS", 16)), thread_name_prefix="llm")
+
+
+class ProviderUnavailable(Exception):
+    """The provider isn't configured (no API key / SDK); try another one."""
+
+
+class Cancelled(Exception):
+    """A streaming call stopped early because another provider won."""
+
+
+# Fields that make up the early signal; time until both are parsed is
+# recorded as the llm_time_to_signal stage
+SIGNAL_FIELDS = ("signal", "confidence")
+
+
+def stream_fields(deltas: Iterable[str], on_field: Callable[[str, Any], None] = None,
+                  cancel: threading.Event = None) -> Tuple[Dict, str]:
+    """
+    Consume streamed completion text, parsing the JSON object incrementally.
+    `on_field(key, value)` fires as each top-level field completes, so the
+    signal is usable long before the reasoning has finished streaming.
+    Returns (fields, full text); raises Cancelled or StreamJSONError.
+    """
+    parser = IncrementalJSONParser()
+    text = []
+    start = time.perf_counter()
+    signalled = False
+    for delta in deltas:
+        if cancel is not None and cancel.is_set():
+            raise Cancelled()
+        if not delta:
+            continue
+        text.append(delta)
+        try:
+            completed = parser.feed(delta)
+        except ValueError as e:
+            raise StreamJSONError(f"invalid JSON: {e}", "".join(text))
+        for key, value in completed:
+            if on_field is not None:
+                on_field(key, value)
+            if not signalled and all(f in parser.fields for f in SIGNAL_FIELDS):
+                signalled = True
+                STAGE_LATENCY.observe(time.perf_counter() - start, stage="llm_time_to_signal")
+    content = "".join(text)
+    if not parser.done:
+        raise StreamJSONError("no complete JSON object in response", content)
+    return parser.fields, content
+
+
+class Provider:
+    """A named LLM call `fn(ticker, news, tweets, price, cancel=Event, on_field=cb) -> Dict` that raises on failure."""
+
+    def __init__(self, name: str, fn: Callable, available: Callable[[], bool]):
+        self.name = name
+        self.fn = fn
+        self.available = available
+
+    def hedge_delay(self) -> float:
+        snap = PROVIDER_LATENCY.snapshot(provider=self.name)
+        if snap["count"] < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        p = PROVIDER_LATENCY.quantile(HEDGE_QUANTILE, provider=self.name)
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, p))
+
+
+def _openai_provider() -> Provider:
+    def call(ticker, news, tweets, price, cancel=None, on_field=None):
+        from services.openai_analyzer import request_analysis
+        return request_analysis(ticker, news, tweets, price, cancel=cancel, on_field=on_field)
+
+    def available():
+        from services.openai_analyzer import is_available
+        return is_available()
+
+    return Provider("openai", call, available)
+
+
+def _anthropic_provider() -> Provider:
+    def call(ticker, news, tweets, price, cancel=None, on_field=None):
+        from services.claude_ai import request_analysis
+        return request_analysis(
+            ticker,
+            [n.get("title", "") for n in news],
+            [t.get("text", "") for t in tweets],
+            price.get("price") if price else None,
+            cancel=cancel,
+            on_field=on_field,
+        )
+
+    def available():
+        from services.claude_ai import is_available
+        return is_available()
+
+    return Provider("anthropic", call, available)
+
+
+class HedgedRouter:
+    """
+    Calls the primary provider; if it hasn't returned within its hedge delay
+    (adaptive p95), starts the secondary and returns whichever valid result
+    lands first. A primary that fails outright fails over immediately. The
+    loser's `cancel` event is set so streaming providers stop reading; its
+    result, if any, is discarded.
+    """
+
+    def __init__(self, providers: List[Provider], primary: str = LLM_PRIMARY, hedge: bool = LLM_HEDGE_ENABLED):
+        ordered = sorted(providers, key=lambda p: p.name != primary)
+        self.providers = ordered
+        self.hedge = hedge
+
+    def _submit(self, provider: Provider, args, cancel: threading.Event, on_field: Callable = None):
+        def run():
+            start = time.perf_counter()
+            try:
+                result = provider.fn(*args, cancel=cancel, on_field=on_field)
+            except Cancelled:
+                # A cancelled loser is the slow tail the p95 must see; its
+                # true latency is unknown, so record the time it had run as
+                # a lower bound rather than dropping the sample
+                PROVIDER_LATENCY.observe(time.perf_counter() - start, provider=provider.name)
+                raise
+            except Exception:
+                PROVIDER_ERRORS.inc(provider=provider.name)
+                raise
+            # Losers that don't honour `cancel` run to completion and are
+            # recorded in full, like winners
+            PROVIDER_LATENCY.observe(time.perf_counter() - start, provider=provider.name)
+            return {**result, "provider": provider.name}
+        return _executor.submit(run)
+
+    def call(self, ticker: str, news: List[Dict], tweets: List[Dict], price: Dict = None,
+             on_field: Callable[[str, Any], None] = None) -> Dict:
+        """
+        First valid result; raises ProviderUnavailable/last error when all
+        fail. With `on_field`, streamed fields are forwarded from whichever
+        provider emits first (the final result remains authoritative).
+        """
+        candidates = [p for p in self.providers if p.available()]
+        if not candidates:
+            raise ProviderUnavailable("no LLM provider configured")
+
+        args = (ticker, news, tweets, price)
+        deadline = time.monotonic() + LLM_TIMEOUT
+        primary = candidates[0]
+        secondary = candidates[1] if self.hedge and len(candidates) > 1 else None
+        emitters = self._emitters(on_field)
+        cancels = {primary.name: threading.Event()}
+        pending = {self._submit(primary, args, cancels[primary.name], emitters(primary.name)): primary}
+        if secondary is None:
+            return self._finish(pending, cancels, deadline, "primary", primary.name)
+
+        done, _ = wait(pending, timeout=primary.hedge_delay())
+        failed = bool(done) and next(iter(done)).exception() is not None
+        if done and not failed:
+            return self._finish(pending, cancels, deadline, "primary", primary.name)
+
+        outcome = "failover" if failed else "hedged"
+        logger.info(f"🔀 {'Failing over' if failed else 'Hedging'} {ticker}: {primary.name} -> {secondary.name}")
+        cancels[secondary.name] = threading.Event()
+        pending[self._submit(secondary, args, cancels[secondary.name], emitters(secondary.name))] = secondary
+        return self._finish(pending, cancels, deadline, outcome, primary.name)
+
+    @staticmethod
+    def _emitters(on_field: Optional[Callable]):
+        """Per-provider on_field wrappers; the first provider to emit owns the stream."""
+        owner = []
+        lock = threading.Lock()
+
+        def for_provider(name):
+            if on_field is None:
+                return None
+
+            def emit(key, value):
+                with lock:
+                    if not owner:
+                        owner.append(name)
+                if owner[0] == name:
+                    on_field(key, value)
+            return emit
+        return for_provider
+
+    def _finish(self, pending: Dict, cancels: Dict, deadline: float, outcome: str, primary: str) -> Dict:
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                last_error = TimeoutError(f"LLM call exceeded {LLM_TIMEOUT}s")
+                break
+            for future in done:
+                provider = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    logger.warning(f"⚠️ {provider.name} failed: {error}")
+                    last_error = error
+                    continue
+                # Winner: tell the other call to stop and drop its result
+                for name, event in cancels.items():
+                    if name != provider.name:
+                        event.set()
+                for other in pending:
+                    other.cancel()
+                if outcome == "hedged":
+                    outcome = "hedged_primary" if provider.name == primary else "hedged_secondary"
+                HEDGES.inc(outcome=outcome)
+                return future.result()
+
+        for event in cancels.values():
+            event.set()
+        HEDGES.inc(outcome="failed")
+        raise last_error or RuntimeError("all LLM providers failed")
+
+
+_router: Optional[HedgedRouter] = None
+
+
+def get_router() -> HedgedRouter:
+    global _router
+    if _router is None:
+        _router = HedgedRouter([_openai_provider(), _anthropic_provider()])
+    return _router
+
+
+def analyze_routed(ticker: str, news: List[Dict], tweets: List[Dict], price: Dict = None,
+                   on_field: Callable[[str, Any], None] = None) -> Dict:
+    """
+    analyze_sentiment-compatible entry point: hedged across the configured
+    providers, lexicon fallback when none is configured or all fail.
+    """
+    from services.metrics import record_fallback
+    from services.lexicon import lexicon_analysis
+    try:
+        return get_router().call(ticker, news, tweets, price, on_field=on_field)
+    except ProviderUnavailable:
+        record_fallback("llm", "no_key")
+    except Exception as e:
+        logger.error(f"❌ All LLM providers failed: {e}")
+        record_fallback("llm", "exception")
+    return lexicon_analysis(ticker, news, tweets)
+
+
+async def analyze_async(ticker: str, news: List[Dict], tweets: List[Dict], price: Dict = None) -> Dict:
+    """
+    analyze_routed for async callers: Anthropic through its async client
+    (bounded concurrency, 429 backoff) with the same lexicon fallback. Not
+    hedged; hedging stays on the threaded path.
+    """
+    from services.metrics import record_fallback
+    from services.claude_ai import request_analysis_async
+    try:
+        result = await request_analysis_async(
+            ticker,
+            [n.get("title", "") for n in news],
+            [t.get("text", "") for t in tweets],
+            price.get("price") if price else None,
+        )
+        return {**result, "provider": "anthropic"}
+    except ProviderUnavailable:
+        record_fallback("llm", "no_key")
+    except Exception as e:
+        logger.error(f"❌ Async Claude analysis failed: {e}")
+        record_fallback("llm", "exception")
+    from services.lexicon import lexicon_analysis
+    return lexicon_analysis(ticker, news, tweets)
+
+
+def router_stats() -> Dict:
+    """Per-provider hedge delay and call counts."""
+    return {
+        p.name: {
+            "calls": PROVIDER_LATENCY.snapshot(provider=p.name)["count"],
+            "errors": int(PROVIDER_ERRORS.value(provider=p.name)),
+            "hedge_delay_s": round(p.hedge_delay(), 3),
+        }
+        for p in get_router().providers
+    }
@@ -0,0 +1,260 @@
+"""
+Sentient110 - Pipeline Metrics
+Low-overhead per-stage histograms and counters, rendered in Prometheus text format
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import ContextDecorator
+from typing import Dict, Tuple, Sequence
+
+# Seconds. Covers cache hits (sub-ms) through slow LLM completions.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def label_values(self, name: str) -> set:
+        """Every value label `name` has taken so far."""
+        with self._lock:
+            return {dict(key)[name] for key in self._values if name in dict(key)}
+
+    def total(self, **labels) -> float:
+        """Sum over every series whose labels include `labels`."""
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(v for key, v in self._values.items() if wanted.issubset(key))
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in sorted(items):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Gauge(Counter):
+    """Settable value (e.g. store sizes) with optional labels."""
+
+    def set(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> str:
+        return super().render().replace(f"# TYPE {self.name} counter", f"# TYPE {self.name} gauge")
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observations cost one bisect plus a locked
+    increment, so it is cheap enough to leave on in production.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self, **labels) -> Dict:
+        """Count, sum and cumulative bucket counts for one label set."""
+        with self._lock:
+            series = list(self._series.get(_label_key(labels), [0] * (len(self.buckets) + 2)))
+        cumulative, running = [], 0
+        for count in series[:-1]:
+            running += count
+            cumulative.append(running)
+        return {"count": running, "sum": series[-1], "buckets": dict(zip(self.buckets + (float("inf"),), cumulative))}
+
+    def quantile(self, q: float, **labels) -> float:
+        """Bucket-upper-bound estimate of quantile q (0-1); 0.0 when empty."""
+        snap = self.snapshot(**labels)
+        if not snap["count"]:
+            return 0.0
+        target = q * snap["count"]
+        for bound, cumulative in snap["buckets"].items():
+            if cumulative >= target:
+                return bound if bound != float("inf") else self.buckets[-1]
+        return self.buckets[-1]
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        for key, series in sorted(items):
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                running += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {running}")
+        return "\n".join(lines)
+
+
+class Registry:
+    """Holds every metric so /api/metrics can render them in one pass."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "sentient110_stage_duration_seconds",
+    "Latency of each analysis pipeline stage"
+)
+SOURCE_RESULTS = REGISTRY.counter(
+    "sentient110_source_results_total",
+    "Upstream source results by origin (real upstream data vs mock fallback)"
+)
+SOURCE_FALLBACKS = REGISTRY.counter(
+    "sentient110_source_fallbacks_total",
+    "Upstream fallbacks to mock data by source and reason"
+)
+ANALYSES = REGISTRY.counter(
+    "sentient110_analyses_total",
+    "Completed analyses by data origin (real or mock)"
+)
+ANALYSIS_ROUTES = REGISTRY.counter(
+    "sentient110_analysis_routes_total",
+    "Analyses answered by the local model vs escalated to an LLM, by reason"
+)
+LLM_TOKENS = REGISTRY.counter(
+    "sentient110_llm_tokens_total",
+    "LLM tokens by provider and kind (prompt or completion)"
+)
+
+
+class timed(ContextDecorator):
+    """
+    Time a pipeline stage, as a context manager or decorator:
+
+        with timed("llm"):
+            ...
+
+        @timed("fetch_news")
+        def fetch_news(...): ...
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_LATENCY.observe(time.perf_counter() - self._start, stage=self.stage)
+        return False
+
+    def _recreate_cm(self):
+        # ContextDecorator reuses one instance per decorated function; give
+        # each call its own so concurrent calls don't share `_start`.
+        return timed(self.stage)
+
+
+def record_source(source: str, real: bool):
+    """Count one upstream result as real data or mock fallback."""
+    SOURCE_RESULTS.inc(source=source, origin="real" if real else "mock")
+
+
+def record_fallback(source: str, reason: str):
+    """Count a fallback to mock data (no_key, error, empty, ...)."""
+    SOURCE_FALLBACKS.inc(source=source, reason=reason)
+    record_source(source, real=False)
+
+
+def record_analysis(real: bool):
+    ANALYSES.inc(data="real" if real else "mock")
+
+
+def record_tokens(provider: str, prompt: int, completion: int):
+    """Count the tokens one LLM call used."""
+    LLM_TOKENS.inc(prompt, provider=provider, kind="prompt")
+    LLM_TOKENS.inc(completion, provider=provider, kind="completion")
+
+
+def render_prometheus() -> str:
+    """All registered metrics in Prometheus text exposition format."""
+    return REGISTRY.render()
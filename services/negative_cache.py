@@ -0,0 +1,119 @@
+"""
+Sentient110 - Negative Cache
+Remembers failed upstream lookups for a short, per-failure-class TTL so a
+repeat request for a bad symbol (or a rate-limited provider) is answered
+from the fallback without calling the provider again
+"""
+
+import os
+import time
+import logging
+from typing import Dict, Optional
+
+from services.cache import BoundedMemoryBackend, CacheBackend
+from services.metrics import REGISTRY
+
+logger = logging.getLogger("sentient110.negative_cache")
+
+# Seconds each failure class suppresses further calls
+NEGATIVE_TTLS = {
+    # The provider doesn't know the symbol (empty Global Quote, error message)
+    "unknown_symbol": int(os.getenv("NEG_TTL_UNKNOWN", 3600)),
+    # Valid call, nothing to analyze (no articles / tweets)
+    "empty": int(os.getenv("NEG_TTL_EMPTY", 600)),
+    # Quota exhausted: applies to every ticker on that source
+    "rate_limited": int(os.getenv("NEG_TTL_RATE_LIMITED", 60)),
+    # Timeouts, 5xx, unparseable responses
+    "upstream_error": int(os.getenv("NEG_TTL_UPSTREAM_ERROR", 30)),
+}
+# Failure classes that are about the provider, not the ticker
+SOURCE_WIDE = {"rate_limited"}
+# Entries kept at most; one-off bad tickers would otherwise accumulate
+NEG_CACHE_MAX_ENTRIES = int(os.getenv("NEG_CACHE_MAX_ENTRIES", 10000))
+
+NEGATIVE_LOOKUPS = REGISTRY.counter(
+    "sentient110_negative_cache_total",
+    "Negative cache activity by source, failure class and outcome (hit or stored)"
+)
+
+
+class NegativeCache:
+    """Failure classes per (source, ticker), plus source-wide entries for rate limits."""
+
+    def __init__(self, backend: CacheBackend = None, max_entries: int = NEG_CACHE_MAX_ENTRIES):
+        self.backend = backend or BoundedMemoryBackend(max_entries)
+        self.misses = 0
+
+    @staticmethod
+    def _key(source: str, ticker: str) -> str:
+        return f"{source}:{ticker}"
+
+    def check(self, source: str, ticker: str) -> Optional[str]:
+        """Failure class suppressing a call to `source` for `ticker`, or None to go ahead."""
+        failure = self.backend.get(self._key(source, "*")) or self.backend.get(self._key(source, ticker))
+        if failure is None:
+            self.misses += 1
+            return None
+        NEGATIVE_LOOKUPS.inc(source=source, failure=failure, outcome="hit")
+        return failure
+
+    def record(self, source: str, ticker: str, failure: str, ttl: float = None):
+        """Remember a failure; rate limits block the whole source."""
+        ttl = NEGATIVE_TTLS[failure] if ttl is None else min(ttl, NEGATIVE_TTLS[failure] * 10)
+        if ttl <= 0:
+            return
+        key = self._key(source, "*" if failure in SOURCE_WIDE else ticker)
+        self.backend.set(key, failure, ttl)
+        NEGATIVE_LOOKUPS.inc(source=source, failure=failure, outcome="stored")
+        logger.info(f"🚫 {source} {failure} for {ticker}; suppressing calls for {ttl:.0f}s")
+
+    def clear(self, source: str, ticker: str):
+        self.backend.delete(self._key(source, ticker))
+
+    def stats(self) -> Dict:
+        hits = {}
+        for source in sorted(NEGATIVE_LOOKUPS.label_values("source")):
+            by_class = {failure: int(NEGATIVE_LOOKUPS.value(source=source, failure=failure, outcome="hit"))
+                        for failure in NEGATIVE_TTLS}
+            hits[source] = {failure: n for failure, n in by_class.items() if n}
+        total_hits = sum(sum(v.values()) for v in hits.values())
+        checks = total_hits + self.misses
+        return {
+            "entries": len(self.backend),
+            "hits": hits,
+            "hit_rate": round(total_hits / checks, 4) if checks else None,
+        }
+
+
+NEGATIVE_CACHE = NegativeCache()
+
+
+def retry_after(response) -> Optional[float]:
+    """Seconds until a rate-limited provider accepts calls again, from its headers."""
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if "Retry-After" in headers:
+            return float(headers["Retry-After"])
+        if "x-rate-limit-reset" in headers:  # Twitter: epoch seconds
+            return max(0.0, float(headers["x-rate-limit-reset"]) - time.time())
+    except ValueError:
+        pass
+    return None
+
+
+def news_failure(response, data: Dict) -> str:
+    """Failure class for a NewsAPI response whose status isn't "ok"."""
+    if getattr(response, "status_code", None) == 429 or data.get("code") == "rateLimited":
+        return "rate_limited"
+    return "upstream_error"
+
+
+def alpha_vantage_failure(data: Dict) -> str:
+    """
+    Failure class for an Alpha Vantage response without a quote. It answers
+    HTTP 200 throughout: quota exhaustion comes as a "Note" or "Information"
+    message, a bad symbol as an empty "Global Quote" or an "Error Message".
+    """
+    if "Note" in data or "Information" in data:
+        return "rate_limited"
+    return "unknown_symbol"
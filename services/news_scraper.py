@@ -9,9 +9,14 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
 
+from services.dedup import collapse_duplicates
+
 load_dotenv()
 logger = logging.getLogger("sentient110.news")
 
+# Articles requested per call at least, so deduplication has copies to collapse
+NEWS_PAGE_SIZE = int(os.getenv("NEWS_PAGE_SIZE", 20))
+
 try:
     from newsapi import NewsApiClient
     NEWSAPI_AVAILABLE = True
@@ -50,7 +55,7 @@ class NewsScraper:
             days_back: Days to look back
             
         Returns:
-            List of article dicts
+            List of article dicts, near-duplicates collapsed (see cluster_size)
         """
         if not self.enabled:
             return self._get_mock_news(ticker)
@@ -66,7 +71,8 @@ class NewsScraper:
                 language='en',
                 sort_by='publishedAt',
                 from_param=from_date,
-                page_size=min(max_results, 100)
+                # Room for syndicated copies, collapsed before the cut
+                page_size=min(max(max_results, NEWS_PAGE_SIZE), 100)
             )
             
             articles = response.get("articles", [])
@@ -75,7 +81,7 @@ class NewsScraper:
                 return self._get_mock_news(ticker)
             
             result = []
-            for article in articles[:max_results]:
+            for article in articles:
                 result.append({
                     "title": article.get("title", ""),
                     "description": article.get("description", ""),
@@ -84,7 +90,9 @@ class NewsScraper:
                     "published_at": article.get("publishedAt", "")
                 })
             
-            logger.info(f"✅ Found {len(result)} articles")
+            # Syndicated copies collapse into one story before the cut
+            result = collapse_duplicates(result)[:max_results]
+            logger.info(f"✅ Found {len(result)} stories in {len(articles)} articles")
             return result
             
         except Exception as e:
@@ -110,7 +118,9 @@ class NewsScraper:
         for i, article in enumerate(articles, 1):
             source = article.get("source", "Unknown")
             title = article.get("title", "No title")
-            headlines.append(f"{i}. [{source}] {title}")
+            copies = article.get("cluster_size", 1)
+            suffix = f" (+{copies - 1} outlets)" if copies > 1 else ""
+            headlines.append(f"{i}. [{source}] {title}{suffix}")
         
         return "\n".join(headlines)
 
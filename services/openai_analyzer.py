@@ -6,20 +6,30 @@ Uses GPT-4o-mini for fast, cheap sentiment analysis
 import os
 import json
 import logging
+import importlib.util
 from typing import List, Dict
 from dotenv import load_dotenv
 
+from services.metrics import timed, record_source, record_fallback
+from services.ranking import select_evidence, RANK_NEWS_K, RANK_SOCIAL_K
+from services.prompt_builder import PromptBuilder, record_usage
+from services.llm_router import ProviderUnavailable, stream_fields
+from services.schema import OPENAI_RESPONSE_FORMAT, request_with_repair
+from services.lexicon import lexicon_analysis
+
 load_dotenv()
 logger = logging.getLogger("sentient110.openai")
 
-# Try to import OpenAI
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+# Check for the SDK without importing it; the import itself is deferred to
+# the first analysis so it stays off the cold-start path.
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+if not OPENAI_AVAILABLE:
     logger.warning("openai package not installed. Run: pip install openai")
 
+MODEL = "gpt-4o-mini"  # Fastest & cheapest
+SYSTEM_PROMPT = "You are a financial sentiment analyst. Respond only in valid JSON."
+MAX_COMPLETION_TOKENS = 300
+
 
 def analyze_sentiment(ticker: str, news: List[Dict], tweets: List[Dict], price: Dict = None) -> Dict:
     """
@@ -44,119 +54,101 @@ def analyze_sentiment(ticker: str, news: List[Dict], tweets: List[Dict], price:
             "sentiment_score": 0-1
         }
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    
-    if not api_key or not OPENAI_AVAILABLE:
-        logger.warning("OpenAI not available, using fallback")
-        return _fallback_analysis(ticker, news, tweets)
-    
     try:
-        client = OpenAI(api_key=api_key)
-        
-        # Build prompt with limited data
-        news_text = "\n".join([f"- {n.get('title', '')}" for n in news[:5]])
-        tweets_text = "\n".join([f"- {t.get('text', '')}" for t in tweets[:5]])
-        price_info = f"${price.get('price', 0):.2f} ({price.get('change_percent', '0%')})" if price else "N/A"
-        
-        prompt = f"""Analyze the sentiment for {ticker} stock based on this data:
-
-CURRENT PRICE: {price_info}
-
-NEWS HEADLINES:
-{news_text}
-
-SOCIAL MEDIA:
-{tweets_text}
-
-Provide your analysis in this exact JSON format:
-{{
-    "signal": "BUY" or "SELL" or "HOLD",
-    "confidence": 50-100,
-    "reasoning": "2-3 sentence explanation",
-    "sentiment_score": 0.0-1.0,
-    "news_sentiment": 0-100,
-    "social_sentiment": 0-100,
-    "key_insights": ["insight1", "insight2", "insight3"]
-}}
-
-Be concise. Respond ONLY with the JSON."""
-
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # Fastest & cheapest
-            messages=[
-                {"role": "system", "content": "You are a financial sentiment analyst. Respond only in valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=300,
-            temperature=0.3
-        )
-        
-        content = response.choices[0].message.content.strip()
-        
-        # Parse JSON
-        if "{" in content:
-            json_start = content.index("{")
-            json_end = content.rindex("}") + 1
-            result = json.loads(content[json_start:json_end])
-            
-            return {
-                "signal": result.get("signal", "HOLD"),
-                "confidence": min(100, max(50, result.get("confidence", 65))),
-                "reasoning": result.get("reasoning", "Analysis complete."),
-                "sentiment_score": min(1.0, max(0.0, result.get("sentiment_score", 0.5))),
-                "news_sentiment": result.get("news_sentiment", 50),
-                "social_sentiment": result.get("social_sentiment", 50),
-                "insights": result.get("key_insights", ["Analysis complete"])
-            }
-        else:
-            raise ValueError("No JSON in response")
-            
+        return request_analysis(ticker, news, tweets, price)
+    except ProviderUnavailable:
+        logger.warning("OpenAI not available, using fallback")
+        record_fallback("openai", "no_key")
     except Exception as e:
         logger.error(f"OpenAI analysis failed: {e}")
-        return _fallback_analysis(ticker, news, tweets)
+        record_fallback("openai", "exception")
+    return _fallback_analysis(ticker, news, tweets)
 
 
-def _fallback_analysis(ticker: str, news: List[Dict], tweets: List[Dict]) -> Dict:
-    """Fallback when OpenAI is not available."""
-    import random
+def is_available() -> bool:
+    return bool(os.getenv("OPENAI_API_KEY")) and OPENAI_AVAILABLE
+
+
+def request_analysis(ticker: str, news: List[Dict], tweets: List[Dict], price: Dict = None,
+                     cancel=None, on_field=None) -> Dict:
+    """
+    One GPT-4o-mini analysis with no fallback: raises ProviderUnavailable
+    without a key/SDK and propagates API or parse errors, so callers (the
+    fallback wrapper above, or the hedging router) decide what to do.
     
-    # Simple keyword-based sentiment
-    positive_words = ["bullish", "buy", "up", "growth", "beat", "strong", "moon", "rocket", "🚀"]
-    negative_words = ["bearish", "sell", "down", "decline", "miss", "weak", "crash", "dump"]
+    The completion is streamed and parsed incrementally; `on_field(key,
+    value)` receives each top-level field (signal first) as it completes.
+    """
+    if not is_available():
+        raise ProviderUnavailable("openai")
     
-    all_text = " ".join([n.get("title", "") for n in news] + [t.get("text", "") for t in tweets]).lower()
+    from openai import OpenAI
+    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     
-    pos_count = sum(1 for word in positive_words if word in all_text)
-    neg_count = sum(1 for word in negative_words if word in all_text)
+    # Build a token-bounded prompt from the most informative items
+    builder = PromptBuilder(MODEL, system=SYSTEM_PROMPT)
+    top_news = select_evidence(news, ticker, k=RANK_NEWS_K, count_tokens=builder.count)
+    top_tweets = select_evidence(tweets, ticker, k=RANK_SOCIAL_K, count_tokens=builder.count)
+    price_info = f"${price.get('price', 0):.2f} ({price.get('change_percent', '0%')})" if price else "N/A"
     
-    if pos_count > neg_count + 1:
-        signal = "BUY"
-        confidence = min(95, 70 + pos_count * 5)
-        sentiment = 0.7 + random.uniform(0, 0.25)
-    elif neg_count > pos_count + 1:
-        signal = "SELL"
-        confidence = min(95, 70 + neg_count * 5)
-        sentiment = 0.3 - random.uniform(0, 0.2)
-    else:
-        signal = "HOLD"
-        confidence = random.randint(55, 70)
-        sentiment = 0.5 + random.uniform(-0.1, 0.1)
+    builder.add_text(f"Analyze the sentiment for {ticker} stock based on this data:\n\nCURRENT PRICE: {price_info}")
+    builder.add_list("news", "NEWS HEADLINES:", [_headline(n) for n in top_news], share=0.6, max_item_tokens=60, bullet="")
+    builder.add_list("social", "SOCIAL MEDIA:", [t.get("text", "") for t in top_tweets], share=0.4, max_item_tokens=50)
+    # The response schema is enforced by structured outputs; the prompt only
+    # says what the fields mean
+    builder.add_text("Give the signal, confidence (0-100), a 2-3 sentence reasoning, sentiment_score "
+                     "(0 bearish - 1 bullish), news and social sentiment (0-100) and up to 3 key insights. Be concise.")
+    prompt, usage = builder.build()
+
+    def call(repairs, on_field):
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ] + [{"role": "user", "content": r} for r in repairs]
+        with timed("llm"):
+            stream = client.chat.completions.create(
+                model=MODEL,
+                messages=messages,
+                max_tokens=MAX_COMPLETION_TOKENS,
+                temperature=0.3,
+                response_format=OPENAI_RESPONSE_FORMAT,
+                stream=True
+            )
+            try:
+                deltas = (chunk.choices[0].delta.content for chunk in stream if chunk.choices)
+                fields, content = stream_fields(deltas, on_field=on_field, cancel=cancel)
+            finally:
+                stream.response.close()
+        record_usage("openai", usage, None, completion_text=content)
+        return fields, content
+
+    result = request_with_repair("openai", call, on_field=on_field)
+    record_source("openai", real=True)
     
     return {
-        "signal": signal,
-        "confidence": confidence,
-        "reasoning": f"Based on {len(news)} news articles and {len(tweets)} social posts, sentiment is trending {'bullish' if signal == 'BUY' else 'bearish' if signal == 'SELL' else 'neutral'}.",
-        "sentiment_score": sentiment,
-        "news_sentiment": random.randint(40, 90),
-        "social_sentiment": random.randint(40, 90),
-        "insights": [
-            f"{'Positive' if signal == 'BUY' else 'Negative' if signal == 'SELL' else 'Mixed'} sentiment detected",
-            f"{len(news)} news sources analyzed",
-            f"{len(tweets)} social posts processed"
-        ]
+        "signal": result["signal"],
+        "confidence": max(50, result["confidence"]),
+        "reasoning": result["reasoning"],
+        "sentiment_score": result["sentiment_score"],
+        "news_sentiment": result["news_sentiment"],
+        "social_sentiment": result["social_sentiment"],
+        "insights": result["key_insights"] or ["Analysis complete"],
+        "usage": usage
     }
 
 
+def _headline(article: Dict) -> str:
+    """Prompt line for an article; syndicated stories note their reach."""
+    copies = article.get("cluster_size", 1)
+    reach = f" (reported by {copies} outlets)" if copies > 1 else ""
+    return f"- {article.get('title', '')}{reach}"
+
+
+def _fallback_analysis(ticker: str, news: List[Dict], tweets: List[Dict]) -> Dict:
+    """Fallback when OpenAI is not available: the shared lexicon scorer."""
+    return lexicon_analysis(ticker, news, tweets)
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     
@@ -0,0 +1,67 @@
+"""
+Sentient110 - Preload Mode
+Warm heavy imports and models up front for long-running workers
+
+Serverless instances keep every heavy dependency lazy so a cold start only
+pays for what the first request touches. Long-lived workers (uvicorn,
+gunicorn --preload forking several workers) would rather pay once at boot
+and share the imported pages across forks. Set SENTIENT_PRELOAD=1 (or call
+preload()) to do that.
+"""
+
+import os
+import time
+import logging
+import importlib
+from typing import Dict, Iterable
+
+logger = logging.getLogger("sentient110.preload")
+
+PRELOAD_ENABLED = os.getenv("SENTIENT_PRELOAD", "").lower() in ("1", "true", "yes")
+# Also load the RoBERTa weights (large download / memory; opt-in separately)
+PRELOAD_MODEL = os.getenv("SENTIENT_PRELOAD_MODEL", "").lower() in ("1", "true", "yes")
+
+# Heavy third-party SDKs that the services import lazily
+HEAVY_MODULES = ("requests", "openai", "anthropic")
+
+SERVICE_MODULES = (
+    "services.data_aggregator",
+    "services.openai_analyzer",
+    "services.claude_ai",
+    "services.analyzer",
+)
+
+
+def preload(modules: Iterable[str] = None, load_model: bool = None) -> Dict[str, float]:
+    """
+    Import `modules` (default: heavy SDKs + services) and optionally the
+    sentiment model. Returns {module: seconds}; missing optional packages
+    are skipped.
+    """
+    timings = {}
+    for name in modules or HEAVY_MODULES + SERVICE_MODULES:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.info(f"⏭️ Preload skipped {name}: {e}")
+            continue
+        timings[name] = time.perf_counter() - start
+
+    if PRELOAD_MODEL if load_model is None else load_model:
+        start = time.perf_counter()
+        try:
+            from services.analyzer import get_analyzer
+            get_analyzer().preload()
+            timings["roberta_model"] = time.perf_counter() - start
+        except ImportError as e:
+            logger.info(f"⏭️ Model preload skipped: {e}")
+
+    total = sum(timings.values())
+    logger.info(f"🔥 Preloaded {len(timings)} modules in {total * 1000:.0f}ms")
+    return timings
+
+
+def preload_if_enabled() -> Dict[str, float]:
+    """Run preload() when SENTIENT_PRELOAD is set; no-op otherwise."""
+    return preload() if PRELOAD_ENABLED else {}
@@ -0,0 +1,222 @@
+"""
+Sentient110 - Cache Pre-warming
+Analyze a configured ticker universe shortly before each exchange opens, so
+the first users of the day hit a warm cache and history instead of the cold
+path. Runs as an in-process scheduler or from the command line:
+
+    python -m services.prewarm                  # warm the server at API_BASE_URL
+    python -m services.prewarm --local          # run the pipeline here (shared cache via REDIS_URL)
+    python -m services.prewarm --calendar IN TCS.NSE INFY.NSE
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from services.metrics import timed
+from services.ttl_policy import EXCHANGES, TTL_MIN, exchange_for
+
+logger = logging.getLogger("sentient110.prewarm")
+
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() in ("1", "true", "yes")
+PREWARM_TICKERS = [t.strip().upper() for t in os.getenv(
+    "PREWARM_TICKERS", "TSLA,NVDA,AAPL,GOOGL,MSFT,AMZN,META,RELIANCE.BSE,TCS.NSE,INFY.NSE"
+).split(",") if t.strip()]
+# Minutes before the open to start; after ttl_policy has expired the
+# overnight entries (an hour before the open)
+PREWARM_LEAD_MINUTES = float(os.getenv("PREWARM_LEAD_MINUTES", 30))
+# Warmed entries live this long past the open (the pre-open policy TTL
+# would expire them before it)
+PREWARM_OPEN_MARGIN_MINUTES = float(os.getenv("PREWARM_OPEN_MARGIN_MINUTES", 15))
+# Uncached analyses started per minute. Each one costs a NewsAPI, Alpha
+# Vantage and (when escalated) LLM call; the default fits Alpha Vantage's
+# free tier of 5 requests/minute.
+PREWARM_PER_MINUTE = float(os.getenv("PREWARM_PER_MINUTE", 5))
+API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
+
+# Recent run reports, newest last (served by /api/health)
+REPORTS: deque = deque(maxlen=10)
+
+
+def universe_by_calendar(tickers: List[str] = None) -> Dict[str, List[str]]:
+    """Tickers grouped by trading calendar ("US", "IN")."""
+    groups: Dict[str, List[str]] = {}
+    for ticker in tickers if tickers is not None else PREWARM_TICKERS:
+        groups.setdefault(EXCHANGES[exchange_for(ticker)].name, []).append(ticker)
+    return groups
+
+
+def _calendar(name: str):
+    return next(c for c in EXCHANGES.values() if c.name == name)
+
+
+def next_run(calendar: str, now: datetime = None) -> datetime:
+    """Next warm-up time for `calendar`: PREWARM_LEAD_MINUTES before its next open."""
+    now = now or datetime.now(timezone.utc)
+    cal = _calendar(calendar)
+    lead = timedelta(minutes=PREWARM_LEAD_MINUTES)
+    opens = cal.next_open(now)
+    if opens - lead <= now:
+        # This session's slot has gone by (or it is trading): use the next one
+        opens = cal.next_open(datetime.combine(opens.date(), cal.close_at, cal.tz))
+    return opens - lead
+
+
+def prewarm_ttl(ticker: str, now: datetime = None) -> int:
+    """Cache TTL for a warmed analysis: until PREWARM_OPEN_MARGIN_MINUTES after the next open."""
+    now = now or datetime.now(timezone.utc)
+    opens = EXCHANGES[exchange_for(ticker)].next_open(now)
+    until_open = max(0.0, (opens - now).total_seconds())
+    return int(max(TTL_MIN, until_open + PREWARM_OPEN_MARGIN_MINUTES * 60))
+
+
+def is_prewarm_ticker(ticker: str) -> bool:
+    """Only the configured universe may be warmed with the long pre-open TTL."""
+    return ticker.upper() in PREWARM_TICKERS
+
+
+class Prewarmer:
+    """
+    Runs `analyze(ticker) -> AnalysisResponse dict` over a universe. Calls
+    that had to go upstream are spaced 60/per_minute seconds apart; cache
+    hits are free and not paced.
+    """
+
+    def __init__(self, analyze: Callable[[str], Dict], per_minute: float = PREWARM_PER_MINUTE):
+        self.analyze = analyze
+        self.interval = 60 / per_minute if per_minute > 0 else 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self, tickers: List[str], calendar: str = None) -> Dict:
+        """Warm `tickers` once; returns (and keeps) a coverage/timing report."""
+        started = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        per_ticker: Dict[str, float] = {}
+        warmed, cached, failed = [], [], []
+        last_call = None
+
+        for ticker in tickers:
+            if self._stop.is_set():
+                break
+            if last_call is not None and self.interval:
+                # Pace upstream calls within the quota
+                self._stop.wait(max(0.0, last_call + self.interval - time.monotonic()))
+            t0 = time.perf_counter()
+            try:
+                with timed("prewarm_ticker"):
+                    result = self.analyze(ticker)
+            except Exception as e:
+                logger.warning(f"⚠️ Pre-warm failed for {ticker}: {e}")
+                failed.append(ticker)
+                last_call = time.monotonic()
+                continue
+            per_ticker[ticker] = round(time.perf_counter() - t0, 3)
+            if result.get("cached"):
+                cached.append(ticker)
+            else:
+                last_call = time.monotonic()
+                if result.get("using_real_data"):
+                    warmed.append(ticker)
+                else:
+                    failed.append(ticker)  # demo data isn't cached, so nothing was warmed
+
+        ready = len(warmed) + len(cached)
+        report = {
+            "calendar": calendar,
+            "started": started.isoformat(),
+            "duration_s": round(time.perf_counter() - start, 3),
+            "tickers": len(tickers),
+            "warmed": warmed,
+            "already_cached": cached,
+            "failed": failed,
+            "coverage": round(ready / len(tickers), 4) if tickers else None,
+            "per_ticker_s": per_ticker,
+        }
+        REPORTS.append(report)
+        logger.info(f"🔥 Pre-warm {calendar or 'run'}: {ready}/{len(tickers)} ready in {report['duration_s']}s")
+        return report
+
+    def start(self, tickers: List[str] = None):
+        """Warm each calendar's tickers before every open, in a daemon thread."""
+        if self._thread is not None:
+            return
+        groups = universe_by_calendar(tickers)
+        if not groups:
+            logger.warning("⚠️ Pre-warm enabled but PREWARM_TICKERS is empty; not scheduling")
+            return
+        self._thread = threading.Thread(target=self._loop, args=(groups,), name="prewarm", daemon=True)
+        self._thread.start()
+        logger.info(f"⏰ Pre-warm scheduled for {sum(len(t) for t in groups.values())} tickers")
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, groups: Dict[str, List[str]]):
+        groups = {name: tickers for name, tickers in groups.items() if tickers}
+        while groups and not self._stop.is_set():
+            now = datetime.now(timezone.utc)
+            calendar, due = min(((name, next_run(name, now)) for name in groups), key=lambda item: item[1])
+            if self._stop.wait((due - now).total_seconds()):
+                break
+            self.run(groups[calendar], calendar)
+
+
+def status() -> Dict:
+    """Last run report per calendar and the next scheduled runs."""
+    last = {}
+    for report in REPORTS:
+        last[report["calendar"] or "manual"] = report
+    return {
+        "enabled": PREWARM_ENABLED,
+        "universe": len(PREWARM_TICKERS),
+        "next_runs": {name: next_run(name).isoformat() for name in universe_by_calendar()},
+        "last_runs": last,
+    }
+
+
+def _remote_analyze(base_url: str) -> Callable[[str], Dict]:
+    import requests
+    session = requests.Session()
+
+    def analyze(ticker: str) -> Dict:
+        # /api/prewarm, not /api/analyze: the server applies prewarm_ttl
+        response = session.post(f"{base_url.rstrip('/')}/api/prewarm", json={"ticker": ticker}, timeout=60)
+        response.raise_for_status()
+        return response.json()
+    return analyze
+
+
+def _local_analyze() -> Callable[[str], Dict]:
+    from main import AnalysisRequest, _analyze_ticker
+    return lambda ticker: _analyze_ticker(AnalysisRequest(ticker=ticker), ttl=prewarm_ttl(ticker))
+
+
+def main(argv: List[str] = None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Pre-warm the Sentient110 analysis cache")
+    parser.add_argument("tickers", nargs="*", help="tickers to warm (default: PREWARM_TICKERS)")
+    parser.add_argument("--calendar", choices=sorted({c.name for c in EXCHANGES.values()}),
+                        help="only tickers trading on this calendar")
+    parser.add_argument("--url", default=API_BASE_URL, help="server to warm (default: API_BASE_URL)")
+    parser.add_argument("--local", action="store_true", help="run the pipeline in this process instead")
+    parser.add_argument("--per-minute", type=float, default=PREWARM_PER_MINUTE, help="upstream calls per minute")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    groups = universe_by_calendar([t.upper() for t in args.tickers] or None)
+    if args.calendar:
+        groups = {args.calendar: groups.get(args.calendar, [])}
+    warmer = Prewarmer(_local_analyze() if args.local else _remote_analyze(args.url), per_minute=args.per_minute)
+    reports = [warmer.run(tickers, calendar) for calendar, tickers in groups.items()]
+    print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
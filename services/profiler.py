@@ -0,0 +1,129 @@
+"""
+Sentient110 - On-Demand Request Profiler
+Low-overhead sampling profiler that captures collapsed stacks for a single request
+"""
+
+import os
+import sys
+import time
+import uuid
+import random
+import hmac
+import logging
+import threading
+from collections import Counter, OrderedDict
+from typing import Optional
+
+logger = logging.getLogger("sentient110.profiler")
+
+# Opt-in: an `X-Profile-Token` header matching PROFILE_TOKEN, or random sampling
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", 50))
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# {profile_id: collapsed-stack text}, oldest evicted first
+PROFILES = OrderedDict()
+_store_lock = threading.Lock()
+
+
+def should_profile(token: Optional[str]) -> bool:
+    """Profile when the caller presents the configured token, or by sampling."""
+    if token and PROFILE_TOKEN and hmac.compare_digest(token, PROFILE_TOKEN):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack from a background thread at a fixed interval.
+    Output is Brendan Gregg's collapsed format (`frame;frame;frame count`),
+    ready for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, thread_id: int = None, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval_ms / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._sampler = None
+        self._started = 0.0
+        self.duration = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="sentient110-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._started
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def _store(profile_id: str, text: str):
+    with _store_lock:
+        PROFILES[profile_id] = text
+        while len(PROFILES) > PROFILE_MAX_STORED:
+            PROFILES.popitem(last=False)
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    """Collapsed-stack output for a stored profile, or None."""
+    with _store_lock:
+        return PROFILES.get(profile_id)
+
+
+class profile_request:
+    """
+    Profile the calling thread for the duration of the block when enabled:
+
+        with profile_request(enabled, label=ticker) as prof:
+            ...
+        prof.profile_id  # None when profiling was not enabled
+    """
+
+    def __init__(self, enabled: bool, label: str = ""):
+        self.enabled = enabled
+        self.label = label
+        self.profile_id = None
+        self._profiler = None
+
+    def __enter__(self):
+        if self.enabled:
+            self.profile_id = uuid.uuid4().hex[:16]
+            self._profiler = SamplingProfiler().start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profiler:
+            self._profiler.stop()
+            _store(self.profile_id, self._profiler.collapsed())
+            logger.info(
+                f"🔥 Profile {self.profile_id} ({self.label}): "
+                f"{self._profiler.samples} samples over {self._profiler.duration * 1000:.0f}ms"
+            )
+        return False
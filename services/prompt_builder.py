@@ -0,0 +1,187 @@
+"""
+Sentient110 - Prompt Builder
+Token-budgeted prompt construction for the LLM analyzers: counts with the
+model's tokenizer, splits the budget across sections, truncates on token
+boundaries and reports prompt/completion usage
+"""
+
+import os
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.metrics import record_tokens
+
+logger = logging.getLogger("sentient110.prompt")
+
+# Hard cap on the user prompt; instructions are counted against it too
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", 700))
+# Smallest useful tail when the last list item has to be cut
+MIN_ITEM_TOKENS = 8
+
+# Anthropic ships no local tokenizer; cl100k_base tracks Claude's counts
+# closely enough for budgeting
+_ENCODINGS = {"gpt-4o": "o200k_base", "gpt-4o-mini": "o200k_base"}
+_DEFAULT_ENCODING = "cl100k_base"
+_encoders: Dict[str, object] = {}
+
+
+def _encoder(model: str):
+    """
+    tiktoken encoding for `model`, or None when tiktoken isn't installed.
+    tiktoken downloads each BPE file on first use (once per cold start on
+    serverless) unless TIKTOKEN_CACHE_DIR points at a directory holding it.
+    """
+    name = _ENCODINGS.get(model, _DEFAULT_ENCODING)
+    if name not in _encoders:
+        try:
+            import tiktoken
+            _encoders[name] = tiktoken.get_encoding(name)
+        except ImportError as e:
+            logger.info(f"⏭️ tiktoken unavailable ({e}); estimating tokens")
+            _encoders[name] = None
+        except ValueError as e:  # unknown encoding: o200k_base needs tiktoken>=0.7
+            logger.warning(f"⚠️ tiktoken has no {name} ({e}); estimating tokens")
+            _encoders[name] = None
+        except Exception as e:  # no network for the BPE file, and no TIKTOKEN_CACHE_DIR copy
+            logger.warning(f"⚠️ Couldn't load {name} ({e}); estimating tokens")
+            _encoders[name] = None
+    return _encoders[name]
+
+
+def tokenizer_name(model: str) -> str:
+    return f"tiktoken:{_ENCODINGS.get(model, _DEFAULT_ENCODING)}" if _encoder(model) else "heuristic"
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    if not text:
+        return 0
+    encoder = _encoder(model)
+    if encoder is None:
+        # ~4 chars per token for English prose
+        return max(1, (len(text) + 3) // 4)
+    return len(encoder.encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "gpt-4o-mini") -> str:
+    """Cut `text` to at most `max_tokens`, on a token (or word) boundary."""
+    if max_tokens <= 0:
+        return ""
+    encoder = _encoder(model)
+    if encoder is None:
+        limit = max_tokens * 4
+        if len(text) <= limit:
+            return text
+        cut = text[:limit]
+        space = cut.rfind(" ")
+        return (cut[:space] if space > limit // 2 else cut).rstrip() + "…"
+    tokens = encoder.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoder.decode(tokens[:max_tokens - 1]).rstrip() + "…"
+
+
+class PromptBuilder:
+    """
+    Assemble a prompt from fixed text and budgeted sections:
+
+        builder = PromptBuilder("gpt-4o-mini")
+        builder.add_text("Analyze TSLA ...")
+        builder.add_list("news", "NEWS HEADLINES:", headlines, share=0.6, max_item_tokens=60)
+        builder.add_list("social", "SOCIAL MEDIA:", posts, share=0.4, max_item_tokens=50)
+        builder.add_text(JSON_INSTRUCTIONS)
+        prompt, usage = builder.build()
+
+    Fixed text is always kept. Whatever budget remains is split across the
+    sections by `share`; a section that needs less passes the rest on to the
+    sections after it.
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini", max_tokens: int = PROMPT_MAX_TOKENS, system: str = ""):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.system = system
+        self._parts: List[Tuple[str, object]] = []
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def add_text(self, text: str) -> "PromptBuilder":
+        self._parts.append(("text", text))
+        return self
+
+    def add_list(self, name: str, header: str, items: List[str], share: float = 1.0,
+                 max_item_tokens: int = None, bullet: str = "- ") -> "PromptBuilder":
+        self._parts.append(("list", (name, header, items, share, max_item_tokens, bullet)))
+        return self
+
+    def _render_list(self, header: str, items: List[str], budget: int,
+                     max_item_tokens: Optional[int], bullet: str) -> Tuple[str, int]:
+        lines = [header]
+        used = self.count(header) + 1
+        for item in items:
+            line = bullet + item
+            if max_item_tokens:
+                line = truncate_tokens(line, max_item_tokens, self.model)
+            cost = self.count(line) + 1  # + newline
+            if used + cost > budget:
+                remaining = budget - used - 1
+                if remaining >= MIN_ITEM_TOKENS:
+                    line = truncate_tokens(line, remaining, self.model)
+                    lines.append(line)
+                    used += self.count(line) + 1
+                break
+            lines.append(line)
+            used += cost
+        if len(lines) == 1:
+            lines.append(bullet + "(none)")
+            used += self.count(lines[-1]) + 1
+        return "\n".join(lines), used
+
+    def build(self) -> Tuple[str, Dict]:
+        """(prompt, usage) where usage has the estimated prompt tokens per section."""
+        fixed = sum(self.count(part) for kind, part in self._parts if kind == "text")
+        fixed += self.count(self.system)
+        available = max(0, self.max_tokens - fixed)
+        shares = sum(part[3] for kind, part in self._parts if kind == "list") or 1.0
+
+        rendered, sections, carry = [], {}, 0
+        for kind, part in self._parts:
+            if kind == "text":
+                rendered.append(part)
+                continue
+            name, header, items, share, max_item_tokens, bullet = part
+            budget = int(available * share / shares) + carry
+            text, used = self._render_list(header, items, budget, max_item_tokens, bullet)
+            carry = max(0, budget - used)
+            rendered.append(text)
+            sections[name] = used
+
+        prompt = "\n\n".join(rendered)
+        usage = {
+            "model": self.model,
+            "tokenizer": tokenizer_name(self.model),
+            "prompt_budget": self.max_tokens,
+            "prompt_tokens_est": self.count(prompt) + self.count(self.system),
+            "sections": sections,
+        }
+        if usage["prompt_tokens_est"] > self.max_tokens:
+            logger.warning(f"⚠️ Prompt fixed text alone exceeds budget: {usage['prompt_tokens_est']} > {self.max_tokens}")
+        return prompt, usage
+
+
+def record_usage(provider: str, usage: Dict, response, completion_text: str = None) -> Dict:
+    """
+    Fill `usage` with the provider-reported token counts from an OpenAI
+    (prompt/completion_tokens) or Anthropic (input/output_tokens) response.
+    Streams that report no usage fall back to our own counts, with the
+    completion counted from `completion_text`.
+    """
+    reported = getattr(response, "usage", None)
+    prompt = getattr(reported, "prompt_tokens", None) or getattr(reported, "input_tokens", None)
+    completion = getattr(reported, "completion_tokens", None) or getattr(reported, "output_tokens", None)
+    if completion is None and completion_text is not None:
+        completion = count_tokens(completion_text, usage.get("model", "gpt-4o-mini"))
+    usage["prompt_tokens"] = prompt if prompt is not None else usage.get("prompt_tokens_est", 0)
+    usage["completion_tokens"] = completion or 0
+    record_tokens(provider, usage["prompt_tokens"], usage["completion_tokens"])
+    return usage
@@ -0,0 +1,317 @@
+"""
+Sentient110 - Quote Service
+Stock quotes behind a pluggable provider interface. Concurrent single-ticker
+requests arriving within a short window are merged into one bulk call where
+the provider has a bulk endpoint, identical in-flight requests share one
+fetch, and quotes are kept briefly in memory so many analyses share them
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional
+
+from services.cache import MemoryBackend
+from services.metrics import REGISTRY
+from services.negative_cache import NEGATIVE_CACHE, alpha_vantage_failure
+
+logger = logging.getLogger("sentient110.quotes")
+
+QUOTE_PROVIDER = os.getenv("QUOTE_PROVIDER", "alpha_vantage")
+# Seconds a quote is shared between analyses
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", 30))
+# How long the first request of a batch waits for others to join (ms)
+QUOTE_BATCH_WINDOW_MS = float(os.getenv("QUOTE_BATCH_WINDOW_MS", 25))
+# Seconds a caller waits for its batch before giving up
+QUOTE_TIMEOUT = float(os.getenv("QUOTE_TIMEOUT", 15))
+ALPHA_VANTAGE_URL = os.getenv("ALPHA_VANTAGE_URL", "https://www.alphavantage.co/query")
+# REALTIME_BULK_QUOTES (up to 100 US symbols per call) needs a premium key
+ALPHA_VANTAGE_BULK = os.getenv("ALPHA_VANTAGE_BULK", "false").lower() in ("1", "true", "yes")
+
+QUOTE_REQUESTS = REGISTRY.counter(
+    "sentient110_quote_requests_total",
+    "Quote lookups by outcome (cache, shared, fetched, failed)"
+)
+QUOTE_CALLS = REGISTRY.counter(
+    "sentient110_quote_upstream_calls_total",
+    "Upstream quote calls by provider and endpoint (single, bulk)"
+)
+QUOTE_BATCH_SIZE = REGISTRY.histogram(
+    "sentient110_quote_batch_size",
+    "Symbols per quote batch",
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+
+
+class QuoteError(Exception):
+    """No quote; `failure` is a negative-cache failure class."""
+
+    def __init__(self, failure: str, message: str = ""):
+        super().__init__(message or failure)
+        self.failure = failure
+
+
+class QuoteProvider:
+    """
+    Interface for quote sources. `fetch` returns normalized quotes
+    ({"symbol", "price", "change", "change_percent", "volume"}) keyed by
+    symbol, leaving out symbols the provider doesn't know, and raises
+    QuoteError for failures of the whole call.
+    """
+
+    name = "base"
+    # Symbols per call; 1 means no bulk endpoint (and no batching window)
+    max_batch = 1
+
+    def available(self) -> bool:
+        return True
+
+    def fetch(self, symbols: List[str]) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+
+class AlphaVantageProvider(QuoteProvider):
+    """GLOBAL_QUOTE per symbol, or REALTIME_BULK_QUOTES for US symbols on premium keys."""
+
+    name = "alpha_vantage"
+    BULK_SIZE = 100
+
+    def __init__(self, bulk: bool = ALPHA_VANTAGE_BULK, url: str = ALPHA_VANTAGE_URL):
+        self.bulk = bulk
+        self.url = url
+        self._session = None
+
+    @property
+    def max_batch(self) -> int:
+        return self.BULK_SIZE if self.bulk else 1
+
+    def available(self) -> bool:
+        return bool(os.getenv("ALPHA_VANTAGE_KEY"))
+
+    def _get(self, params: Dict) -> Dict:
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        params["apikey"] = os.getenv("ALPHA_VANTAGE_KEY")
+        response = self._session.get(self.url, params=params, timeout=10)
+        if response.status_code == 429:
+            raise QuoteError("rate_limited", "HTTP 429")
+        if response.status_code >= 400:
+            raise QuoteError("upstream_error", f"HTTP {response.status_code}")
+        return response.json()
+
+    def fetch(self, symbols: List[str]) -> Dict[str, Dict]:
+        quotes: Dict[str, Dict] = {}
+        # The bulk endpoint only covers US listings
+        us = [s for s in symbols if "." not in s] if self.bulk else []
+        if len(us) > 1:
+            try:
+                quotes.update(self._fetch_bulk(us))
+            except QuoteError as e:
+                if e.failure != "unsupported":
+                    raise
+                logger.warning("⚠️ Alpha Vantage bulk quotes unavailable for this key, using GLOBAL_QUOTE")
+                self.bulk = False
+                us = []
+        for symbol in symbols:
+            if symbol in us:
+                continue
+            quote = self._fetch_single(symbol)
+            if quote is not None:
+                quotes[symbol] = quote
+        return quotes
+
+    def _fetch_single(self, symbol: str) -> Optional[Dict]:
+        QUOTE_CALLS.inc(provider=self.name, endpoint="single")
+        data = self._get({"function": "GLOBAL_QUOTE", "symbol": symbol})
+        quote = data.get("Global Quote", {})
+        if not quote:
+            if alpha_vantage_failure(data) == "rate_limited":
+                raise QuoteError("rate_limited", str(data.get("Note") or data.get("Information")))
+            return None
+        return {
+            "symbol": quote.get("01. symbol", symbol),
+            "price": float(quote.get("05. price", 0)),
+            "change": float(quote.get("09. change", 0)),
+            "change_percent": quote.get("10. change percent", "0%"),
+            "volume": int(quote.get("06. volume", 0))
+        }
+
+    def _fetch_bulk(self, symbols: List[str]) -> Dict[str, Dict]:
+        QUOTE_CALLS.inc(provider=self.name, endpoint="bulk")
+        data = self._get({"function": "REALTIME_BULK_QUOTES", "symbol": ",".join(symbols)})
+        rows = data.get("data")
+        if rows is None:
+            message = str(data.get("Information") or data.get("Note") or data.get("message") or "")
+            raise QuoteError("unsupported" if "premium" in message.lower() else "rate_limited", message)
+        quotes = {}
+        for row in rows:
+            symbol = row.get("symbol", "").upper()
+            if symbol not in symbols:
+                continue
+            change_percent = str(row.get("change_percent", "0"))
+            quotes[symbol] = {
+                "symbol": symbol,
+                "price": float(row.get("close", 0)),
+                "change": float(row.get("change", 0)),
+                "change_percent": change_percent if change_percent.endswith("%") else f"{change_percent}%",
+                "volume": int(float(row.get("volume", 0)))
+            }
+        return quotes
+
+
+PROVIDERS = {"alpha_vantage": AlphaVantageProvider}
+
+
+def create_provider(name: str = QUOTE_PROVIDER) -> QuoteProvider:
+    if name not in PROVIDERS:
+        logger.warning(f"⚠️ Unknown QUOTE_PROVIDER {name!r}, using alpha_vantage")
+        name = "alpha_vantage"
+    return PROVIDERS[name]()
+
+
+class QuoteService:
+    """
+    Thread-safe quote lookups. The first caller to add a symbol to an empty
+    pending set leads the batch: it waits up to `window` seconds (less if
+    the batch fills), then fetches everything pending in provider-sized
+    chunks while the other callers wait on their futures.
+    """
+
+    def __init__(self, provider: QuoteProvider = None, ttl: float = QUOTE_CACHE_TTL,
+                 window: float = QUOTE_BATCH_WINDOW_MS / 1000):
+        self.provider = provider or create_provider()
+        self.ttl = ttl
+        self.window = window
+        self.cache = MemoryBackend()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._full = threading.Event()
+
+    def get(self, symbol: str) -> Dict:
+        """Quote for `symbol`; raises QuoteError when there is none."""
+        symbol = symbol.upper()
+        return self._wait(self._request([symbol]))[symbol]
+
+    def get_many(self, symbols: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Quotes for several symbols in as few upstream calls as possible (None where unavailable)."""
+        futures = self._request([s.upper() for s in symbols])
+        results = {}
+        for symbol, future in futures.items():
+            try:
+                results[symbol] = self._wait({symbol: future})[symbol]
+            except QuoteError:
+                results[symbol] = None
+        return results
+
+    def prefetch(self, symbols: Iterable[str]) -> int:
+        """
+        Warm the cache for symbols about to be analyzed together (a batch, a
+        watchlist) so their lookups become cache hits. Only bulk providers
+        gain from this: without a bulk endpoint it would just make the same
+        single-symbol calls up front, one after another. Returns the number
+        of symbols fetched.
+        """
+        if self.provider.max_batch <= 1 or not self.provider.available():
+            return 0
+        symbols = [s.upper() for s in symbols if self.cache.get(s.upper()) is None]
+        if symbols:
+            self.get_many(symbols)
+        return len(symbols)
+
+    def _request(self, symbols: List[str]) -> Dict[str, Future]:
+        futures: Dict[str, Future] = {}
+        lead = False
+        with self._lock:
+            for symbol in symbols:
+                if symbol in futures:
+                    continue
+                cached = self.cache.get(symbol)
+                if cached is not None:
+                    QUOTE_REQUESTS.inc(outcome="cache")
+                    future = Future()
+                    future.set_result(cached)
+                elif symbol in self._pending or symbol in self._inflight:
+                    QUOTE_REQUESTS.inc(outcome="shared")
+                    future = self._pending.get(symbol) or self._inflight[symbol]
+                else:
+                    future = Future()
+                    lead = lead or not self._pending
+                    self._pending[symbol] = future
+                    if len(self._pending) >= self.provider.max_batch:
+                        self._full.set()
+                futures[symbol] = future
+        if lead:
+            self._lead()
+        return futures
+
+    def _wait(self, futures: Dict[str, Future]) -> Dict[str, Dict]:
+        return {symbol: future.result(timeout=QUOTE_TIMEOUT) for symbol, future in futures.items()}
+
+    def _lead(self):
+        if self.provider.max_batch > 1:
+            self._full.wait(self.window)
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            self._full.clear()
+            self._inflight.update(batch)
+        try:
+            symbols = list(batch)
+            for start in range(0, len(symbols), self.provider.max_batch):
+                self._fetch(symbols[start:start + self.provider.max_batch], batch)
+        finally:
+            with self._lock:
+                for symbol in batch:
+                    self._inflight.pop(symbol, None)
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(QuoteError("upstream_error"))
+
+    def _fetch(self, symbols: List[str], futures: Dict[str, Future]):
+        QUOTE_BATCH_SIZE.observe(len(symbols), provider=self.provider.name)
+        try:
+            quotes = self.provider.fetch(symbols)
+        except QuoteError as e:
+            quotes, failure = {}, e.failure
+            logger.error(f"Quote fetch failed ({failure}): {e}")
+        except Exception as e:
+            quotes, failure = {}, "upstream_error"
+            logger.error(f"Quote fetch failed: {e}")
+        else:
+            failure = "unknown_symbol"
+
+        for symbol in symbols:
+            quote = quotes.get(symbol)
+            if quote is not None:
+                QUOTE_REQUESTS.inc(outcome="fetched")
+                self.cache.set(symbol, quote, self.ttl)
+                futures[symbol].set_result(quote)
+            else:
+                QUOTE_REQUESTS.inc(outcome="failed")
+                NEGATIVE_CACHE.record(self.provider.name, symbol, failure)
+                futures[symbol].set_exception(QuoteError(failure))
+
+    def stats(self) -> Dict:
+        return {
+            "provider": self.provider.name,
+            "bulk": self.provider.max_batch > 1,
+            "cached": len(self.cache),
+            "requests": {outcome: int(QUOTE_REQUESTS.value(outcome=outcome))
+                         for outcome in ("cache", "shared", "fetched", "failed")},
+            "upstream_calls": int(QUOTE_CALLS.total()),
+            "batch_p50": QUOTE_BATCH_SIZE.quantile(0.5, provider=self.provider.name),
+        }
+
+
+_service: Optional[QuoteService] = None
+_service_lock = threading.Lock()
+
+
+def get_quote_service() -> QuoteService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = QuoteService()
+    return _service
@@ -0,0 +1,165 @@
+"""
+Sentient110 - Evidence Ranking
+Pick the most informative news/social items for an LLM prompt: BM25 against
+the ticker, company name and a finance lexicon, blended with recency and
+engagement, then filled greedily into a token budget
+"""
+
+import os
+import re
+import math
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger("sentient110.ranking")
+
+RANK_NEWS_K = int(os.getenv("RANK_NEWS_K", 5))
+RANK_SOCIAL_K = int(os.getenv("RANK_SOCIAL_K", 5))
+# Evidence tokens per section (news or social) handed to the prompt
+RANK_TOKEN_BUDGET = int(os.getenv("RANK_TOKEN_BUDGET", 400))
+# Recency half-life in hours
+RANK_HALF_LIFE_H = float(os.getenv("RANK_HALF_LIFE_H", 12))
+
+# Score blend; relevance dominates, recency/engagement break ties
+WEIGHT_RELEVANCE = 0.6
+WEIGHT_RECENCY = 0.25
+WEIGHT_ENGAGEMENT = 0.15
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+COMPANY_NAMES = {
+    "TSLA": "Tesla", "NVDA": "NVIDIA", "AAPL": "Apple", "GOOGL": "Alphabet Google",
+    "GOOG": "Alphabet Google", "META": "Meta Facebook", "MSFT": "Microsoft", "AMZN": "Amazon",
+    "GME": "GameStop", "AMD": "AMD", "NFLX": "Netflix",
+    "RELIANCE": "Reliance", "TCS": "Tata Consultancy TCS", "INFY": "Infosys",
+    "HDFCBANK": "HDFC Bank", "ITC": "ITC",
+}
+
+# Terms that make an item carry a price-relevant signal; weights scale the
+# query term's contribution to BM25
+FINANCE_LEXICON = {
+    "earnings": 1.0, "revenue": 1.0, "guidance": 1.0, "eps": 1.0, "profit": 0.9, "loss": 0.9,
+    "beat": 0.9, "miss": 0.9, "misses": 0.9, "beats": 0.9, "upgrade": 1.0, "downgrade": 1.0,
+    "target": 0.7, "analyst": 0.6, "analysts": 0.6, "deliveries": 0.8, "sales": 0.7,
+    "forecast": 0.8, "outlook": 0.8, "dividend": 0.7, "buyback": 0.8, "acquisition": 0.8,
+    "merger": 0.8, "lawsuit": 0.8, "recall": 0.8, "sec": 0.7, "investigation": 0.8,
+    "layoffs": 0.7, "bullish": 0.6, "bearish": 0.6, "rally": 0.5, "plunge": 0.6,
+    "surge": 0.5, "shares": 0.4, "stock": 0.3, "quarter": 0.5, "quarterly": 0.5,
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+Item = Union[Dict, str]
+
+
+def _text(item: Item) -> str:
+    if isinstance(item, str):
+        return item
+    parts = [item.get("title") or item.get("text") or "", item.get("description") or ""]
+    return " ".join(p for p in parts if p)
+
+
+def _timestamp(item: Item) -> Optional[float]:
+    if isinstance(item, str):
+        return None
+    raw = item.get("published_at") or item.get("published") or item.get("created_at")
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(str(raw).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _engagement(item: Item) -> float:
+    if isinstance(item, str):
+        return 0.0
+    # Likes for posts; syndication reach for collapsed news clusters
+    return float(item.get("likes") or 0) + 50.0 * (item.get("cluster_size", 1) - 1)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token for English)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def build_query(ticker: str) -> Dict[str, float]:
+    """Weighted query terms: ticker and company name at full weight, plus the lexicon."""
+    symbol = ticker.split(".")[0].upper()
+    query = dict(FINANCE_LEXICON)
+    for word in _WORD.findall(f"{symbol} {COMPANY_NAMES.get(symbol, '')}".lower()):
+        query[word] = 2.0
+    return query
+
+
+def rank(items: List[Item], ticker: str, now: float = None) -> List[tuple]:
+    """[(score, index)] for every item, best first."""
+    if not items:
+        return []
+    now = now or time.time()
+    query = build_query(ticker)
+    docs = [_WORD.findall(_text(item).lower()) for item in items]
+    avg_len = sum(len(d) for d in docs) / len(docs) or 1.0
+
+    # Document frequency over this candidate pool
+    df: Dict[str, int] = {}
+    for doc in docs:
+        for term in set(doc) & query.keys():
+            df[term] = df.get(term, 0) + 1
+
+    n = len(docs)
+    relevance = []
+    for doc in docs:
+        tf: Dict[str, int] = {}
+        for word in doc:
+            if word in query:
+                tf[word] = tf.get(word, 0) + 1
+        score = 0.0
+        for term, freq in tf.items():
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            norm = freq + BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_len)
+            score += query[term] * idf * freq * (BM25_K1 + 1) / norm
+        relevance.append(score)
+
+    top_relevance = max(relevance) or 1.0
+    engagement = [math.log1p(_engagement(item)) for item in items]
+    top_engagement = max(engagement) or 1.0
+    decay = math.log(2) / (RANK_HALF_LIFE_H * 3600)
+
+    scored = []
+    for i, item in enumerate(items):
+        ts = _timestamp(item)
+        recency = 0.5 if ts is None else math.exp(-decay * max(0.0, now - ts))
+        score = (WEIGHT_RELEVANCE * relevance[i] / top_relevance
+                 + WEIGHT_RECENCY * recency
+                 + WEIGHT_ENGAGEMENT * engagement[i] / top_engagement)
+        scored.append((score, i))
+    # Stable on ties: original (API) order wins
+    scored.sort(key=lambda pair: (-pair[0], pair[1]))
+    return scored
+
+
+def select_evidence(items: List[Item], ticker: str, k: int, token_budget: int = RANK_TOKEN_BUDGET,
+                    max_item_tokens: int = None, count_tokens=estimate_tokens) -> List[Item]:
+    """
+    The k best items whose combined text fits `token_budget`, best first.
+    Items over budget are skipped (not truncated) so a smaller, still
+    relevant item can take the slot.
+    """
+    selected, used = [], 0
+    for _, i in rank(items, ticker):
+        if len(selected) >= k:
+            break
+        cost = count_tokens(_text(items[i]))
+        if max_item_tokens:
+            cost = min(cost, max_item_tokens)
+        if used + cost > token_budget:
+            continue
+        selected.append(items[i])
+        used += cost
+    if len(items) > len(selected):
+        logger.debug(f"Selected {len(selected)}/{len(items)} items ({used} tokens) for {ticker}")
+    return selected
@@ -0,0 +1,223 @@
+"""
+Sentient110 - Analysis Schema
+The one structured-output contract shared by every LLM path: JSON Schema
+for OpenAI structured outputs and Claude tool use, a validator, a bounded
+repair prompt, and parse-failure accounting
+"""
+
+import os
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.metrics import REGISTRY
+
+logger = logging.getLogger("sentient110.schema")
+
+# Extra LLM round-trips allowed to repair an invalid response
+LLM_REPAIR_RETRIES = int(os.getenv("LLM_REPAIR_RETRIES", 1))
+
+SIGNALS = ("BUY", "SELL", "HOLD")
+
+# Field order matters: signal/confidence come first so streaming callers
+# get them from the first tokens. All fields required + no extras, as
+# OpenAI strict mode demands.
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "signal": {"type": "string", "enum": list(SIGNALS)},
+        "confidence": {"type": "integer", "minimum": 0, "maximum": 100},
+        "reasoning": {"type": "string", "description": "2-3 sentence explanation in plain English"},
+        "sentiment_score": {"type": "number", "minimum": 0, "maximum": 1,
+                            "description": "0 = very bearish, 1 = very bullish"},
+        "news_sentiment": {"type": "integer", "minimum": 0, "maximum": 100},
+        "social_sentiment": {"type": "integer", "minimum": 0, "maximum": 100},
+        "key_insights": {"type": "array", "items": {"type": "string"}, "maxItems": 5},
+    },
+    "required": ["signal", "confidence", "reasoning", "sentiment_score",
+                 "news_sentiment", "social_sentiment", "key_insights"],
+    "additionalProperties": False,
+}
+
+TOOL_NAME = "record_analysis"
+
+# Range keywords are enforced by validate_analysis; OpenAI strict mode
+# rejects them, so its copy of the schema leaves them out
+_STRICT_UNSUPPORTED = ("minimum", "maximum", "maxItems")
+
+
+def _strict(schema: Dict) -> Dict:
+    out = {k: v for k, v in schema.items() if k not in _STRICT_UNSUPPORTED}
+    if "properties" in out:
+        out["properties"] = {name: _strict(spec) for name, spec in out["properties"].items()}
+    if "items" in out:
+        out["items"] = _strict(out["items"])
+    return out
+
+
+# OpenAI structured outputs (response_format)
+OPENAI_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "sentiment_analysis", "strict": True, "schema": _strict(ANALYSIS_SCHEMA)},
+}
+
+# Anthropic tool use: forcing the tool makes the reply a schema-shaped input
+ANTHROPIC_TOOL = {
+    "name": TOOL_NAME,
+    "description": "Record the sentiment analysis and trading signal for the ticker.",
+    "input_schema": ANALYSIS_SCHEMA,
+}
+ANTHROPIC_TOOL_CHOICE = {"type": "tool", "name": TOOL_NAME}
+
+PARSE_RESULTS = REGISTRY.counter(
+    "sentient110_llm_parse_total",
+    "LLM responses by provider, attempt (initial or repair) and outcome (ok or invalid)"
+)
+
+_TYPES = {"string": str, "integer": int, "number": (int, float), "array": list, "object": dict}
+
+
+class SchemaError(ValueError):
+    """An LLM response that doesn't match ANALYSIS_SCHEMA."""
+
+    def __init__(self, errors: List[str], text: str = ""):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+        self.text = text
+
+
+def _check(name: str, value: Any, spec: Dict) -> Optional[str]:
+    expected = _TYPES[spec["type"]]
+    # bool is an int subclass; never accept it for numbers
+    if isinstance(value, bool) or not isinstance(value, expected):
+        return f"{name}: expected {spec['type']}, got {type(value).__name__}"
+    if "enum" in spec and value not in spec["enum"]:
+        return f"{name}: must be one of {spec['enum']}"
+    if "minimum" in spec and value < spec["minimum"]:
+        return f"{name}: below minimum {spec['minimum']}"
+    if "maximum" in spec and value > spec["maximum"]:
+        return f"{name}: above maximum {spec['maximum']}"
+    if spec["type"] == "array":
+        if len(value) > spec.get("maxItems", len(value)):
+            return f"{name}: more than {spec['maxItems']} items"
+        if not all(isinstance(item, str) for item in value):
+            return f"{name}: items must be strings"
+    return None
+
+
+def validate_analysis(data: Any, required: List[str] = None) -> Dict:
+    """
+    Check `data` against ANALYSIS_SCHEMA and return a normalized copy.
+    Harmless drift is fixed rather than rejected (signal case, floats in
+    integer fields); anything else raises SchemaError.
+    """
+    if not isinstance(data, dict):
+        raise SchemaError([f"expected a JSON object, got {type(data).__name__}"])
+    properties = ANALYSIS_SCHEMA["properties"]
+    clean, errors = {}, []
+    for name in required if required is not None else ANALYSIS_SCHEMA["required"]:
+        if name not in data:
+            errors.append(f"{name}: missing")
+    for name, value in data.items():
+        spec = properties.get(name)
+        if spec is None:
+            continue  # unknown keys are dropped, not fatal
+        if name == "signal" and isinstance(value, str):
+            value = value.strip().upper()
+        if spec["type"] == "integer" and isinstance(value, float) and not isinstance(value, bool):
+            value = round(value)
+        error = _check(name, value, spec)
+        if error:
+            errors.append(error)
+        else:
+            clean[name] = value
+    if errors:
+        raise SchemaError(errors)
+    return clean
+
+
+def record_parse(provider: str, attempt: int, ok: bool):
+    PARSE_RESULTS.inc(provider=provider, attempt="initial" if attempt == 0 else "repair",
+                      outcome="ok" if ok else "invalid")
+
+
+def parse_json_text(text: str) -> Any:
+    """json.loads for a whole (non-streamed) reply; SchemaError keeps the text for repair."""
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        raise SchemaError([f"not valid JSON: {e}"], text)
+
+
+def request_with_repair(provider: str, call: Callable[[List[str], Optional[Callable]], Tuple[Any, str]],
+                        on_field: Callable = None) -> Dict:
+    """
+    Run `call(repairs, on_field) -> (parsed, text)` and validate the result.
+    An invalid response is retried up to LLM_REPAIR_RETRIES times, with the
+    problems appended as extra user turns (`repairs`); streamed fields are
+    only forwarded on the first attempt. Raises the last ValueError.
+    """
+    repairs: List[str] = []
+    for attempt in range(LLM_REPAIR_RETRIES + 1):
+        text = ""
+        try:
+            parsed, text = call(repairs, on_field if attempt == 0 else None)
+            result = validate_analysis(parsed)
+        except ValueError as e:  # incomplete/invalid JSON or SchemaError
+            record_parse(provider, attempt, ok=False)
+            text = getattr(e, "text", "") or text
+            logger.warning(f"⚠️ {provider} response invalid (attempt {attempt + 1}): {e}")
+            if attempt == LLM_REPAIR_RETRIES:
+                raise
+            repairs.append(repair_message(e, text))
+            continue
+        record_parse(provider, attempt, ok=True)
+        return result
+
+
+async def arequest_with_repair(provider: str, call: Callable[[List[str]], Awaitable[Tuple[Any, str]]]) -> Dict:
+    """`request_with_repair` for an async `call(repairs) -> (parsed, text)` (no streaming)."""
+    repairs: List[str] = []
+    for attempt in range(LLM_REPAIR_RETRIES + 1):
+        text = ""
+        try:
+            parsed, text = await call(repairs)
+            result = validate_analysis(parsed)
+        except ValueError as e:
+            record_parse(provider, attempt, ok=False)
+            text = getattr(e, "text", "") or text
+            logger.warning(f"⚠️ {provider} response invalid (attempt {attempt + 1}): {e}")
+            if attempt == LLM_REPAIR_RETRIES:
+                raise
+            repairs.append(repair_message(e, text))
+            continue
+        record_parse(provider, attempt, ok=True)
+        return result
+
+
+def repair_message(error: Exception, text: str = "") -> str:
+    """Follow-up user turn asking the model to resend a valid object."""
+    problems = getattr(error, "errors", None) or [str(error)]
+    previous = f"\n\nYour previous reply was:\n{text[:1500]}" if text else ""
+    return (
+        "Your previous reply did not match the required JSON schema:\n"
+        + "\n".join(f"- {p}" for p in problems)
+        + previous
+        + "\n\nReply again with ONLY a JSON object matching this schema:\n"
+        + json.dumps(ANALYSIS_SCHEMA)
+    )
+
+
+def parse_stats() -> Dict:
+    """Per-provider parse failure rate on first attempts, and repair outcomes."""
+    stats = {}
+    for provider in sorted(PARSE_RESULTS.label_values("provider")):
+        initial = PARSE_RESULTS.total(provider=provider, attempt="initial")
+        invalid = PARSE_RESULTS.value(provider=provider, attempt="initial", outcome="invalid")
+        stats[provider] = {
+            "responses": int(initial),
+            "failure_rate": round(invalid / initial, 4) if initial else None,
+            "repaired": int(PARSE_RESULTS.value(provider=provider, attempt="repair", outcome="ok")),
+            "repair_failed": int(PARSE_RESULTS.value(provider=provider, attempt="repair", outcome="invalid")),
+        }
+    return stats
@@ -0,0 +1,41 @@
+"""
+Sentient110 - Fast JSON Serialization
+Uses orjson (or msgspec) when installed, falling back to compact stdlib json
+"""
+
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger("sentient110.serialization")
+
+try:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to UTF-8 JSON bytes."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    try:
+        import msgspec
+
+        _encoder = msgspec.json.Encoder()
+        _decoder = msgspec.json.Decoder()
+
+        def dumps(obj: Any) -> bytes:
+            """Serialize to UTF-8 JSON bytes."""
+            return _encoder.encode(obj)
+
+        loads = _decoder.decode
+        JSON_BACKEND = "msgspec"
+    except ImportError:
+        def dumps(obj: Any) -> bytes:
+            """Serialize to UTF-8 JSON bytes."""
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+        loads = json.loads
+        JSON_BACKEND = "json"
+        logger.info("orjson/msgspec not installed, using stdlib json")
@@ -0,0 +1,243 @@
+"""
+Sentient110 - Sessions
+Stateless HMAC-signed session tokens, plus an expiring in-memory store
+(min-heap expiry index, incremental sweeping) used for the revocation list,
+which is shared through the cache's Redis backend when one is configured
+"""
+
+import os
+import hmac
+import json
+import time
+import heapq
+import base64
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, List, Tuple
+
+from services.cache import CacheBackend, shared_backend
+
+logger = logging.getLogger("sentient110.sessions")
+
+SESSION_TTL = int(os.getenv("SESSION_TTL", 86400))  # 24 hours
+# Max expired entries reclaimed per request; bounds sweep work per call
+SESSION_SWEEP_BATCH = int(os.getenv("SESSION_SWEEP_BATCH", 16))
+
+
+class SessionStore:
+    """
+    Token -> session dict, with expiry tracked in a min-heap of
+    (expires, token). Each request calls `sweep()`, which pops at most
+    `sweep_batch` expired heads. Every entry is pushed and popped once, so
+    reclaiming is amortized O(1) per request and never a full scan.
+    """
+
+    def __init__(self, ttl: int = SESSION_TTL, sweep_batch: int = SESSION_SWEEP_BATCH):
+        self.ttl = ttl
+        self.sweep_batch = sweep_batch
+        self._sessions: Dict[str, Dict] = {}
+        self._expiry_heap = []
+        self._lock = threading.Lock()
+        self.swept_total = 0
+        self.sweeps = 0
+        self.last_sweep_ms = 0.0
+
+    def create(self, token: str, email: str, ttl: int = None, **extra) -> Dict:
+        """Store a session for `email` expiring `ttl` seconds from now."""
+        expires = time.time() + (ttl or self.ttl)
+        session = {"email": email, "expires": expires, **extra}
+        with self._lock:
+            self._sessions[token] = session
+            heapq.heappush(self._expiry_heap, (expires, token))
+        return session
+
+    def get(self, token: str) -> Optional[Dict]:
+        """The live session for `token`, or None if unknown or expired."""
+        session = self._sessions.get(token)
+        if session is None or session["expires"] <= time.time():
+            return None
+        return session
+
+    def revoke(self, token: str) -> bool:
+        """Drop a session now; its heap entry is discarded when it surfaces."""
+        with self._lock:
+            return self._sessions.pop(token, None) is not None
+
+    def sweep(self, max_items: int = None) -> int:
+        """Reclaim up to `max_items` (default sweep_batch) expired sessions."""
+        limit = self.sweep_batch if max_items is None else max_items
+        now = time.time()
+        heap = self._expiry_heap
+        # Fast path: nothing due, no lock taken
+        if not heap or heap[0][0] > now:
+            return 0
+
+        start = time.perf_counter()
+        removed = 0
+        with self._lock:
+            while heap and heap[0][0] <= now and removed < limit:
+                expires, token = heapq.heappop(heap)
+                session = self._sessions.get(token)
+                # Skip stale heap entries (revoked, or token re-created later)
+                if session is not None and session["expires"] == expires:
+                    del self._sessions[token]
+                    removed += 1
+            self.swept_total += removed
+            self.sweeps += 1
+        self.last_sweep_ms = (time.perf_counter() - start) * 1000
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, token: str) -> bool:
+        return self.get(token) is not None
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._sessions),
+            "expiry_index_size": len(self._expiry_heap),
+            "swept_total": self.swept_total,
+            "sweeps": self.sweeps,
+            "last_sweep_ms": round(self.last_sweep_ms, 3),
+        }
+
+
+# ============= SIGNED TOKENS =============
+#
+# Format: v1.<base64url(json claims)>.<base64url(hmac-sha256)>
+# Claims: sub (email), plan, exp (unix seconds), jti (token id), kid (key id)
+#
+# Any instance holding the key verifies a token with one HMAC and a JSON
+# decode - no shared session store. SESSION_KEYS="kid1:secret1,kid0:secret0"
+# signs with the first key and still accepts the others, so keys rotate by
+# prepending a new one and dropping the old after SESSION_TTL.
+
+TOKEN_VERSION = "v1"
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _load_keys() -> List[Tuple[str, bytes]]:
+    configured = os.getenv("SESSION_KEYS", "")
+    keys = []
+    for entry in filter(None, (e.strip() for e in configured.split(","))):
+        kid, _, secret = entry.partition(":")
+        if not secret:
+            kid, secret = "k0", kid
+        keys.append((kid, secret.encode()))
+    if not keys:
+        logger.warning("⚠️ SESSION_KEYS not set - using a per-process key; tokens won't verify on other instances")
+        keys.append(("local", os.urandom(32)))
+    return keys
+
+
+class TokenSigner:
+    """Issues and verifies signed session tokens; see module notes for the format."""
+
+    def __init__(self, keys: List[Tuple[str, bytes]] = None, ttl: int = SESSION_TTL, revoked: "RevocationList" = None):
+        keys = keys or _load_keys()
+        self.active_kid = keys[0][0]
+        self._keys = dict(keys)
+        self.ttl = ttl
+        self.revoked = revoked if revoked is not None else RevocationList(backend=shared_backend())
+
+    def _sign(self, kid: str, message: bytes) -> str:
+        return _b64encode(hmac.new(self._keys[kid], message, hashlib.sha256).digest())
+
+    def issue(self, email: str, plan: str = "free", ttl: int = None) -> str:
+        claims = {
+            "sub": email,
+            "plan": plan,
+            "exp": int(time.time() + (ttl or self.ttl)),
+            "jti": os.urandom(8).hex(),
+            "kid": self.active_kid,
+        }
+        body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        message = f"{TOKEN_VERSION}.{body}".encode()
+        return f"{TOKEN_VERSION}.{body}.{self._sign(self.active_kid, message)}"
+
+    def verify(self, token: str) -> Optional[Dict]:
+        """Claims for a valid, unexpired, unrevoked token; None otherwise."""
+        try:
+            version, body, signature = token.split(".")
+            if version != TOKEN_VERSION:
+                return None
+            claims = json.loads(_b64decode(body))
+            kid = claims.get("kid")
+            if kid not in self._keys:
+                return None
+            expected = self._sign(kid, f"{version}.{body}".encode())
+            if not hmac.compare_digest(signature, expected):
+                return None
+        except (ValueError, AttributeError, TypeError):
+            return None
+        if claims.get("exp", 0) <= time.time() or claims.get("jti") in self.revoked:
+            return None
+        return claims
+
+    def revoke(self, token: str) -> bool:
+        """Revoke a valid token until it would have expired anyway."""
+        claims = self.verify(token)
+        if not claims:
+            return False
+        self.revoked.add(claims["jti"], claims["exp"])
+        return True
+
+
+class RevocationList(SessionStore):
+    """
+    Revoked token ids, each kept only until the token's own expiry, so the
+    list stays as small as the set of revoked-but-still-valid tokens.
+
+    With a shared `backend` (Redis when REDIS_URL is set) a revocation is
+    written there under its jti with the token's remaining lifetime, and
+    ids not revoked locally are looked up there, so a logout on one
+    instance holds on all of them. Revocations seen are kept locally too.
+    If the backend is unreachable, only local revocations are enforced.
+    SESSION_REVOKED_JTIS seeds it on every instance (comma-separated jti:exp).
+    """
+
+    def __init__(self, sweep_batch: int = SESSION_SWEEP_BATCH, backend: CacheBackend = None):
+        super().__init__(sweep_batch=sweep_batch)
+        self.backend = backend
+        for entry in filter(None, os.getenv("SESSION_REVOKED_JTIS", "").split(",")):
+            jti, _, exp = entry.strip().partition(":")
+            self._remember(jti, (float(exp) if exp else time.time() + self.ttl) - time.time())
+
+    @staticmethod
+    def _key(jti: str) -> str:
+        return f"revoked:{jti}"
+
+    def _remember(self, jti: str, remaining: float):
+        if remaining > 0:
+            self.create(jti, email="", ttl=remaining)
+
+    def add(self, jti: str, expires: float):
+        remaining = expires - time.time()
+        if remaining <= 0:
+            return
+        self._remember(jti, remaining)
+        if self.backend is not None:
+            self.backend.set(self._key(jti), 1, remaining)
+
+    def __contains__(self, jti: str) -> bool:
+        if self.get(jti) is not None:
+            return True
+        if self.backend is None or not jti:
+            return False
+        value, remaining = self.backend.get_with_ttl(self._key(jti))
+        if value is None:
+            return False
+        self._remember(jti, remaining)
+        return True
+
+    def stats(self) -> Dict:
+        return {**super().stats(), "shared": self.backend is not None}
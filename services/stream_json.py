@@ -0,0 +1,108 @@
+"""
+Sentient110 - Streaming JSON
+Incremental parser for a JSON object arriving in chunks (streamed LLM
+output): each top-level field is available as soon as its value is complete
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class StreamJSONError(ValueError):
+    """Streamed text that isn't one complete JSON object; `text` is what arrived."""
+
+    def __init__(self, message: str, text: str = ""):
+        super().__init__(message)
+        self.text = text
+
+
+class IncrementalJSONParser:
+    """
+    Feed chunks of text containing one JSON object (leading chatter or a
+    ```json fence is skipped); `feed` returns the top-level (key, value)
+    pairs completed by that chunk. Each character is scanned once, and a
+    value is decoded once, when its closing delimiter arrives.
+
+        parser = IncrementalJSONParser()
+        for chunk in stream:
+            for key, value in parser.feed(chunk):
+                ...
+        parser.fields  # everything parsed so far
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._buf = []          # text of the current top-level key/value
+        self._started = False   # seen the opening "{"
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._key = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        completed = []
+        for ch in chunk:
+            if self.done:
+                break
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                continue
+
+            if self._in_string:
+                self._buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if self._stack:
+                # Inside a nested value: track depth only
+                self._buf.append(ch)
+                if ch == '"':
+                    self._in_string = True
+                elif ch in _CLOSERS:
+                    self._stack.append(_CLOSERS[ch])
+                elif ch == self._stack[-1]:
+                    self._stack.pop()
+                continue
+
+            # Top level of the object
+            if ch == ":" and self._key is None:
+                self._key = json.loads("".join(self._buf).strip())
+                self._buf = []
+            elif ch in ",}":
+                if self._key is not None:
+                    field = self._complete()
+                    if field:
+                        completed.append(field)
+                if ch == "}":
+                    self.done = True
+            else:
+                self._buf.append(ch)
+                if ch == '"':
+                    self._in_string = True
+                elif ch in _CLOSERS:
+                    self._stack.append(_CLOSERS[ch])
+        return completed
+
+    def _complete(self):
+        raw = "".join(self._buf).strip()
+        key, self._key, self._buf = self._key, None, []
+        if not raw:
+            return None
+        value = json.loads(raw)
+        self.fields[key] = value
+        return key, value
+
+    def result(self) -> Dict[str, Any]:
+        """The complete object; raises ValueError if the stream ended early."""
+        if not self.done:
+            raise ValueError("JSON object incomplete")
+        return self.fields
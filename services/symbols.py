@@ -0,0 +1,184 @@
+"""
+Sentient110 - Symbol Index
+Known US (NYSE/NASDAQ) and Indian (.BSE/.NSE) listings, loaded once from a
+listings file into sorted arrays: O(1) validation, company-name aliases and
+prefix autocomplete by bisection
+"""
+
+import os
+import re
+import csv
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+from services.metrics import REGISTRY
+
+logger = logging.getLogger("sentient110.symbols")
+
+SYMBOLS_FILE = os.getenv("SYMBOLS_FILE", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "listings.csv"))
+# Reject symbols missing from the listings file. Off by default: the bundled
+# file is a curated subset, used for aliases and autocomplete, and only
+# malformed input is rejected
+SYMBOLS_STRICT = os.getenv("SYMBOLS_STRICT", "false").lower() in ("1", "true", "yes")
+
+# Yahoo-style suffixes people paste in
+_SUFFIX_ALIASES = {".NS": ".NSE", ".BO": ".BSE"}
+# Bare Indian symbols resolve to BSE first, the listing Alpha Vantage quotes
+_DEFAULT_SUFFIXES = (".BSE", ".NSE")
+_VALID_FORMAT = re.compile(r"^[A-Z0-9&\-]{1,15}(\.[A-Z]{1,4})?$")
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Dropped from company names so "Apple Inc." is found as "apple"
+_NAME_NOISE = {"inc", "ltd", "corp", "corporation", "co", "company", "plc", "the", "group",
+               "holdings", "holding", "nv", "sa", "class", "and", "of", "com", "adr", "limited"}
+
+SYMBOL_LOOKUPS = REGISTRY.counter(
+    "sentient110_symbol_lookups_total",
+    "Ticker validations by outcome (symbol, alias, unknown, malformed)"
+)
+
+
+def _normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def _name_words(name: str) -> List[str]:
+    return [w for w in _normalize(name).split() if w not in _NAME_NOISE]
+
+
+class SymbolIndex:
+    """
+    Listings kept as parallel arrays sorted by symbol. Autocomplete bisects
+    the symbol array and a sorted array of name keys (every word-suffix of
+    the company name, so "motors" finds Tata Motors); lookups by symbol or
+    alias are dict hits.
+    """
+
+    def __init__(self, rows: List[Dict]):
+        rows = sorted(rows, key=lambda r: r["symbol"])
+        self.symbols = [r["symbol"] for r in rows]
+        self.names = [r["name"] for r in rows]
+        self.exchanges = [r["exchange"] for r in rows]
+        self._by_symbol = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self._aliases: Dict[str, int] = {}
+        keys = []
+        for i, row in enumerate(rows):
+            words = _name_words(row["name"])
+            for start in range(len(words)):
+                keys.append((" ".join(words[start:]), i))
+            for alias in [row["name"], " ".join(words)] + row.get("aliases", []):
+                key = _normalize(alias)
+                # First listing wins (explicit aliases are listed on the preferred one)
+                if key and (key not in self._aliases or alias in row.get("aliases", [])):
+                    self._aliases[key] = i
+        keys.sort()
+        self._name_keys = [k for k, _ in keys]
+        self._name_refs = array("I", (i for _, i in keys))
+
+    @classmethod
+    def load(cls, path: str = SYMBOLS_FILE) -> "SymbolIndex":
+        rows = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                rows.append({
+                    "symbol": row["symbol"].strip().upper(),
+                    "exchange": row["exchange"].strip().upper(),
+                    "name": row["name"].strip(),
+                    "aliases": [a.strip() for a in (row.get("aliases") or "").split("|") if a.strip()],
+                })
+        logger.info(f"🏷️ Loaded {len(rows)} listings from {os.path.basename(path)}")
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._by_symbol
+
+    def _entry(self, i: int) -> Dict:
+        return {"symbol": self.symbols[i], "name": self.names[i], "exchange": self.exchanges[i]}
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        i = self._by_symbol.get(symbol.upper())
+        return self._entry(i) if i is not None else None
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Listed symbol for a ticker, Yahoo-style ticker or company name; None if unknown."""
+        symbol = query.strip().upper()
+        if symbol in self._by_symbol:
+            return symbol
+        base, dot, suffix = symbol.rpartition(".")
+        if dot and f".{suffix}" in _SUFFIX_ALIASES:
+            candidate = base + _SUFFIX_ALIASES[f".{suffix}"]
+            return candidate if candidate in self._by_symbol else None
+        if not dot:
+            for default in _DEFAULT_SUFFIXES:
+                if symbol + default in self._by_symbol:
+                    return symbol + default
+        i = self._aliases.get(_normalize(query))
+        return self.symbols[i] if i is not None else None
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Listings whose symbol, or a word of whose name, starts with `prefix`."""
+        results, seen = [], set()
+        upper = prefix.strip().upper()
+        if upper:
+            i = bisect_left(self.symbols, upper)
+            while i < len(self.symbols) and self.symbols[i].startswith(upper) and len(results) < limit:
+                results.append(self._entry(i))
+                seen.add(i)
+                i += 1
+        key = _normalize(prefix)
+        if key:
+            j = bisect_left(self._name_keys, key)
+            while j < len(self._name_keys) and self._name_keys[j].startswith(key) and len(results) < limit:
+                ref = self._name_refs[j]
+                if ref not in seen:
+                    results.append(self._entry(ref))
+                    seen.add(ref)
+                j += 1
+        return results
+
+
+_index: Optional[SymbolIndex] = None
+
+
+def get_index() -> SymbolIndex:
+    global _index
+    if _index is None:
+        try:
+            _index = SymbolIndex.load()
+        except OSError as e:
+            logger.warning(f"⚠️ No listings file ({e}); symbol validation disabled")
+            _index = SymbolIndex([])
+    return _index
+
+
+def resolve_ticker(raw: str) -> Optional[str]:
+    """
+    Canonical symbol for user input, or None for junk. Outside strict mode
+    (or without a listings file), well-formed unknown tickers pass through.
+    """
+    index = get_index()
+    symbol = index.resolve(raw) if raw else None
+    if symbol is not None:
+        SYMBOL_LOOKUPS.inc(outcome="symbol" if symbol == raw.strip().upper() else "alias")
+        return symbol
+    candidate = (raw or "").strip().upper()
+    if not _VALID_FORMAT.match(candidate):
+        SYMBOL_LOOKUPS.inc(outcome="malformed")
+        return None
+    # Same spelling as listed symbols, so FOO.NS and FOO.NSE share cache and history keys
+    base, dot, suffix = candidate.rpartition(".")
+    if dot and f".{suffix}" in _SUFFIX_ALIASES:
+        candidate = base + _SUFFIX_ALIASES[f".{suffix}"]
+    SYMBOL_LOOKUPS.inc(outcome="unknown")
+    return candidate if not SYMBOLS_STRICT or not len(index) else None
+
+
+def suggest(raw: str, limit: int = 5) -> List[str]:
+    """Close listings for an unknown ticker, for error messages."""
+    return [entry["symbol"] for entry in get_index().complete((raw or "")[:3], limit)]
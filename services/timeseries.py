@@ -0,0 +1,282 @@
+"""
+Sentient110 - Sentiment History
+Per-ticker time series of scored analyses: bounded columnar ring buffers
+with rolling means, EMA and z-score maintained on insert, and prefix sums so
+any range or window is summarized in O(log n) without rescanning history
+"""
+
+import os
+import math
+import time
+import struct
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("sentient110.history")
+
+# Points kept in memory per ticker (oldest overwritten first)
+HISTORY_CAPACITY = int(os.getenv("HISTORY_CAPACITY", 2048))
+# Tickers kept in memory; the least recently used is dropped beyond this
+# (its file, if any, is replayed on the next access)
+HISTORY_MAX_TICKERS = int(os.getenv("HISTORY_MAX_TICKERS", 500))
+# Slots allocated for a new series; columns double up to HISTORY_CAPACITY
+_INITIAL_SLOTS = 64
+# Rolling-mean windows, in points; the longest one also drives the z-score
+HISTORY_WINDOWS = tuple(sorted(int(w) for w in os.getenv("HISTORY_WINDOWS", "12,48").split(",") if w.strip()))
+HISTORY_EMA_SPAN = int(os.getenv("HISTORY_EMA_SPAN", 12))
+# Directory for append-only per-ticker files; empty keeps history in memory only
+HISTORY_DIR = os.getenv("HISTORY_DIR", "")
+
+SIGNAL_CODES = {"SELL": -1, "HOLD": 0, "BUY": 1}
+SIGNAL_NAMES = {code: name for name, code in SIGNAL_CODES.items()}
+
+# On-disk record: timestamp, sentiment score, confidence, signal code
+_RECORD = struct.Struct("<dffb")
+
+
+class TickerSeries:
+    """
+    Ring buffer of one ticker's analyses. Each column is a flat array indexed
+    by slot; `cum`/`cumsq` hold running prefix sums of the score so the mean
+    and deviation of any contiguous range come from two lookups. Columns
+    start small and double as points arrive, so a rarely seen ticker
+    doesn't cost a full `capacity` of every column.
+    """
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY, windows: Tuple[int, ...] = HISTORY_WINDOWS,
+                 ema_span: int = HISTORY_EMA_SPAN):
+        if windows and windows[-1] > capacity:
+            raise ValueError(f"window {windows[-1]} exceeds capacity {capacity}")
+        self.capacity = capacity
+        self.windows = windows
+        self.alpha = 2 / (ema_span + 1)
+        self._size = min(capacity, _INITIAL_SLOTS)  # slots allocated per column
+        self._ts = array("d", bytes(8 * self._size))
+        self._score = array("d", bytes(8 * self._size))
+        self._confidence = array("f", bytes(4 * self._size))
+        self._signal = array("b", bytes(self._size))
+        self._cum = array("d", bytes(8 * self._size))
+        self._cumsq = array("d", bytes(8 * self._size))
+        self._ema = array("d", bytes(8 * self._size))
+        self._z = array("d", bytes(8 * self._size))
+        self._means = {w: array("d", bytes(8 * self._size)) for w in windows}
+        self._start = 0   # slot of the oldest point
+        self._len = 0
+        self.total = 0    # points ever appended
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._len
+
+    def _grow(self):
+        """Double every column (up to capacity); only called before the buffer wraps."""
+        extra = min(self._size, self.capacity - self._size)
+        for column in (self._ts, self._score, self._confidence, self._signal, self._cum,
+                       self._cumsq, self._ema, self._z, *self._means.values()):
+            column.frombytes(bytes(column.itemsize * extra))
+        self._size += extra
+
+    def _slot(self, i: int) -> int:
+        """Physical slot of logical index i (0 = oldest)."""
+        return (self._start + i) % self.capacity
+
+    def _prefix(self, i: int) -> Tuple[float, float]:
+        """Score sum and sum of squares over all points before logical index i."""
+        slot = self._slot(i)
+        s = self._score[slot]
+        return self._cum[slot] - s, self._cumsq[slot] - s * s
+
+    def _range_stats(self, lo: int, hi: int) -> Tuple[int, float, float]:
+        """(n, mean, std) of scores over logical indices [lo, hi)."""
+        n = hi - lo
+        if n <= 0:
+            return 0, 0.0, 0.0
+        last = self._slot(hi - 1)
+        before, before_sq = self._prefix(lo)
+        total, total_sq = self._cum[last] - before, self._cumsq[last] - before_sq
+        mean = total / n
+        return n, mean, math.sqrt(max(0.0, total_sq / n - mean * mean))
+
+    def append(self, ts: float, score: float, confidence: float = 0.0, signal: str = "HOLD") -> Dict:
+        """Add a point; timestamps never go backwards (late writers are clamped)."""
+        with self._lock:
+            if self._len:
+                last = self._slot(self._len - 1)
+                ts = max(ts, self._ts[last])
+                cum, cumsq, ema = self._cum[last], self._cumsq[last], self._ema[last]
+                ema += self.alpha * (score - ema)
+            else:
+                cum = cumsq = 0.0
+                ema = score
+
+            if self._len == self.capacity:
+                self._start = (self._start + 1) % self.capacity
+            else:
+                if self._len == self._size:
+                    self._grow()
+                self._len += 1
+            slot = self._slot(self._len - 1)
+            self._ts[slot] = ts
+            self._score[slot] = score
+            self._confidence[slot] = confidence
+            self._signal[slot] = SIGNAL_CODES.get(signal, 0)
+            self._cum[slot] = cum + score
+            self._cumsq[slot] = cumsq + score * score
+            self._ema[slot] = ema
+            self.total += 1
+
+            for w in self.windows:
+                _, self._means[w][slot], _ = self._range_stats(max(0, self._len - w), self._len)
+            if self.windows:
+                n, mean, std = self._range_stats(max(0, self._len - self.windows[-1]), self._len)
+                self._z[slot] = (score - mean) / std if n > 1 and std > 1e-9 else 0.0
+            return self._point(self._len - 1)
+
+    def _point(self, i: int) -> Dict:
+        slot = self._slot(i)
+        point = {
+            "timestamp": self._ts[slot],
+            "sentiment_score": round(self._score[slot], 4),
+            "confidence": round(self._confidence[slot], 2),
+            "signal": SIGNAL_NAMES[self._signal[slot]],
+            "ema": round(self._ema[slot], 4),
+            "zscore": round(self._z[slot], 3),
+        }
+        for w in self.windows:
+            point[f"mean_{w}"] = round(self._means[w][slot], 4)
+        return point
+
+    def _bisect(self, ts: float) -> int:
+        """First logical index with timestamp >= ts."""
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts[self._slot(mid)] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(self, start: float = None, end: float = None, window: int = None, limit: int = 500) -> Dict:
+        """
+        Points with start <= timestamp <= end (newest `limit` of them), plus
+        summary stats for that range; with `window`, only the last `window`
+        points of the range are considered.
+        """
+        with self._lock:
+            lo = self._bisect(start) if start is not None else 0
+            hi = self._bisect(math.nextafter(end, math.inf)) if end is not None else self._len
+            if window:
+                lo = max(lo, hi - window)
+            n, mean, std = self._range_stats(lo, hi)
+            latest = self._point(hi - 1) if n else None
+            points = [self._point(i) for i in range(max(lo, hi - limit), hi)] if limit else []
+        return {
+            "count": n,
+            "mean": round(mean, 4) if n else None,
+            "std": round(std, 4) if n else None,
+            "latest": latest,
+            "points": points,
+        }
+
+
+class SentimentHistory:
+    """
+    Per-ticker TickerSeries, optionally backed by append-only files in
+    HISTORY_DIR. At most `max_tickers` series stay in memory (least recently
+    used dropped first), so clients can't grow it by analyzing junk tickers.
+    """
+
+    def __init__(self, directory: str = HISTORY_DIR, capacity: int = HISTORY_CAPACITY,
+                 max_tickers: int = HISTORY_MAX_TICKERS):
+        self.directory = directory
+        self.capacity = capacity
+        self.max_tickers = max_tickers
+        self.evicted = 0
+        self._series: "OrderedDict[str, TickerSeries]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, ticker: str) -> str:
+        if os.path.basename(ticker) != ticker or ticker.startswith("."):
+            raise ValueError(f"not a ticker: {ticker[:30]!r}")
+        return os.path.join(self.directory, f"{ticker}.bin")
+
+    def series(self, ticker: str, create: bool = True) -> Optional[TickerSeries]:
+        """The ticker's series; without `create`, None unless it has history."""
+        with self._lock:
+            series = self._series.get(ticker)
+            if series is not None:
+                self._series.move_to_end(ticker)
+                return series
+            if not create and not (self.directory and os.path.exists(self._path(ticker))):
+                return None
+            series = self._series[ticker] = TickerSeries(self.capacity)
+            if self.directory:
+                self._replay(ticker, series)
+            while len(self._series) > self.max_tickers:
+                self._series.popitem(last=False)
+                self.evicted += 1
+            return series
+
+    def _replay(self, ticker: str, series: TickerSeries):
+        """Load the newest `capacity` records of the ticker's file."""
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return
+        size = os.path.getsize(path) // _RECORD.size * _RECORD.size
+        with open(path, "rb") as f:
+            f.seek(max(0, size - self.capacity * _RECORD.size))
+            data = f.read(size - f.tell())
+        for ts, score, confidence, code in _RECORD.iter_unpack(data):
+            series.append(ts, score, confidence, SIGNAL_NAMES.get(code, "HOLD"))
+        logger.info(f"📈 Loaded {len(series)} history points for {ticker}")
+
+    def record(self, ticker: str, result: Dict, ts: float = None) -> Optional[Dict]:
+        """Append an analysis result (needs `sentiment_score`); returns the stored point."""
+        score = result.get("sentiment_score")
+        if score is None:
+            return None
+        ts = ts if ts is not None else time.time()
+        confidence = float(result.get("confidence") or 0)
+        signal = result.get("signal", "HOLD")
+        point = self.series(ticker).append(ts, float(score), confidence, signal)
+        if self.directory:
+            try:
+                with open(self._path(ticker), "ab") as f:
+                    f.write(_RECORD.pack(point["timestamp"], float(score), confidence, SIGNAL_CODES.get(signal, 0)))
+            except OSError as e:
+                logger.warning(f"⚠️ History write failed for {ticker}: {e}")
+        return point
+
+    def query(self, ticker: str, **kwargs) -> Dict:
+        # Reads never allocate a series: unknown tickers would grow memory without bound
+        series = self.series(ticker, create=False)
+        if series is None:
+            return {"ticker": ticker, "count": 0, "mean": None, "std": None, "latest": None, "points": []}
+        return {"ticker": ticker, **series.query(**kwargs)}
+
+    def tickers(self) -> List[str]:
+        return sorted(self._series)
+
+    def stats(self) -> Dict:
+        return {
+            "tickers": len(self._series),
+            "points": sum(len(s) for s in self._series.values()),
+            "evicted": self.evicted,
+            "persistent": bool(self.directory),
+        }
+
+
+_history: Optional[SentimentHistory] = None
+
+
+def get_history() -> SentimentHistory:
+    global _history
+    if _history is None:
+        _history = SentimentHistory()
+    return _history
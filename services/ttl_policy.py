@@ -0,0 +1,181 @@
+"""
+Sentient110 - Cache TTL Policy
+Per-ticker analysis TTLs from the listing exchange's trading calendar, the
+recent news arrival rate and the day's price move: short while the market
+is open and busy, until the next session when nothing can change
+"""
+
+import os
+import logging
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from services.metrics import REGISTRY
+
+logger = logging.getLogger("sentient110.ttl")
+
+TTL_MIN = int(os.getenv("TTL_MIN", 60))
+TTL_MAX = int(os.getenv("TTL_MAX", 6 * 3600))
+# Base TTL while the exchange is trading, and around the open/close
+TTL_OPEN = int(os.getenv("TTL_OPEN", 180))
+TTL_EXTENDED = int(os.getenv("TTL_EXTENDED", 900))
+# News arrival rate (articles/hour) and absolute daily move (%) that halve the TTL
+TTL_NEWS_REF = float(os.getenv("TTL_NEWS_REF", 4))
+TTL_VOLATILITY_REF = float(os.getenv("TTL_VOLATILITY_REF", 2))
+# How far back news counts towards the arrival rate
+NEWS_WINDOW_HOURS = 6
+# "Extended" hours: this long before the open and after the close
+PRE_OPEN = timedelta(hours=1)
+POST_CLOSE = timedelta(hours=1)
+
+CACHE_TTLS = REGISTRY.histogram(
+    "sentient110_cache_ttl_seconds",
+    "Analysis cache TTL chosen by the policy, by market state",
+    buckets=(60, 120, 180, 300, 600, 900, 1800, 3600, 7200, 14400, 21600),
+)
+
+
+def _zone(name: str, utc_offset_hours: float):
+    """IANA time zone, or a fixed offset when tzdata isn't installed."""
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo(name)
+    except Exception:
+        logger.warning(f"⚠️ Time zone {name} unavailable, using UTC{utc_offset_hours:+g}")
+        return timezone(timedelta(hours=utc_offset_hours))
+
+
+def _holidays(calendar: str) -> List[date]:
+    """MARKET_HOLIDAYS entries for `calendar`, e.g. "US:2026-11-26,IN:2026-11-09"."""
+    days = []
+    for entry in os.getenv("MARKET_HOLIDAYS", "").split(","):
+        name, _, day = entry.strip().partition(":")
+        if name.upper() == calendar and day:
+            try:
+                days.append(date.fromisoformat(day))
+            except ValueError:
+                logger.warning(f"⚠️ Ignoring bad MARKET_HOLIDAYS entry: {entry}")
+    return days
+
+
+class MarketCalendar:
+    """Regular weekday session in the exchange's local time (early closes aren't modelled)."""
+
+    def __init__(self, name: str, tz, open_at: dtime, close_at: dtime, holidays: List[date] = None):
+        self.name = name
+        self.tz = tz
+        self.open_at = open_at
+        self.close_at = close_at
+        self.holidays = set(holidays or ())
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def _session(self, day: date):
+        return (datetime.combine(day, self.open_at, self.tz), datetime.combine(day, self.close_at, self.tz))
+
+    def state(self, now: datetime) -> str:
+        """Market state: "open", "extended" (around the session) or "closed"."""
+        local = now.astimezone(self.tz)
+        if not self.is_trading_day(local.date()):
+            return "closed"
+        open_at, close_at = self._session(local.date())
+        if open_at <= local < close_at:
+            return "open"
+        if open_at - PRE_OPEN <= local < close_at + POST_CLOSE:
+            return "extended"
+        return "closed"
+
+    def next_open(self, now: datetime) -> datetime:
+        """Start of the next session (now, if one is under way)."""
+        local = now.astimezone(self.tz)
+        for offset in range(15):
+            day = local.date() + timedelta(days=offset)
+            if not self.is_trading_day(day):
+                continue
+            open_at, close_at = self._session(day)
+            if local < close_at:
+                return open_at
+        return local + timedelta(days=15)
+
+
+US = MarketCalendar("US", _zone("America/New_York", -5), dtime(9, 30), dtime(16, 0), _holidays("US"))
+INDIA = MarketCalendar("IN", _zone("Asia/Kolkata", 5.5), dtime(9, 15), dtime(15, 30), _holidays("IN"))
+
+# NYSE and NASDAQ share a calendar, as do BSE and NSE
+EXCHANGES = {"NYSE": US, "NASDAQ": US, "BSE": INDIA, "NSE": INDIA}
+_SUFFIXES = {".BSE": "BSE", ".BO": "BSE", ".NSE": "NSE", ".NS": "NSE"}
+
+
+def exchange_for(ticker: str) -> str:
+    """Listing exchange from the ticker suffix; unsuffixed tickers are US listings."""
+    ticker = ticker.upper()
+    for suffix, exchange in _SUFFIXES.items():
+        if ticker.endswith(suffix):
+            return exchange
+    return "NYSE"
+
+
+def news_velocity(news: List[Dict], now: datetime) -> float:
+    """Articles per hour published in the last NEWS_WINDOW_HOURS."""
+    cutoff = now - timedelta(hours=NEWS_WINDOW_HOURS)
+    recent = 0
+    for item in news or ():
+        stamp = item.get("published") or item.get("published_at")
+        if not stamp:
+            continue
+        try:
+            published = datetime.fromisoformat(stamp.replace("Z", "+00:00"))
+        except ValueError:
+            continue
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        if published >= cutoff:
+            recent += 1
+    return recent / NEWS_WINDOW_HOURS
+
+
+def price_move(price: Optional[Dict]) -> float:
+    """Absolute daily change in percent, from "change_percent" like "-1.23%"."""
+    try:
+        return abs(float(str((price or {}).get("change_percent", "0")).strip().rstrip("%")))
+    except ValueError:
+        return 0.0
+
+
+def ttl_for(ticker: str, news: List[Dict] = None, price: Dict = None, now: datetime = None) -> Dict:
+    """
+    Cache TTL for a fresh analysis of `ticker`, with the inputs behind it.
+    Closed markets keep results until shortly before the next session;
+    news flow and (while trading) large price moves shorten the TTL.
+    """
+    now = now or datetime.now(timezone.utc)
+    exchange = exchange_for(ticker)
+    calendar = EXCHANGES[exchange]
+    state = calendar.state(now)
+
+    if state == "open":
+        base = TTL_OPEN
+    elif state == "extended":
+        base = TTL_EXTENDED
+    else:
+        # Expire as the pre-open window starts, so the first session read is fresh
+        base = (calendar.next_open(now) - PRE_OPEN - now).total_seconds()
+
+    velocity = news_velocity(news, now)
+    move = price_move(price) if state != "closed" else 0.0
+    ttl = base / (1 + velocity / TTL_NEWS_REF) / (1 + move / TTL_VOLATILITY_REF)
+    ttl = min(TTL_MAX, max(TTL_MIN, ttl))
+    if state == "extended":
+        # Pre-open results never outlive the opening bell (after the close
+        # the next open is a day away, so this only bites before it)
+        ttl = max(1.0, min(ttl, (calendar.next_open(now) - now).total_seconds()))
+    ttl = int(ttl)
+    CACHE_TTLS.observe(ttl, market=state)
+    return {
+        "ttl": ttl,
+        "exchange": exchange,
+        "market": state,
+        "news_per_hour": round(velocity, 2),
+        "price_move_pct": round(move, 2),
+    }
@@ -0,0 +1,158 @@
+"""
+Sentient110 - Watchlist Hub
+Push updates for subscribed tickers: one refresh loop per distinct ticker,
+changes fanned out to every subscriber, so server work scales with tickers
+rather than connected clients
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from services.metrics import REGISTRY
+
+logger = logging.getLogger("sentient110.watchlist")
+
+# Seconds between refreshes of a watched ticker
+WATCHLIST_REFRESH = float(os.getenv("WATCHLIST_REFRESH", 60))
+WATCHLIST_MAX_TICKERS = int(os.getenv("WATCHLIST_MAX_TICKERS", 20))
+# Messages buffered per client; a slow client loses the oldest, not the server
+WATCHLIST_QUEUE_SIZE = 64
+
+# Fields compared between refreshes; only changed ones are pushed
+DELTA_FIELDS = ("signal", "confidence", "sentiment_score", "price", "price_change", "reasoning", "insights")
+
+WATCHLIST_REFRESHES = REGISTRY.counter(
+    "sentient110_watchlist_refreshes_total",
+    "Watchlist ticker refreshes by outcome (changed, unchanged, error)"
+)
+
+
+class Subscriber:
+    """One connection: its tickers and a bounded outbox drained by the socket writer."""
+
+    def __init__(self):
+        self.tickers: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WATCHLIST_QUEUE_SIZE)
+
+    def send(self, message: Dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self) -> Dict:
+        return await self.queue.get()
+
+
+class WatchlistHub:
+    """
+    `refresh(ticker)` is awaited once per WATCHLIST_REFRESH for each ticker
+    that has at least one subscriber; its result is diffed against the last
+    one and the delta sent to all of that ticker's subscribers. New
+    subscribers get the last full result straight away.
+    """
+
+    def __init__(self, refresh: Callable[[str], Awaitable[Dict]], interval: float = WATCHLIST_REFRESH):
+        self.refresh = refresh
+        self.interval = interval
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._latest: Dict[str, Dict] = {}
+
+    def subscribe(self, subscriber: Subscriber, tickers: Iterable[str]) -> List[str]:
+        """Add tickers (up to WATCHLIST_MAX_TICKERS per subscriber); returns those added."""
+        added = []
+        for ticker in tickers:
+            ticker = ticker.upper().strip()
+            if not ticker or ticker in subscriber.tickers:
+                continue
+            if len(subscriber.tickers) >= WATCHLIST_MAX_TICKERS:
+                subscriber.send({"type": "error", "detail": f"At most {WATCHLIST_MAX_TICKERS} tickers per watchlist"})
+                break
+            subscriber.tickers.add(ticker)
+            self._subscribers.setdefault(ticker, set()).add(subscriber)
+            added.append(ticker)
+            if ticker in self._latest:
+                subscriber.send({"type": "snapshot", "ticker": ticker, "data": self._latest[ticker]})
+            if ticker not in self._tasks:
+                self._tasks[ticker] = asyncio.create_task(self._watch(ticker))
+                logger.info(f"👀 Watching {ticker}")
+        return added
+
+    def unsubscribe(self, subscriber: Subscriber, tickers: Iterable[str] = None):
+        for ticker in list(subscriber.tickers if tickers is None else tickers):
+            ticker = ticker.upper().strip()
+            subscriber.tickers.discard(ticker)
+            watchers = self._subscribers.get(ticker)
+            if watchers is None:
+                continue
+            watchers.discard(subscriber)
+            if not watchers:
+                # Last watcher gone: stop refreshing this ticker
+                del self._subscribers[ticker]
+                self._latest.pop(ticker, None)
+                task = self._tasks.pop(ticker, None)
+                if task is not None:
+                    task.cancel()
+                logger.info(f"🙈 Stopped watching {ticker}")
+
+    def _broadcast(self, ticker: str, message: Dict):
+        for subscriber in self._subscribers.get(ticker, ()):
+            subscriber.send(message)
+
+    async def _watch(self, ticker: str):
+        while ticker in self._subscribers:
+            try:
+                result = await self.refresh(ticker)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                WATCHLIST_REFRESHES.inc(outcome="error")
+                logger.warning(f"⚠️ Watchlist refresh failed for {ticker}: {e}")
+                self._broadcast(ticker, {"type": "error", "ticker": ticker, "detail": "Refresh failed"})
+            else:
+                previous = self._latest.get(ticker)
+                self._latest[ticker] = result
+                if previous is None:
+                    self._broadcast(ticker, {"type": "snapshot", "ticker": ticker, "data": result})
+                    WATCHLIST_REFRESHES.inc(outcome="changed")
+                else:
+                    changes = diff(previous, result)
+                    WATCHLIST_REFRESHES.inc(outcome="changed" if changes else "unchanged")
+                    if changes:
+                        self._broadcast(ticker, {"type": "update", "ticker": ticker, "changes": changes,
+                                                 "timestamp": result.get("timestamp")})
+            await asyncio.sleep(self.interval)
+
+    def tickers(self) -> List[str]:
+        """Tickers with at least one subscriber."""
+        return sorted(self._tasks)
+
+    def stats(self) -> Dict:
+        return {
+            "tickers": len(self._tasks),
+            "subscriptions": sum(len(s) for s in self._subscribers.values()),
+        }
+
+
+def parse_message(text: str) -> Tuple[Optional[str], List[str]]:
+    """
+    (action, tickers) from a client message {"action": ..., "tickers": [...]};
+    a single ticker may be sent as a string. Raises ValueError for anything else.
+    """
+    message = json.loads(text)
+    if not isinstance(message, dict):
+        raise ValueError("message must be an object")
+    tickers = message.get("tickers", [])
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    if not isinstance(tickers, list) or not all(isinstance(t, str) for t in tickers):
+        raise ValueError("tickers must be a list of strings")
+    return message.get("action"), tickers
+
+
+def diff(previous: Dict, current: Dict) -> Dict:
+    """DELTA_FIELDS whose value changed between two results."""
+    return {key: current.get(key) for key in DELTA_FIELDS if current.get(key) != previous.get(key)}
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import services.* from the repo root, as main.py and api/index.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,36 @@
+import sys
+import threading
+import time
+import types
+
+from services.analyzer import SentimentAnalyzer
+
+
+def test_concurrent_first_use_waits_for_the_model(monkeypatch):
+    loads = []
+
+    def pipeline(task, model):
+        loads.append(model)
+        time.sleep(0.1)  # a slow model load
+        return lambda texts: [{"label": "LABEL_2", "score": 0.9} for _ in texts]
+
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(pipeline=pipeline))
+    analyzer = SentimentAnalyzer()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(analyzer.analyze_text("up"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1
+    assert results == [{"label": "positive", "score": 0.9}] * 8
+
+
+def test_failed_load_falls_back_to_neutral(monkeypatch):
+    def pipeline(task, model):
+        raise OSError("no weights")
+
+    monkeypatch.setitem(sys.modules, "transformers", types.SimpleNamespace(pipeline=pipeline))
+    analyzer = SentimentAnalyzer()
+    assert analyzer.analyze_texts(["a", "b"]) == [{"label": "neutral", "score": 0.5}] * 2
+    assert analyzer.model is None
@@ -0,0 +1,29 @@
+import pytest
+
+index = pytest.importorskip("api.index")
+
+NEWS = [{"title": "Tesla beats estimates", "source": "Reuters"}]
+
+
+def _handler(monkeypatch, ai):
+    handler = index.handler.__new__(index.handler)
+    monkeypatch.setattr(handler, "_fetch_news", lambda ticker: NEWS, raising=False)
+    monkeypatch.setattr(handler, "_fetch_price", lambda ticker: {"price": 1.0, "change_percent": "+0.10%"}, raising=False)
+    monkeypatch.setattr(handler, "_openai", lambda ticker, news: ai, raising=False)
+    return handler
+
+
+def test_llm_results_keep_their_own_breakdown(monkeypatch):
+    ai = {"signal": "BUY", "confidence": 80, "reasoning": "Strong quarter.", "sentiment_score": 0.7,
+          "news_sentiment": 64, "social_sentiment": 90, "insights": ["Revenue beat"]}
+    result = _handler(monkeypatch, ai)._analyze("TSLA")
+    assert result["using_real_data"] is True
+    assert result["source_breakdown"] == {"news": 64, "twitter": None, "reddit": None}
+
+
+def test_lexicon_fallback_scores_the_news(monkeypatch):
+    result = _handler(monkeypatch, None)._analyze("TSLA")
+    assert result["using_real_data"] is False
+    breakdown = result["source_breakdown"]
+    assert breakdown["twitter"] is None and breakdown["reddit"] is None
+    assert isinstance(breakdown["news"], int)
@@ -0,0 +1,126 @@
+import socket
+import socketserver
+import threading
+import time
+
+import pytest
+
+from services import cache
+from services.cache import CACHE_TTL, MemoryBackend, RedisBackend, TwoTierCache, create_cache
+
+
+class _FakeRedis(socketserver.StreamRequestHandler):
+    """RESP2 GET/PTTL/SET/DEL; values stored with a PTTL (-1 for no expiry)."""
+
+    def _read_command(self):
+        header = self.rfile.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return [args[0].decode().upper()] + args[1:]
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            command = self._read_command()
+            if command is None:
+                return
+            name, args = command[0], command[1:]
+            if name == "GET" and args[0].endswith(b"poison"):
+                reply = b"-WRONGTYPE Operation against a key holding the wrong kind of value\r\n"
+            elif name == "GET":
+                value = store.get(args[0], (None,))[0]
+                reply = b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+            elif name == "PTTL":
+                reply = b":%d\r\n" % (store[args[0]][1] if args[0] in store else -2)
+            elif name == "SET":
+                store[args[0]] = (args[1], int(args[3]))
+                reply = b"+OK\r\n"
+            elif name == "DEL":
+                reply = b":%d\r\n" % (store.pop(args[0], None) is not None)
+            else:
+                reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+@pytest.fixture
+def redis_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _FakeRedis)
+    server.daemon_threads = True
+    server.store = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def backend(redis_server):
+    return RedisBackend(f"redis://127.0.0.1:{redis_server.server_address[1]}", timeout=2)
+
+
+def test_round_trip_with_remaining_ttl(backend):
+    backend.set("analysis:TSLA", {"signal": "BUY"}, 90)
+    value, remaining = backend.get_with_ttl("analysis:TSLA")
+    assert value == {"signal": "BUY"} and remaining == pytest.approx(90)
+    backend.delete("analysis:TSLA")
+    assert backend.get_with_ttl("analysis:TSLA") == (None, 0.0)
+
+
+def test_keys_without_expiry_get_a_finite_ttl(backend, redis_server):
+    redis_server.store[b"sentient110:k"] = (b'{"a": 1}', -1)
+    value, remaining = backend.get_with_ttl("k")
+    assert value == {"a": 1}
+    assert remaining == CACHE_TTL
+    assert int(remaining) == CACHE_TTL
+
+
+def test_error_reply_mid_pipeline_leaves_the_connection_in_sync(backend, redis_server):
+    redis_server.store[b"sentient110:ok"] = (b'"fine"', 5000)
+    assert backend.get_with_ttl("poison") == (None, 0.0)
+    assert backend.errors == 1
+    # The PTTL reply of the failed pipeline must not answer this GET
+    assert backend.get_with_ttl("ok") == ("fine", 5.0)
+
+
+def test_undecodable_values_are_misses(backend, redis_server):
+    redis_server.store[b"sentient110:junk"] = (b"\xff not json", 5000)
+    assert backend.get_with_ttl("junk") == (None, 0.0)
+    assert backend.errors == 1
+
+
+def test_unreachable_server_is_a_miss():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    backend = RedisBackend(f"redis://127.0.0.1:{port}", timeout=0.2)
+    assert backend.get_with_ttl("x") == (None, 0.0)
+    backend.set("x", 1, 10)
+    assert backend.errors == 2
+
+
+def test_schemes(monkeypatch):
+    assert RedisBackend("rediss://:pw@cache.example.com:6380/2").tls
+    assert not RedisBackend("redis://localhost").tls
+    with pytest.raises(ValueError):
+        RedisBackend("http://localhost:6379")
+    monkeypatch.setattr(cache, "REDIS_URL", "unix:///tmp/redis.sock")
+    assert create_cache().l2 is None
+
+
+def test_l1_copy_never_outlives_l2_and_is_bounded():
+    l2 = MemoryBackend()
+    tiers = TwoTierCache(l2, ttl=60, l1_size=2, l1_max_ttl=0.05)
+    tiers.set("a", 1)
+    l2.set("a", 2, 60)  # another instance overwrote it
+    assert tiers.get("a") == 1
+    time.sleep(0.06)
+    assert tiers.get("a") == 2
+    tiers.set("b", 1)
+    tiers.set("c", 1)
+    assert len(tiers) == 2
+    assert tiers.stats()["l1_hits"] == 1 and tiers.stats()["l2_hits"] == 1
@@ -0,0 +1,58 @@
+from services import analyzer as analyzer_module
+from services import hybrid
+from services.analyzer import SentimentAnalyzer
+
+
+class FakeModel:
+    def __init__(self, produced):
+        self.produced = produced
+        self.high_water = 0
+
+    def __call__(self, texts):
+        # Tweets pulled from the stream but not yet scored
+        self.high_water = max(self.high_water, self.produced[0])
+        self.produced[0] = 0
+        return [{"label": "LABEL_2", "score": 0.8} for _ in texts]
+
+
+def _stream(n, produced):
+    for i in range(n):
+        produced[0] += 1
+        yield {"text": f"$TSLA post {i}", "likes": i % 7}
+
+
+def _analyzer(monkeypatch, model):
+    analyzer = SentimentAnalyzer()
+    analyzer._model, analyzer._loaded = model, True
+    monkeypatch.setattr(analyzer_module, "_shared_analyzer", analyzer)
+    monkeypatch.setattr(hybrid, "HYBRID_ENABLED", True)
+
+
+def test_stream_is_scored_as_it_arrives(monkeypatch):
+    produced = [0]
+    model = FakeModel(produced)
+    _analyzer(monkeypatch, model)
+    social, kept, consumed = hybrid.score_stream(_stream(500, produced), keep=10)
+    assert consumed == 500 and social["count"] == 500
+    assert social["positive"] == 1.0
+    assert model.high_water <= 16
+    assert len(kept) == 10 and all(t["likes"] == 6 for t in kept)
+    positions = [int(t["text"].split()[-1]) for t in kept]
+    assert positions == sorted(positions)
+
+
+def test_without_a_model_the_stream_stops_at_the_pool(monkeypatch):
+    produced = [0]
+    _analyzer(monkeypatch, None)
+    social, kept, consumed = hybrid.score_stream(_stream(500, produced), keep=10)
+    assert social is None
+    assert consumed == produced[0] == 10 and len(kept) == 10
+
+
+def test_local_scores_use_the_streamed_result(monkeypatch):
+    produced = [0]
+    _analyzer(monkeypatch, FakeModel(produced))
+    social = {"positive": 0.0, "negative": 1.0, "neutral": 0.0, "score": 0.1, "count": 90}
+    scores = hybrid.local_scores([{"title": "Tesla beats"}], [{"text": "kept"}], social)
+    assert scores["social"] is social
+    assert scores["combined"]["count"] == 91
@@ -0,0 +1,51 @@
+import pytest
+
+from services.lexicon import LexiconScorer, lexicon_analysis, score_texts
+
+
+@pytest.mark.parametrize("text, label", [
+    ("Tesla beats expectations, shares surge", "positive"),
+    ("Shares are surging after the upgrade", "positive"),
+    ("not only up but surging", "positive"),
+    ("No doubt a strong quarter", "positive"),
+    ("Analysts downgrade the stock as sales are plunging", "negative"),
+    ("The stock is not up today", "negative"),
+    ("Revenue did not miss estimates", "positive"),
+    ("Company files quarterly report", "neutral"),
+])
+def test_labels(text, label):
+    assert score_texts([text])[0].label == label
+
+
+def test_word_boundaries():
+    # No "up" inside "supply"/"upgrade", no "short" in "shortage"
+    assert score_texts(["supply shortage"])[0].terms == []
+    assert score_texts(["an upgrade"])[0].terms == ["upgrade"]
+    assert score_texts(["sell-off deepens"])[0].terms == ["sell-off"]
+
+
+def test_negation_stops_at_clause_breaks_and_scope():
+    assert score_texts(["not bad, shares rally"])[0].terms == ["rally"]
+    assert score_texts(["no one expected this but shares rally"])[0].terms == ["rally"]
+
+
+def test_batch_scores_map_back_to_each_text():
+    scores = score_texts(["bullish 🚀", "", "bearish 📉", "meh"])
+    assert [s.label for s in scores] == ["positive", "neutral", "negative", "neutral"]
+    assert scores[0].terms == ["bullish", "🚀"]
+
+
+def test_custom_lexicon():
+    scorer = LexiconScorer({"to the moon": 1.0, "rug pull": -1.0})
+    assert [s.score for s in scorer.score_texts(["going TO  the\tmoon", "a rug pull"])] == [1.0, -1.0]
+
+
+def test_analysis_scores_sources_separately_and_deterministically():
+    news = [{"title": "Nvidia shares soar to record high", "description": "Analysts upgrade"}]
+    tweets = [{"text": "$NVDA looks weak, expecting a selloff"}, {"text": "bearish here"}]
+    result = lexicon_analysis("NVDA", news, tweets)
+    assert result == lexicon_analysis("NVDA", news, tweets)
+    assert result["news_sentiment"] > 50 > result["social_sentiment"]
+    assert result["signal"] in ("BUY", "SELL", "HOLD")
+    assert len(result["insights"]) == 3
+    assert lexicon_analysis("NVDA", [], [])["signal"] == "HOLD"
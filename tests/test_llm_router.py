@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from services import llm_router
+from services.llm_router import PROVIDER_LATENCY, Cancelled, HedgedRouter, Provider, stream_fields
+
+
+def _provider(name, fn):
+    return Provider(name, fn, lambda: True)
+
+
+def _samples(name):
+    return PROVIDER_LATENCY.snapshot(provider=name)["count"]
+
+
+@pytest.fixture
+def fast_hedge(monkeypatch):
+    monkeypatch.setattr(llm_router, "HEDGE_DEFAULT_DELAY", 0.05)
+
+
+def test_hedged_secondary_wins_and_cancelled_primary_is_still_measured(fast_hedge):
+    started = threading.Event()
+
+    def slow(ticker, news, tweets, price, cancel=None, on_field=None):
+        started.set()
+        cancel.wait(5)
+        raise Cancelled()
+
+    def fast(ticker, news, tweets, price, cancel=None, on_field=None):
+        return {"signal": "BUY"}
+
+    before = _samples("test_slow")
+    router = HedgedRouter([_provider("test_slow", slow), _provider("test_fast", fast)], primary="test_slow")
+    assert router.call("TSLA", [], []) == {"signal": "BUY", "provider": "test_fast"}
+
+    deadline = time.monotonic() + 2
+    while _samples("test_slow") == before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The loser's censored latency (at least the hedge delay) reaches the p95
+    assert _samples("test_slow") == before + 1
+    assert PROVIDER_LATENCY.quantile(1.0, provider="test_slow") >= 0.05
+
+
+def test_failover_without_waiting_for_the_hedge_delay(monkeypatch):
+    monkeypatch.setattr(llm_router, "HEDGE_DEFAULT_DELAY", 5)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    router = HedgedRouter([_provider("test_broken", broken),
+                           _provider("test_backup", lambda *a, **k: {"signal": "HOLD"})], primary="test_broken")
+    start = time.monotonic()
+    assert router.call("TSLA", [], [])["provider"] == "test_backup"
+    assert time.monotonic() - start < 1
+
+
+def test_stream_fields_emits_as_fields_complete():
+    seen = []
+    fields, text = stream_fields(['{"signal": "B', 'UY", "confidence": 8', '0, "reasoning": "ok"}'],
+                                 on_field=lambda k, v: seen.append(k))
+    assert fields == {"signal": "BUY", "confidence": 80, "reasoning": "ok"}
+    assert seen == ["signal", "confidence", "reasoning"]
+
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(Cancelled):
+        stream_fields(['{"signal"'], cancel=cancel)
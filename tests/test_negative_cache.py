@@ -0,0 +1,95 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.negative_cache import (
+    NEGATIVE_TTLS, NegativeCache, alpha_vantage_failure, news_failure, retry_after,
+)
+
+
+def test_failures_are_remembered_per_ticker():
+    cache = NegativeCache()
+    assert cache.check("newsapi", "ZZZZ") is None
+    cache.record("newsapi", "ZZZZ", "unknown_symbol")
+    assert cache.check("newsapi", "ZZZZ") == "unknown_symbol"
+    assert cache.check("newsapi", "AAPL") is None
+    assert cache.check("twitter", "ZZZZ") is None
+    cache.clear("newsapi", "ZZZZ")
+    assert cache.check("newsapi", "ZZZZ") is None
+
+
+def test_rate_limits_block_the_whole_source():
+    cache = NegativeCache()
+    cache.record("alpha_vantage", "AAPL", "rate_limited")
+    assert cache.check("alpha_vantage", "MSFT") == "rate_limited"
+    assert cache.check("newsapi", "MSFT") is None
+
+
+def test_ttl_defaults_to_the_class_and_is_clamped(monkeypatch):
+    cache = NegativeCache()
+    stored = []
+    monkeypatch.setattr(cache.backend, "set", lambda key, value, ttl: stored.append(ttl))
+    cache.record("newsapi", "A", "empty")
+    cache.record("newsapi", "A", "rate_limited", ttl=10 ** 9)
+    cache.record("newsapi", "A", "rate_limited", ttl=0)
+    assert stored == [NEGATIVE_TTLS["empty"], NEGATIVE_TTLS["rate_limited"] * 10]
+
+
+def test_unknown_failure_class_is_an_error():
+    with pytest.raises(KeyError):
+        NegativeCache().record("newsapi", "A", "teapot")
+
+
+def test_stats_hit_rate():
+    cache = NegativeCache()
+    cache.record("stats-source", "A", "empty")
+    cache.check("stats-source", "A")
+    cache.check("stats-source", "B")
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert stats["hits"]["stats-source"] == {"empty": 1}
+
+
+def test_retry_after_headers():
+    assert retry_after(SimpleNamespace(headers={"Retry-After": "12"})) == 12.0
+    reset = retry_after(SimpleNamespace(headers={"x-rate-limit-reset": str(time.time() + 30)}))
+    assert 28 <= reset <= 30
+    assert retry_after(SimpleNamespace(headers={"x-rate-limit-reset": "0"})) == 0.0
+    assert retry_after(SimpleNamespace(headers={"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})) is None
+    assert retry_after(object()) is None
+
+
+def test_failure_classification():
+    assert news_failure(SimpleNamespace(status_code=429), {}) == "rate_limited"
+    assert news_failure(SimpleNamespace(status_code=200), {"code": "rateLimited"}) == "rate_limited"
+    assert news_failure(SimpleNamespace(status_code=500), {"code": "unexpectedError"}) == "upstream_error"
+    assert alpha_vantage_failure({"Note": "Thank you for using Alpha Vantage!"}) == "rate_limited"
+    assert alpha_vantage_failure({"Information": "premium endpoint"}) == "rate_limited"
+    assert alpha_vantage_failure({"Global Quote": {}}) == "unknown_symbol"
+    assert alpha_vantage_failure({"Error Message": "Invalid API call"}) == "unknown_symbol"
+
+
+def test_expired_entries_are_purged_and_not_counted(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    cache = NegativeCache()
+    for i in range(100):
+        cache.record("newsapi", f"JUNK{i}", "upstream_error")
+    assert cache.stats()["entries"] == 100
+    clock[0] += NEGATIVE_TTLS["upstream_error"] + 1
+    assert cache.stats()["entries"] == 0
+    cache.record("newsapi", "ZZZZ", "unknown_symbol")
+    assert len(cache.backend._data) == 1
+
+
+def test_store_is_capped():
+    cache = NegativeCache(max_entries=10)
+    cache.record("newsapi", "KEEP", "unknown_symbol")
+    for i in range(50):
+        cache.record("newsapi", f"JUNK{i}", "upstream_error")
+        cache.record("newsapi", "JUNK0", "upstream_error")  # rewrites leave stale index entries
+    assert len(cache.backend) == 10
+    assert len(cache.backend._expiry_heap) <= 20
+    # Entries closest to expiry go first
+    assert cache.check("newsapi", "KEEP") == "unknown_symbol"
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from services.prewarm import PREWARM_OPEN_MARGIN_MINUTES, Prewarmer, is_prewarm_ticker, next_run, prewarm_ttl
+from services.ttl_policy import US, INDIA, ttl_for
+
+
+def test_warmed_entry_outlives_the_open():
+    # A run at its scheduled time (lead minutes before the 09:30 ET open)
+    now = next_run("US", datetime(2026, 10, 20, 8, 0, tzinfo=US.tz))
+    expires = now + timedelta(seconds=prewarm_ttl("TSLA", now))
+    assert expires >= US.next_open(now) + timedelta(minutes=PREWARM_OPEN_MARGIN_MINUTES) - timedelta(seconds=1)
+    # ...which the plain pre-open policy TTL would not
+    assert now + timedelta(seconds=ttl_for("TSLA", [], None, now)["ttl"]) < US.next_open(now)
+
+
+def test_ttl_follows_the_listing_exchange():
+    now = datetime(2026, 10, 20, 8, 45, tzinfo=INDIA.tz)
+    until_open = (INDIA.next_open(now) - now).total_seconds()
+    assert prewarm_ttl("TCS.NSE", now) == int(until_open + PREWARM_OPEN_MARGIN_MINUTES * 60)
+
+
+def test_only_the_configured_universe_is_warmed():
+    assert is_prewarm_ticker("tsla")
+    assert not is_prewarm_ticker("SOFI")
+
+
+def test_empty_universe_schedules_nothing():
+    prewarmer = Prewarmer(lambda ticker: {})
+    prewarmer.start([])
+    assert prewarmer._thread is None
+    prewarmer._loop({"US": []})  # returns instead of raising on min() of nothing
@@ -0,0 +1,48 @@
+import os
+import re
+
+import pytest
+
+from services import prompt_builder
+from services.prompt_builder import PromptBuilder, _ENCODINGS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_pinned_tiktoken_ships_the_configured_encodings():
+    with open(os.path.join(ROOT, "requirements.txt")) as f:
+        pin = next(line for line in f if line.startswith("tiktoken"))
+    # Pinned exactly, like every other dependency, so deploys are reproducible
+    match = re.match(r"tiktoken==(\d+)\.(\d+)\.\d+\s", pin)
+    assert match
+    # o200k_base (gpt-4o) first shipped in tiktoken 0.7
+    assert tuple(int(n) for n in match.groups()) >= (0, 7)
+
+
+def test_installed_tiktoken_knows_every_encoding():
+    tiktoken = pytest.importorskip("tiktoken")
+    assert set(_ENCODINGS.values()) | {"cl100k_base"} <= set(tiktoken.list_encoding_names())
+
+
+@pytest.fixture
+def heuristic(monkeypatch):
+    monkeypatch.setattr(prompt_builder, "_encoders", {"o200k_base": None, "cl100k_base": None})
+
+
+def test_sections_share_the_budget(heuristic):
+    builder = PromptBuilder("gpt-4o-mini", max_tokens=60)
+    builder.add_text("Analyze TSLA")
+    builder.add_list("news", "NEWS:", ["headline number %d about the stock" % i for i in range(20)], share=0.5)
+    builder.add_list("social", "SOCIAL:", [], share=0.5)
+    prompt, usage = builder.build()
+    assert usage["tokenizer"] == "heuristic"
+    assert usage["prompt_tokens_est"] <= 60
+    # The empty social section passes nothing on, but still renders
+    assert prompt.endswith("SOCIAL:\n- (none)")
+
+
+def test_truncate_on_word_boundary(heuristic):
+    text = "word " * 50
+    cut = prompt_builder.truncate_tokens(text, 5)
+    assert cut.endswith("…") and len(cut) <= 21
+    assert prompt_builder.truncate_tokens("short", 5) == "short"
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from services.negative_cache import NEGATIVE_CACHE
+from services.quotes import QuoteError, QuoteProvider, QuoteService
+
+
+class FakeProvider(QuoteProvider):
+    name = "fake"
+
+    def __init__(self, max_batch=100, known=None, error=None):
+        self.max_batch = max_batch
+        self.known = known
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch(self, symbols):
+        with self._lock:
+            self.calls.append(list(symbols))
+        if self.error:
+            raise QuoteError(self.error)
+        return {s: {"symbol": s, "price": 1.0} for s in symbols if self.known is None or s in self.known}
+
+
+@pytest.fixture(autouse=True)
+def clean_negative_cache():
+    NEGATIVE_CACHE.backend.clear()
+
+
+def test_concurrent_lookups_share_one_bulk_call():
+    provider = FakeProvider()
+    service = QuoteService(provider, ttl=30, window=0.2)
+    symbols = [f"S{i}" for i in range(30)]
+    results = {}
+    threads = [threading.Thread(target=lambda s=s: results.setdefault(s, service.get(s))) for s in symbols]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(provider.calls) == 1 and sorted(provider.calls[0]) == sorted(symbols)
+    assert results["S7"]["symbol"] == "S7"
+    # ...and the quotes are then served from the cache
+    service.get("s7")
+    assert len(provider.calls) == 1
+
+
+def test_get_many_splits_by_provider_batch_size():
+    provider = FakeProvider(max_batch=2, known={"A", "B", "C"})
+    service = QuoteService(provider, window=0)
+    quotes = service.get_many(["a", "b", "c", "nope", "a"])
+    assert quotes["A"]["price"] == 1.0 and quotes["NOPE"] is None
+    assert [len(c) for c in provider.calls] == [2, 2]
+    assert NEGATIVE_CACHE.check("fake", "NOPE") == "unknown_symbol"
+
+
+def test_prefetch_only_batches_with_a_bulk_provider():
+    bulk = QuoteService(FakeProvider(max_batch=100), window=0)
+    assert bulk.prefetch(["A", "B", "C"]) == 3
+    assert bulk.prefetch(["A", "B", "D"]) == 1
+    assert len(bulk.provider.calls) == 2
+
+    single = QuoteService(FakeProvider(max_batch=1), window=0)
+    assert single.prefetch(["A", "B", "C"]) == 0
+    assert single.provider.calls == []
+
+
+def test_failures_raise_and_are_negatively_cached():
+    service = QuoteService(FakeProvider(error="rate_limited"), window=0)
+    with pytest.raises(QuoteError) as e:
+        service.get("TSLA")
+    assert e.value.failure == "rate_limited"
+    # Rate limits block the whole source
+    assert NEGATIVE_CACHE.check("fake", "AAPL") == "rate_limited"
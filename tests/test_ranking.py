@@ -0,0 +1,53 @@
+import time
+from datetime import datetime, timezone
+
+from services.ranking import estimate_tokens, rank, select_evidence
+
+NOW = datetime(2026, 10, 20, 15, 0, tzinfo=timezone.utc).timestamp()
+
+
+def _iso(hours_ago):
+    return datetime.fromtimestamp(NOW - hours_ago * 3600, timezone.utc).isoformat()
+
+
+def test_relevant_items_rank_first():
+    items = [
+        {"title": "Ten gadgets to buy this holiday season", "published": _iso(1)},
+        {"title": "Tesla beats earnings estimates, guidance raised", "published": _iso(1)},
+        {"title": "Markets open flat", "published": _iso(1)},
+    ]
+    assert rank(items, "TSLA", now=NOW)[0][1] == 1
+
+
+def test_recency_and_engagement_break_ties():
+    items = [
+        {"text": "$TSLA earnings today", "created_at": _iso(48), "likes": 0},
+        {"text": "$TSLA earnings today", "created_at": _iso(1), "likes": 0},
+        {"text": "$TSLA earnings today", "created_at": _iso(48), "likes": 5000},
+    ]
+    order = [i for _, i in rank(items, "TSLA", now=NOW)]
+    assert order[-1] == 0
+    # Syndication reach counts as engagement for collapsed news
+    clustered = [{"title": "Nvidia revenue beats"}, {"title": "Nvidia revenue beats", "cluster_size": 6}]
+    assert rank(clustered, "NVDA", now=NOW)[0][1] == 1
+
+
+def test_ties_keep_input_order():
+    assert [i for _, i in rank(["same text", "same text", "same text"], "AAPL", now=NOW)] == [0, 1, 2]
+
+
+def test_selection_respects_k_and_token_budget():
+    long = {"title": "Tesla earnings " + "detail " * 200}
+    short = [{"title": f"Tesla earnings beat, deliveries up {i}"} for i in range(5)]
+    items = [long] + short
+    selected = select_evidence(items, "TSLA", k=3, token_budget=40)
+    assert len(selected) == 3 and long not in selected
+    assert sum(estimate_tokens(s["title"]) for s in selected) <= 40
+    # A per-item cap lets the long item in at its capped cost
+    assert long in select_evidence(items, "TSLA", k=6, token_budget=100, max_item_tokens=20)
+
+
+def test_empty_and_undated_inputs():
+    assert rank([], "TSLA") == []
+    assert select_evidence([{"title": "x", "published": "not a date"}], "TSLA", k=1) == [{"title": "x", "published": "not a date"}]
+    assert rank(["a"], "TSLA", now=time.time())[0][1] == 0
@@ -0,0 +1,85 @@
+import pytest
+
+from services import schema
+from services.schema import SchemaError, parse_json_text, request_with_repair, validate_analysis
+
+VALID = {
+    "signal": "BUY",
+    "confidence": 80,
+    "reasoning": "Strong quarter.",
+    "sentiment_score": 0.7,
+    "news_sentiment": 75,
+    "social_sentiment": 60,
+    "key_insights": ["Revenue beat"],
+}
+
+
+def test_valid_response_is_normalized():
+    data = dict(VALID, signal=" buy ", confidence=79.6, extra="dropped")
+    clean = validate_analysis(data)
+    assert clean["signal"] == "BUY" and clean["confidence"] == 80
+    assert "extra" not in clean
+
+
+@pytest.mark.parametrize("field,value", [
+    ("signal", "STRONG BUY"),
+    ("confidence", 101),
+    ("confidence", True),
+    ("sentiment_score", -0.1),
+    ("key_insights", ["a"] * 6),
+    ("key_insights", [1]),
+])
+def test_invalid_fields_are_rejected(field, value):
+    with pytest.raises(SchemaError) as excinfo:
+        validate_analysis(dict(VALID, **{field: value}))
+    assert excinfo.value.errors[0].startswith(field)
+
+
+def test_missing_fields_and_non_objects():
+    data = dict(VALID)
+    del data["reasoning"]
+    with pytest.raises(SchemaError, match="reasoning: missing"):
+        validate_analysis(data)
+    with pytest.raises(SchemaError):
+        validate_analysis(["BUY"])
+    assert validate_analysis({"signal": "sell"}, required=["signal"]) == {"signal": "SELL"}
+
+
+def test_parse_json_text_keeps_the_text():
+    with pytest.raises(SchemaError) as excinfo:
+        parse_json_text("Sure! {signal: BUY}")
+    assert excinfo.value.text == "Sure! {signal: BUY}"
+
+
+def test_invalid_reply_is_repaired_once(monkeypatch):
+    monkeypatch.setattr(schema, "LLM_REPAIR_RETRIES", 1)
+    calls = []
+
+    def call(repairs, on_field):
+        calls.append((list(repairs), on_field))
+        if len(calls) == 1:
+            return parse_json_text("not json"), "not json"
+        return dict(VALID), "{}"
+
+    on_field = object()
+    assert request_with_repair("test-repair", call, on_field)["signal"] == "BUY"
+    assert calls[0] == ([], on_field)
+    repairs, second_on_field = calls[1]
+    assert second_on_field is None
+    assert len(repairs) == 1 and "not valid JSON" in repairs[0] and "not json" in repairs[0]
+    stats = schema.parse_stats()["test-repair"]
+    assert stats["responses"] == 1 and stats["failure_rate"] == 1.0 and stats["repaired"] == 1
+
+
+def test_repair_gives_up_after_the_retry_budget(monkeypatch):
+    monkeypatch.setattr(schema, "LLM_REPAIR_RETRIES", 1)
+    calls = []
+
+    def call(repairs, on_field):
+        calls.append(repairs)
+        return dict(VALID, signal="MAYBE"), ""
+
+    with pytest.raises(SchemaError):
+        request_with_repair("test-giveup", call)
+    assert len(calls) == 2
+    assert schema.parse_stats()["test-giveup"]["repair_failed"] == 1
@@ -0,0 +1,58 @@
+import time
+
+from services.cache import MemoryBackend
+from services.sessions import RevocationList, SessionStore, TokenSigner
+
+KEYS = [("k1", b"secret-one"), ("k0", b"secret-zero")]
+
+
+def test_tokens_verify_across_key_rotation():
+    old = TokenSigner([("k0", b"secret-zero")])
+    token = old.issue("a@example.com", "pro")
+    claims = TokenSigner(KEYS).verify(token)
+    assert claims["sub"] == "a@example.com" and claims["plan"] == "pro"
+    assert TokenSigner([("k1", b"secret-one")]).verify(token) is None
+    assert TokenSigner(KEYS).verify(token[:-2] + "xx") is None
+    assert TokenSigner(KEYS).verify("garbage") is None
+
+
+def test_expired_tokens_fail():
+    signer = TokenSigner(KEYS, revoked=RevocationList())
+    assert signer.verify(signer.issue("a@example.com", ttl=-1)) is None
+
+
+def test_revocation_is_shared_through_the_backend():
+    shared = MemoryBackend()
+    one = TokenSigner(KEYS, revoked=RevocationList(backend=shared))
+    two = TokenSigner(KEYS, revoked=RevocationList(backend=shared))
+    token = one.issue("a@example.com")
+    assert two.verify(token)
+    assert one.revoke(token)
+    # Logged out on instance one, rejected on instance two
+    assert two.verify(token) is None
+    stats = one.revoked.stats()
+    assert stats["shared"] and stats["size"] == 1
+    # Kept in the shared store only until the token would have expired
+    jti_key = next(iter(shared._data))
+    assert jti_key.startswith("revoked:")
+    assert shared.get_with_ttl(jti_key)[1] <= one.ttl
+
+
+def test_revocation_without_backend_is_local():
+    one = TokenSigner(KEYS, revoked=RevocationList())
+    two = TokenSigner(KEYS, revoked=RevocationList())
+    token = one.issue("a@example.com")
+    one.revoke(token)
+    assert one.verify(token) is None
+    assert two.verify(token)
+
+
+def test_sweep_reclaims_expired_sessions_in_batches():
+    store = SessionStore(ttl=60, sweep_batch=2)
+    for i in range(5):
+        store.create(f"t{i}", "a@example.com", ttl=0.01)
+    store.create("live", "a@example.com")
+    time.sleep(0.02)
+    assert store.sweep() == 2
+    assert store.sweep(max_items=10) == 3
+    assert len(store) == 1 and "live" in store
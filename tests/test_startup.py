@@ -0,0 +1,22 @@
+import json
+
+import pytest
+
+from benchmarks.bench_startup import BUDGET_FILE, measure
+
+with open(BUDGET_FILE) as f:
+    BUDGETS = json.load(f)
+
+
+@pytest.mark.parametrize("entry", sorted(BUDGETS))
+def test_entry_points_import_no_heavy_modules(entry):
+    # Timings are left to the benchmark (too noisy for CI); lazy imports are not
+    try:
+        result = measure(entry, runs=1)
+    except RuntimeError as e:
+        pytest.skip(str(e).splitlines()[-1])
+    assert [name for name in BUDGETS[entry]["forbidden"] if name in result["modules"]] == []
+
+
+def test_claude_ai_defers_asyncio():
+    assert "asyncio.base_events" not in measure("services.claude_ai", runs=1)["modules"]
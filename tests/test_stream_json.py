@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from services.stream_json import IncrementalJSONParser
+
+REPLY = {
+    "signal": "BUY",
+    "confidence": 82,
+    "reasoning": "Beat on \"revenue\", {guidance} raised, margins up\\down]",
+    "key_insights": ["Deliveries up", {"nested": [1, 2, {"deep": "}"}]}],
+    "sentiment_score": 0.71,
+}
+
+
+def _feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return parser, completed
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_any_chunking_gives_the_same_object(size):
+    parser, completed = _feed_in_chunks(json.dumps(REPLY), size)
+    assert parser.result() == REPLY
+    assert [key for key, _ in completed] == list(REPLY)
+
+
+def test_fields_complete_as_soon_as_their_value_closes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"signal": "BU') == []
+    assert parser.feed('Y", "confidence": 8') == [("signal", "BUY")]
+    assert parser.feed("2,") == [("confidence", 82)]
+    assert parser.fields == {"signal": "BUY", "confidence": 82}
+
+
+def test_leading_chatter_and_fence_are_skipped():
+    text = "Here is the analysis:\n```json\n" + json.dumps(REPLY) + "\n```\nHope this helps {"
+    parser, _ = _feed_in_chunks(text, 5)
+    assert parser.result() == REPLY
+
+
+def test_truncated_stream_raises():
+    parser, _ = _feed_in_chunks(json.dumps(REPLY)[:-10], 4)
+    with pytest.raises(ValueError):
+        parser.result()
+    assert parser.fields["signal"] == "BUY"
+
+
+def test_empty_object():
+    parser = IncrementalJSONParser()
+    assert parser.feed("{ }") == []
+    assert parser.result() == {}
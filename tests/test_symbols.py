@@ -0,0 +1,55 @@
+import pytest
+
+from services import symbols
+from services.symbols import SymbolIndex, resolve_ticker
+
+ROWS = [
+    {"symbol": "AAPL", "exchange": "NASDAQ", "name": "Apple Inc."},
+    {"symbol": "TATAMOTORS.BSE", "exchange": "BSE", "name": "Tata Motors Ltd."},
+    {"symbol": "TATAMOTORS.NSE", "exchange": "NSE", "name": "Tata Motors Ltd."},
+    {"symbol": "TSLA", "exchange": "NASDAQ", "name": "Tesla, Inc.", "aliases": ["tesla motors"]},
+]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = SymbolIndex(ROWS)
+    monkeypatch.setattr(symbols, "_index", index)
+    return index
+
+
+def test_resolves_symbols_aliases_and_suffixes(index):
+    assert index.resolve("aapl") == "AAPL"
+    assert index.resolve("Apple") == "AAPL"
+    assert index.resolve("tesla motors") == "TSLA"
+    assert index.resolve("TATAMOTORS.NS") == "TATAMOTORS.NSE"
+    # Bare Indian symbols prefer BSE
+    assert index.resolve("tatamotors") == "TATAMOTORS.BSE"
+
+
+@pytest.mark.parametrize("ticker", ["SOFI", "A", "IT", "ON"])
+def test_unlisted_tickers_pass_through_by_default(index, ticker):
+    assert not symbols.SYMBOLS_STRICT
+    assert resolve_ticker(ticker.lower()) == ticker
+
+
+def test_unlisted_yahoo_suffixes_are_normalized(index):
+    assert resolve_ticker("foo.ns") == resolve_ticker("FOO.NSE") == "FOO.NSE"
+    assert resolve_ticker("FOO.BO") == "FOO.BSE"
+
+
+def test_strict_mode_rejects_unlisted(index, monkeypatch):
+    monkeypatch.setattr(symbols, "SYMBOLS_STRICT", True)
+    assert resolve_ticker("SOFI") is None
+    assert resolve_ticker("apple") == "AAPL"
+
+
+@pytest.mark.parametrize("raw", ["", "../etc/passwd", "TSLA; DROP", "A" * 20])
+def test_malformed_input_is_rejected(index, raw):
+    assert resolve_ticker(raw) is None
+
+
+def test_complete_by_symbol_and_name_word(index):
+    assert [e["symbol"] for e in index.complete("T")][:1] == ["TATAMOTORS.BSE"]
+    assert [e["symbol"] for e in index.complete("motors")] == ["TATAMOTORS.BSE", "TATAMOTORS.NSE"]
+    assert index.complete("zzz") == []
@@ -0,0 +1,63 @@
+import pytest
+
+from services.timeseries import SentimentHistory, TickerSeries
+
+
+def test_rolling_stats_over_the_ring_buffer():
+    series = TickerSeries(capacity=4, windows=(2,), ema_span=3)
+    for ts, score in enumerate([0.1, 0.3, 0.5, 0.7, 0.9]):
+        series.append(float(ts), score)
+    result = series.query()
+    assert result["count"] == 4  # the oldest point was overwritten
+    assert result["mean"] == pytest.approx(0.6)
+    assert result["latest"]["mean_2"] == pytest.approx(0.8)
+    assert [p["timestamp"] for p in series.query(start=2, end=3)["points"]] == [2.0, 3.0]
+
+
+def test_queries_do_not_allocate_series():
+    history = SentimentHistory(directory="")
+    result = history.query("NOPE")
+    assert result["count"] == 0 and result["points"] == []
+    assert history.tickers() == []
+    history.record("TSLA", {"sentiment_score": 0.4, "confidence": 80, "signal": "BUY"})
+    assert history.query("TSLA")["latest"]["signal"] == "BUY"
+
+
+def test_persisted_history_is_replayed(tmp_path):
+    SentimentHistory(str(tmp_path)).record("TSLA", {"sentiment_score": 0.2}, ts=1.0)
+    history = SentimentHistory(str(tmp_path))
+    assert history.query("TSLA")["count"] == 1
+    assert history.query("AAPL")["count"] == 0
+    assert history.tickers() == ["TSLA"]
+
+
+@pytest.mark.parametrize("ticker", ["../escape", "..", "a/b", ".hidden"])
+def test_tickers_never_leave_the_history_directory(tmp_path, ticker):
+    history = SentimentHistory(str(tmp_path))
+    with pytest.raises(ValueError):
+        history.query(ticker)
+
+
+def test_columns_grow_as_points_arrive():
+    series = TickerSeries(capacity=200, windows=(12,), ema_span=3)
+    assert len(series._score) == 64
+    scores = [i % 10 / 10 for i in range(250)]
+    for ts, score in enumerate(scores):
+        series.append(float(ts), score)
+    assert len(series._score) == len(series._means[12]) == 200
+    result = series.query()
+    assert result["count"] == 200
+    assert result["mean"] == pytest.approx(sum(scores[-200:]) / 200, abs=1e-4)
+    assert result["latest"]["mean_12"] == pytest.approx(sum(scores[-12:]) / 12, abs=1e-4)
+
+
+def test_least_recently_used_tickers_are_dropped(tmp_path):
+    history = SentimentHistory(str(tmp_path), max_tickers=2)
+    for ticker in ("AAPL", "TSLA"):
+        history.record(ticker, {"sentiment_score": 0.5}, ts=1.0)
+    history.query("AAPL")
+    history.record("JUNK", {"sentiment_score": 0.5}, ts=1.0)
+    assert history.tickers() == ["AAPL", "JUNK"]
+    assert history.stats()["evicted"] == 1
+    # Dropped from memory only: the file is replayed on the next read
+    assert history.query("TSLA")["count"] == 1
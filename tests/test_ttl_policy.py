@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services.ttl_policy import (
+    INDIA, PRE_OPEN, TTL_EXTENDED, TTL_MIN, TTL_OPEN, US, exchange_for, news_velocity, price_move, ttl_for,
+)
+
+# Tuesday 2026-10-20, New York
+def et(hour, minute=0, day=20):
+    return datetime(2026, 10, day, hour, minute, tzinfo=US.tz)
+
+
+@pytest.mark.parametrize("now, state", [
+    (et(10), "open"), (et(9), "extended"), (et(16, 30), "extended"), (et(20), "closed"),
+    (et(12, day=24), "closed"),  # Saturday
+])
+def test_market_state(now, state):
+    assert US.state(now) == state
+
+
+def test_next_open_skips_the_weekend():
+    assert US.next_open(et(17, day=23)) == et(9, 30, day=26)
+    assert US.next_open(et(10)) == et(9, 30)
+
+
+def test_exchange_from_suffix():
+    assert exchange_for("TCS.NS") == "NSE"
+    assert exchange_for("reliance.bse") == "BSE"
+    assert exchange_for("TSLA") == "NYSE"
+    assert ttl_for("TCS.NSE", now=datetime(2026, 10, 20, 11, 0, tzinfo=INDIA.tz))["market"] == "open"
+
+
+def test_open_market_ttl_shrinks_with_news_and_moves():
+    now = et(11)
+    assert ttl_for("TSLA", now=now)["ttl"] == TTL_OPEN
+    news = [{"published": (now - timedelta(minutes=10 * i)).astimezone(timezone.utc).isoformat()} for i in range(24)]
+    busy = ttl_for("TSLA", news, {"change_percent": "-4.0%"}, now)
+    assert busy["news_per_hour"] == 4.0 and busy["price_move_pct"] == 4.0
+    assert busy["ttl"] == TTL_MIN
+
+
+def test_closed_market_keeps_results_until_the_pre_open_window():
+    now = et(20)
+    ttl = ttl_for("TSLA", now=now)["ttl"]
+    assert now + timedelta(seconds=ttl) <= US.next_open(now) - PRE_OPEN
+
+
+@pytest.mark.parametrize("minutes_before", [1, 5, 10, 14])
+def test_pre_open_ttl_never_crosses_the_open(minutes_before):
+    now = et(9, 30) - timedelta(minutes=minutes_before)
+    ttl = ttl_for("TSLA", now=now)["ttl"]
+    assert now + timedelta(seconds=ttl) <= et(9, 30)
+    assert ttl_for("TSLA", now=et(8, 30))["ttl"] == TTL_EXTENDED
+
+
+def test_news_and_price_parsing():
+    now = datetime(2026, 10, 20, 12, tzinfo=timezone.utc)
+    news = [{"published_at": "2026-10-20T11:00:00Z"}, {"published": "garbage"}, {"published": "2026-10-19T00:00:00Z"}]
+    assert news_velocity(news, now) == pytest.approx(1 / 6)
+    assert price_move({"change_percent": "-1.5%"}) == 1.5
+    assert price_move({"change_percent": "n/a"}) == 0.0
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from services.watchlist import Subscriber, WatchlistHub, diff, parse_message
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"action": "subscribe", "tickers": ["TSLA", "aapl"]}', ("subscribe", ["TSLA", "aapl"])),
+    ('{"action": "subscribe", "tickers": "TSLA"}', ("subscribe", ["TSLA"])),
+    ('{"action": "unsubscribe"}', ("unsubscribe", [])),
+])
+def test_parse_message(text, expected):
+    assert parse_message(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "not json", "[1, 2]", '"TSLA"',
+    '{"action": "subscribe", "tickers": 123}',
+    '{"action": "subscribe", "tickers": {"TSLA": 1}}',
+    '{"action": "subscribe", "tickers": ["TSLA", 7]}',
+])
+def test_malformed_messages_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_message(text)
+
+
+def test_one_refresh_loop_per_ticker_fanned_out():
+    calls = []
+
+    async def refresh(ticker):
+        calls.append(ticker)
+        return {"signal": "BUY", "confidence": 80 + len(calls)}
+
+    async def run():
+        hub = WatchlistHub(refresh, interval=0.01)
+        a, b = Subscriber(), Subscriber()
+        hub.subscribe(a, ["tsla"])
+        hub.subscribe(b, ["TSLA"])
+        assert hub.tickers() == ["TSLA"]
+        first = await asyncio.wait_for(a.get(), 1)
+        assert first["type"] == "snapshot" and (await b.get())["data"] == first["data"]
+        update = await asyncio.wait_for(a.get(), 1)
+        assert update["type"] == "update" and set(update["changes"]) == {"confidence"}
+        hub.unsubscribe(a)
+        hub.unsubscribe(b)
+        assert hub.tickers() == []
+
+    asyncio.run(run())
+    assert set(calls) == {"TSLA"}
+
+
+def test_diff_only_reports_changed_fields():
+    assert diff({"signal": "BUY", "price": 1}, {"signal": "BUY", "price": 2}) == {"price": 2}